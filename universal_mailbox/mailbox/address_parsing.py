@@ -0,0 +1,100 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+from typing import List, Tuple
+from email.utils import getaddresses, quote
+from header_decoding import decode_header_value
+
+
+def parse_addresses(value: str) -> List[Tuple[str, str]]:
+    """
+    Parse an RFC 5322 address list into (display name, address) pairs with decoded names, for example:
+    'Jan <jan@example.com>, "Nowak, Anna" <anna@example.com>, ola@example.com'
+    -> [("Jan", "jan@example.com"), ("Nowak, Anna", "anna@example.com"), ("", "ola@example.com")]
+
+    Parameters
+    -----------
+    value (str): raw header value. Encoded-words are decoded after splitting,
+        so commas inside encoded display names do not split addresses.
+    """
+    return [
+        (decode_header_value(name), address)
+        for name, address in getaddresses([str(value)])
+        if address
+    ]
+
+
+def display_name(name: str, address: str) -> str:
+    """
+    Return the display name of a recipient as it is shown in joined header fields.
+    Names with commas or quotes are quoted, so a joined list splits back into the same recipients,
+    for example: "Nowak, Anna" -> '"Nowak, Anna"'. A recipient without a name is shown by its address.
+
+    Parameters
+    -----------
+    name (str): decoded display name.
+    address (str): email address.
+    """
+    if not name:
+        return address
+    if "," in name or '"' in name:
+        return f'"{quote(name)}"'
+    return name
+
+
+class AddressTable:
+    """
+    Per-run interning of parsed address headers.
+
+    Repeated header values are parsed once and share the same name and address strings:
+    table = AddressTable()
+    names, addresses = table._split("Jan <jan@example.com>, ola@example.com")
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        """
+        Parameters
+        -----------
+        max_size (int): maximum number of header values kept parsed.
+        """
+        self._max_size = max_size
+        self._values = {}
+        self._strings = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _shared(self, text: str) -> str:
+        return self._strings.setdefault(text, text) if len(self._strings) < self._max_size else text
+
+    def _split(self, value: str) -> [Tuple[str, str] | None]:
+        """
+        Return (display names, addresses) of an address header, both joined with ", " when there are
+        several recipients, for example: ('Jan, "Nowak, Anna"', "jan@example.com, anna@example.com").
+        Display names are formatted with display_name, so names with commas are quoted.
+        Returns None when the value contains no address, use parse_addresses for the separate pairs.
+
+        Parameters
+        -----------
+        value (str): raw header value.
+        """
+        if not isinstance(value, str):
+            # email.header.Header of raw 8-bit values.
+            value = str(value)
+        result = self._values.get(value)
+        if result is not None:
+            return result
+        addresses = parse_addresses(value)
+        if not addresses:
+            return None
+        result = (
+            self._shared(", ".join(display_name(name, address) for name, address in addresses)),
+            self._shared(", ".join(address for _, address in addresses)),
+        )
+        if len(self._values) < self._max_size:
+            self._values[value] = result
+        return result
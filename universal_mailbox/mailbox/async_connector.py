@@ -0,0 +1,80 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import asyncio
+from typing import Any
+from concurrent.futures import Executor
+from email_connector import EmailConnector
+
+
+class AsyncEmailConnector:
+    """
+    Asyncio front-end of EmailConnector.
+
+    Blocking imaplib calls run in an executor, so one event loop can drive many mailboxes at once.
+    Commands sent over one connection are serialized, because an IMAP session handles one command at a time.
+
+    Example:
+    connector = AsyncEmailConnector(EmailConnector("your_user", email_provider="gmail"))
+    await connector._connect()
+    async for data, _ in EmailParser(connector)._aget_emails(batch_size=200):
+        ...
+    await connector._disconnect()
+    """
+
+    def __init__(self, connector: EmailConnector, executor: Executor = None) -> None:
+        """
+        Parameters
+        -----------
+        connector (EmailConnector): synchronous connector doing the actual I/O.
+        executor (Executor): executor for blocking calls. Default: event loop's default executor.
+        """
+        self._connector = connector
+        self._executor = executor
+        self._lock = asyncio.Lock()
+
+    def __str__(self) -> str:
+        return str(self._connector)
+
+    async def _run(self, function, *args, **kwargs) -> Any:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, lambda: function(*args, **kwargs)
+            )
+
+    def _account_key(self) -> str:
+        return self._connector._account_key()
+
+    async def _connect(self, settings: str = None) -> None:
+        await self._run(self._connector._connect, settings)
+
+    async def _disconnect(self) -> None:
+        await self._run(self._connector._disconnect)
+
+    async def _select(self, mailbox: str = "Inbox") -> None:
+        await self._run(self._connector._select, mailbox=mailbox)
+
+    async def _uidvalidity(self) -> [int | None]:
+        return await self._run(self._connector._uidvalidity)
+
+    async def _search(
+        self, search_filter: str = "ALL", uid: bool = False, charset: str = None, literal: bytes = None
+    ) -> [list | None]:
+        return await self._run(
+            self._connector._search, search_filter, uid=uid, charset=charset, literal=literal
+        )
+
+    async def _fetch_batch(
+        self, message_set: str, message_parts: str = "(RFC822)", uid: bool = False
+    ) -> [list | None]:
+        return await self._run(
+            self._connector._fetch_batch, message_set, message_parts=message_parts, uid=uid
+        )
+
+    async def _noop(self) -> bool:
+        return await self._run(self._connector._noop)
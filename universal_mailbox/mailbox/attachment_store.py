@@ -0,0 +1,158 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import sqlite3
+import threading
+from logger import logger
+from utils import absolute_path
+from typing import Any, Iterable, List
+from attachment_stream import AttachmentHandle, stream_attachment
+
+
+class AttachmentStore:
+    """
+    Content-addressed, deduplicated attachment storage.
+
+    Blobs are stored once under blobs/<2 hex>/<2 hex>/<sha256> and a sqlite manifest
+    maps every message attachment to its blob:
+    store = AttachmentStore("/data/attachments")
+    for data, handles in parser._get_emails(return_attachments=True, attachment_store=store): ...
+    """
+
+    def __init__(self, root: str = None) -> None:
+        """
+        Parameters
+        -----------
+        root (str): store directory. Default: mailbox/attachment_store
+        """
+        self._root = root or absolute_path("attachment_store")
+        self._directories = set()
+        self._lock = threading.Lock()
+        self._database = None
+        os.makedirs(os.path.join(self._root, "blobs"), exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        # Worker processes open their own manifest connection.
+        state = self.__dict__.copy()
+        state["_database"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _manifest(self) -> sqlite3.Connection:
+        if self._database is None:
+            self._database = sqlite3.connect(
+                os.path.join(self._root, "manifest.sqlite3"),
+                check_same_thread=False,
+                timeout=30,
+            )
+            self._database.execute(
+                """
+                CREATE TABLE IF NOT EXISTS manifest (
+                    message_id TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_type TEXT,
+                    PRIMARY KEY (message_id, file_name, digest)
+                )
+                """
+            )
+            self._database.execute(
+                "CREATE INDEX IF NOT EXISTS manifest_digest ON manifest (digest)"
+            )
+        return self._database
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._root, "blobs", digest[:2], digest[2:4], digest)
+
+    def _has_blob(self, digest: str) -> bool:
+        return os.path.exists(self._blob_path(digest))
+
+    def _known_digests(self, digests: Iterable[str]) -> set:
+        """Return digests already present in the store."""
+        return {digest for digest in digests if self._has_blob(digest)}
+
+    def _has_message(self, message_id: str) -> bool:
+        """Check if attachments of a message were already stored, so it does not have to be downloaded."""
+        with self._lock:
+            row = self._manifest().execute(
+                "SELECT 1 FROM manifest WHERE message_id = ? LIMIT 1", (message_id,)
+            ).fetchone()
+        return row is not None
+
+    def _attachments(self, message_id: str) -> List[AttachmentHandle]:
+        """Return handles of attachments stored for a message."""
+        with self._lock:
+            rows = self._manifest().execute(
+                "SELECT file_name, content_type, size, digest FROM manifest WHERE message_id = ?",
+                (message_id,),
+            ).fetchall()
+        return [
+            AttachmentHandle(
+                file_name=file_name,
+                content_type=content_type,
+                size=size,
+                digest=digest,
+                path=self._blob_path(digest),
+            )
+            for file_name, content_type, size, digest in rows
+        ]
+
+    def _move_blob(self, temporary_path: str, digest: str) -> None:
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            # Known content, the decoded copy is not needed.
+            os.remove(temporary_path)
+            return
+        directory = os.path.dirname(path)
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+        os.replace(temporary_path, path)
+
+    def _store(self, part: Any, file_name: str, message_id: str) -> [AttachmentHandle | None]:
+        """
+        Store an attachment unless a blob with the same content exists and record it in the manifest.
+        The attachment is decoded once, into a temporary file in the store while it is hashed.
+        Returns None when the attachment cannot be decoded or written, nothing is recorded then.
+
+        Parameters
+        -----------
+        part (email.message.Message): MIME part with the attachment.
+        file_name (str): attachment file name.
+        message_id (str): Message-ID of the email the attachment belongs to.
+        """
+        temporary_path = os.path.join(self._root, "blobs", f"{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            # stream_attachment removes the temporary file when decoding fails.
+            handle = stream_attachment(part, file_name, sink=temporary_path)
+            self._move_blob(temporary_path, handle.digest)
+        except Exception as e:
+            logger.exception(f"Cannot store attachment {file_name} of {message_id}: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return None
+        handle.path = self._blob_path(handle.digest)
+
+        with self._lock:
+            database = self._manifest()
+            database.execute(
+                "INSERT OR IGNORE INTO manifest VALUES (?, ?, ?, ?, ?)",
+                (message_id, file_name, handle.digest, handle.size, handle.content_type),
+            )
+            database.commit()
+        return handle
+
+    def _close(self) -> None:
+        if self._database is not None:
+            self._database.close()
+            self._database = None
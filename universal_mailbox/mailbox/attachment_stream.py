@@ -0,0 +1,142 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import re
+import hashlib
+import binascii
+from typing import Any, Generator
+from dataclasses import dataclass
+
+
+CHUNK_SIZE: int = 64 * 1024
+_NON_BASE64 = re.compile(r"[^A-Za-z0-9+/=]+")
+
+
+@dataclass
+class AttachmentHandle:
+    """Lightweight description of a streamed attachment, returned instead of its bytes."""
+
+    file_name: str
+    content_type: str
+    size: int
+    digest: str
+    path: str = None
+
+
+def _base64_chunks(payload: str, chunk_size: int) -> Generator:
+    remainder = ""
+    pads = 0
+    done = False
+    for start in range(0, len(payload), chunk_size):
+        # Like email, characters outside the base64 alphabet (line breaks, stray "!") are ignored.
+        segments = _NON_BASE64.sub("", payload[start : start + chunk_size]).split("=")
+        # Like binascii.a2b_base64 used by get_payload(decode=True), "=" ends the data only in a padding
+        # position of a quantum (third or fourth character), a stray "=" elsewhere is skipped.
+        encoded = remainder + segments[0]
+        pads = 0 if segments[0] else pads
+        for segment in segments[1:]:
+            position = len(encoded) % 4
+            if position >= 2:
+                pads += 1
+                if position + pads >= 4:
+                    done = True
+                    break
+            encoded += segment
+            pads = 0 if segment else pads
+        cut = len(encoded) - len(encoded) % 4
+        encoded, remainder = encoded[:cut], encoded[cut:]
+        if encoded:
+            yield binascii.a2b_base64(encoded)
+        if done:
+            break
+    # A single leftover character carries less than a byte.
+    remainder = remainder[:-1] if len(remainder) % 4 == 1 else remainder
+    if remainder:
+        # Incomplete trailing quantum, decode what is possible like email does.
+        yield binascii.a2b_base64(remainder + "=" * (-len(remainder) % 4))
+
+
+def _quoted_printable_chunks(payload: str, chunk_size: int) -> Generator:
+    start = 0
+    while start < len(payload):
+        end = payload.find("\n", start + chunk_size)
+        end = len(payload) if end == -1 else end + 1
+        # Soft line breaks end with a newline, so decoding whole lines is safe.
+        yield binascii.a2b_qp(payload[start:end])
+        start = end
+
+
+def decoded_chunks(part: Any, chunk_size: int = CHUNK_SIZE) -> Generator:
+    """
+    Decode a MIME part chunk by chunk, without building the whole decoded payload.
+
+    Parameters
+    -----------
+    part (email.message.Message): non-multipart MIME part.
+    chunk_size (int): number of encoded characters processed at once.
+    """
+    payload = part.get_payload()
+    encoding = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    if not isinstance(payload, str) or not payload.isascii():
+        # 8bit payloads may carry surrogate-escaped bytes, let email decode them in one go.
+        yield part.get_payload(decode=True) or b""
+    elif encoding == "base64":
+        yield from _base64_chunks(payload, chunk_size)
+    elif encoding == "quoted-printable":
+        yield from _quoted_printable_chunks(payload, chunk_size)
+    elif encoding in ("x-uuencode", "uuencode", "uue", "x-uue"):
+        yield part.get_payload(decode=True) or b""
+    else:
+        for start in range(0, len(payload), chunk_size):
+            yield payload[start : start + chunk_size].encode("ascii")
+
+
+def stream_attachment(
+    part: Any,
+    file_name: str,
+    sink: Any = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AttachmentHandle:
+    """
+    Decode an attachment into a sink while computing its size and sha256 digest.
+
+    Parameters
+    -----------
+    part (email.message.Message): MIME part with the attachment.
+    file_name (str): attachment file name.
+    sink (str | object): destination file path or a writable binary object with .write().
+        None only measures and hashes the attachment.
+    chunk_size (int): number of encoded characters processed at once.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    path = sink if isinstance(sink, (str, os.PathLike)) else None
+    output = open(path, "wb") if path else sink
+    try:
+        for chunk in decoded_chunks(part, chunk_size=chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+            if output is not None:
+                output.write(chunk)
+    except Exception:
+        if path:
+            # Do not leave a truncated file behind.
+            output.close()
+            os.remove(path)
+        raise
+    finally:
+        if path and not output.closed:
+            output.close()
+
+    return AttachmentHandle(
+        file_name=file_name,
+        content_type=part.get_content_type(),
+        size=size,
+        digest=digest.hexdigest(),
+        path=str(path) if path else None,
+    )
@@ -0,0 +1,17 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__run_benchmarks__ = [
+    "python -m benchmark.bench_html_text",
+    "python -m benchmark.bench_emoji",
+    "python -m benchmark.bench_get_emails",
+]
+
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.getcwd()))
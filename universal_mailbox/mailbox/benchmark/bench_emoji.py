@@ -0,0 +1,46 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m benchmark.bench_emoji"]
+
+import time
+import argparse
+from email_parser import EmailParser
+from benchmark.corpus import emoji_body
+from email_connector import EmailConnector
+
+
+def measure(parser: EmailParser, text: str, engine: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser._replace_emojis_with_text(text, emoji_engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Compare emoji engines of EmailParser._replace_emojis_with_text.")
+    arguments.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    arguments.add_argument("--densities", type=float, nargs="+", default=[0.01, 0.2])
+    arguments.add_argument("--repeat", type=int, default=3)
+    options = arguments.parse_args()
+
+    parser = EmailParser(EmailConnector("benchmark", email_provider="gmail"))
+    for size in options.sizes:
+        for density in options.densities:
+            text = emoji_body(size, density)
+            legacy = measure(parser, text, "legacy", options.repeat)
+            fast = measure(parser, text, "fast", options.repeat)
+            megabytes = len(text.encode("utf-8")) / 1024 / 1024
+            print(
+                f"{size:>9,} chars, emoji density {density:.2f}: "
+                f"legacy {megabytes / legacy:8.2f} MB/s, fast {megabytes / fast:8.2f} MB/s, x{legacy / fast:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
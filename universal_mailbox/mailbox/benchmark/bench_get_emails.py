@@ -0,0 +1,119 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = [
+    "python -m benchmark.bench_get_emails",
+    "python -m benchmark.bench_get_emails --messages 2000 --cases default batch lazy",
+]
+
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+from typing import Final
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from compressed_imap import CompressedIMAP4
+from benchmark.corpus import MAIL_KINDS, mail_corpus
+from benchmark.imap_server import FakeIMAPServer
+
+
+# Option combinations of EmailParser._get_emails, "compress" enables COMPRESS=DEFLATE on the session instead.
+CASES: Final[dict] = {
+    "default": dict(),
+    "batch": dict(batch_size=100),
+    "headers_only": dict(batch_size=100, headers_only=True),
+    "full_headers": dict(batch_size=100, only_basic_headers=False, separate_sender_email=True),
+    "clean_body": dict(batch_size=100, clean_body_text=True),
+    "fast_engines": dict(batch_size=100, html_engine="stream", emoji_engine="fast"),
+    "no_emoji": dict(batch_size=100, emoji_support=False),
+    "record": dict(batch_size=100, record_type="record"),
+    "lazy": dict(batch_size=100, record_type="lazy"),
+    "attachments": dict(batch_size=100, return_attachments=True),
+    "workers": dict(batch_size=100, parse_workers=2),
+    "search_window": dict(batch_size=100, search_window=50),
+    "compress": dict(batch_size=100, compress=True),
+}
+
+
+def percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+def peak_rss_megabytes() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(address: tuple, options: dict, results: multiprocessing.Queue) -> None:
+    """
+    Run _get_emails against the benchmark server and put (messages, seconds, latencies, peak RSS, wire MB) in results.
+    Every record is read the way a typical consumer does: Subject and From only.
+    """
+    options = dict(options)
+    connector = EmailConnector("benchmark", email_provider="gmail")
+    connector._connection = CompressedIMAP4(*address)
+    connector._connection.login("benchmark", "benchmark")
+    if options.pop("compress", False):
+        connector._enable_compression()
+    parser = EmailParser(connector)
+
+    latencies = []
+    start = previous = time.perf_counter()
+    for record, _ in parser._get_emails(**options):
+        record["Subject"], record["From"]
+        now = time.perf_counter()
+        latencies.append(now - previous)
+        previous = now
+    seconds = time.perf_counter() - start
+    connector._connection.logout()
+    wire = connector._transfer_stats()["received_wire"] / 1024 / 1024
+    results.put((len(latencies), seconds, latencies, peak_rss_megabytes(), wire))
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(
+        description="Measure EmailParser._get_emails against an in-process IMAP server with a synthetic corpus."
+    )
+    arguments.add_argument("--messages", type=int, default=500)
+    arguments.add_argument("--kinds", nargs="+", default=list(MAIL_KINDS), choices=MAIL_KINDS)
+    arguments.add_argument("--attachment-kb", type=int, default=1024, help="size of attachments in KB")
+    arguments.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    corpus = mail_corpus(
+        options.messages, seed=options.seed, kinds=tuple(options.kinds), attachment_size=options.attachment_kb * 1024
+    )
+    megabytes = sum(len(message) for message in corpus) / 1024 / 1024
+    print(f"messages: {len(corpus)}, kinds: {', '.join(options.kinds)}, size: {megabytes:.2f} MB")
+
+    server = FakeIMAPServer(corpus)
+    address = server._start()
+    # Every case runs in a fresh process, so peak RSS belongs to that case only.
+    # Parse worker processes of the "workers" case are not included.
+    context = multiprocessing.get_context("spawn")
+    print(f"{'case':<14}{'msgs/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'MB/s':>10}{'peak RSS MB':>14}{'wire MB':>10}")
+    try:
+        for name in options.cases:
+            results = context.Queue()
+            process = context.Process(target=run_case, args=(address, CASES[name], results))
+            process.start()
+            messages, seconds, latencies, peak_rss, wire = results.get()
+            process.join()
+            print(
+                f"{name:<14}{messages / seconds:>10.1f}{percentile(latencies, 0.50) * 1000:>10.2f}"
+                f"{percentile(latencies, 0.99) * 1000:>10.2f}{megabytes / seconds:>10.2f}{peak_rss:>14.1f}{wire:>10.2f}"
+            )
+    finally:
+        server._stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = [
+    "python -m benchmark.bench_html_text",
+    "python -m benchmark.bench_html_text --corpus /path/to/newsletters",
+]
+
+import time
+import argparse
+from bs4 import BeautifulSoup
+from html_text import html_to_text
+from benchmark.corpus import load_html_corpus, newsletter_html
+
+
+def bs4_text(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").get_text()
+
+
+def measure(engine, documents: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            engine(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Compare html_to_text with BeautifulSoup.get_text.")
+    arguments.add_argument("--corpus", help="directory with .html/.eml newsletters; synthetic ones are used if omitted")
+    arguments.add_argument("--documents", type=int, default=200, help="number of synthetic newsletters")
+    arguments.add_argument("--repeat", type=int, default=3)
+    options = arguments.parse_args()
+
+    if options.corpus:
+        documents = load_html_corpus(options.corpus)
+    else:
+        documents = [newsletter_html(seed) for seed in range(options.documents)]
+    megabytes = sum(len(document) for document in documents) / 1024 / 1024
+
+    print(f"documents: {len(documents)}, size: {megabytes:.2f} MB")
+    results = {
+        "bs4": measure(bs4_text, documents, options.repeat),
+        "stream": measure(html_to_text, documents, options.repeat),
+    }
+    for engine, seconds in results.items():
+        print(
+            f"{engine:>7}: {seconds:.3f}s, {len(documents) / seconds:,.0f} docs/s, "
+            f"{megabytes / seconds:.1f} MB/s, x{results['bs4'] / seconds:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
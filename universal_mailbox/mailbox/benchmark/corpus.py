@@ -0,0 +1,145 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import email
+import random
+from typing import List
+from email.policy import SMTP
+from email.message import EmailMessage
+
+
+WORDS = (
+    "offer week sale new update team product launch today free shipping members "
+    "exclusive save discount event webinar report read more unsubscribe privacy"
+).split()
+EMOJIS = ["😀", "👍🏽", "🎉", "❤️", "👨‍👩‍👧", "🇵🇱", "🚀", "1️⃣", "🙂", "🔥"]
+EMOJI_WORDS = "Zażółć gęślą jaźń thanks for the update see you tomorrow".split()
+MAIL_KINDS = ("plain", "html", "multipart", "attachment", "emoji")
+
+
+def emoji_body(size: int, density: float, seed: int = 0) -> str:
+    """Build a body of roughly size characters where density is the share of tokens that are emojis."""
+
+    generator = random.Random(seed)
+    tokens = []
+    length = 0
+    while length < size:
+        token = generator.choice(EMOJIS) if generator.random() < density else generator.choice(EMOJI_WORDS)
+        tokens.append(token)
+        length += len(token) + 1
+    return " ".join(tokens)
+
+
+def newsletter_html(seed: int, sections: int = 12) -> str:
+    """Generate marketing-like HTML: nested tables, inline styles, tracking pixels and many links."""
+
+    generator = random.Random(seed)
+    rows = []
+    for section in range(sections):
+        words = " ".join(generator.choice(WORDS) for _ in range(generator.randint(20, 80)))
+        rows.append(
+            f'<tr><td style="padding:12px;font-family:Arial,sans-serif;color:#333333;">'
+            f'<h2 style="margin:0 0 8px 0;">Section {section} &amp; news</h2>'
+            f"<p>{words}&nbsp;&ndash; <b>{generator.choice(WORDS)}</b></p>"
+            f'<a href="https://example.com/track?u={seed}&amp;s={section}" '
+            f'style="background:#0a84ff;color:#fff;">Read more</a>'
+            f'<img src="https://example.com/pixel/{seed}/{section}.gif" width="1" height="1" alt="">'
+            f"</td></tr>"
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Weekly newsletter</title>"
+        "<style>td{font-size:14px} .btn{display:block}</style></head><body>"
+        '<table width="100%" cellpadding="0" cellspacing="0"><tbody>'
+        + "".join(rows)
+        + '</tbody></table><p><a href="https://example.com/unsubscribe">Unsubscribe</a></p>'
+        "<script>var tracking = '<b>not text</b>';</script></body></html>"
+    )
+
+
+def load_html_corpus(directory: str) -> List[str]:
+    """
+    Read text/html bodies from .html and .eml files of a directory, for example a dump of real newsletters.
+
+    Parameters
+    -----------
+    directory (str): directory with .html or .eml files.
+    """
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith((".html", ".htm")):
+            with open(path, "r", encoding="utf-8", errors="ignore") as file:
+                documents.append(file.read())
+        elif name.endswith(".eml"):
+            with open(path, "rb") as file:
+                message = email.message_from_binary_file(file)
+            for part in message.walk():
+                if part.get_content_type() == "text/html":
+                    charset = part.get_content_charset() or "utf-8"
+                    documents.append(part.get_payload(decode=True).decode(charset, "ignore"))
+    return documents
+
+
+def build_mail(kind: str, seed: int, attachment_size: int = 1024 * 1024) -> bytes:
+    """
+    Generate a raw RFC822 message with CRLF line endings.
+
+    Parameters
+    -----------
+    kind (str): one of MAIL_KINDS: "plain", "html", "multipart" (text and HTML alternatives),
+        "attachment" (text with a PDF of attachment_size bytes) or "emoji" (text with many emojis).
+    seed (int): seed of the generated content, also used in Subject and Message-ID.
+    attachment_size (int): size of the attachment in bytes.
+    """
+    generator = random.Random(seed)
+    text = " ".join(generator.choice(WORDS) for _ in range(generator.randint(50, 300)))
+    message = EmailMessage()
+    message["Subject"] = f"{generator.choice(WORDS).title()} {kind} message {seed}"
+    message["From"] = f"Sender {seed % 97} <sender{seed % 97}@example.com>"
+    message["To"] = "Receiver <receiver@example.com>"
+    message["CC"] = "Copy <copy@example.com>"
+    message["Date"] = f"Mon, {seed % 28 + 1:02d} Jan 2024 10:{seed % 60:02d}:00 +0000"
+    message["Message-ID"] = f"<{seed}.{kind}@example.com>"
+    message["X-Mailer"] = "benchmark"
+
+    if kind == "plain":
+        message.set_content(text)
+    elif kind == "html":
+        message.set_content(newsletter_html(seed), subtype="html")
+    elif kind == "multipart":
+        message.set_content(text)
+        message.add_alternative(newsletter_html(seed), subtype="html")
+    elif kind == "attachment":
+        message.set_content(text)
+        message.add_attachment(
+            b"%PDF-1.4\n" + generator.randbytes(attachment_size),
+            maintype="application",
+            subtype="pdf",
+            filename=f"report_{seed}.pdf",
+        )
+    elif kind == "emoji":
+        message.set_content(emoji_body(2_000, 0.3, seed))
+    else:
+        raise ValueError(f"Unknown message kind: {kind}")
+    return message.as_bytes(policy=SMTP)
+
+
+def mail_corpus(
+    count: int, seed: int = 0, kinds: tuple = MAIL_KINDS, attachment_size: int = 1024 * 1024
+) -> List[bytes]:
+    """
+    Generate count raw messages, cycling through kinds.
+
+    Parameters
+    -----------
+    count (int): number of messages.
+    seed (int): seed of the first message.
+    kinds (tuple): message kinds, see build_mail.
+    attachment_size (int): size of attachments of "attachment" messages in bytes.
+    """
+    return [build_mail(kinds[index % len(kinds)], seed + index, attachment_size) for index in range(count)]
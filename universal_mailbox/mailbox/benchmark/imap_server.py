@@ -0,0 +1,251 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import re
+import zlib
+import threading
+import socketserver
+from typing import List, Tuple
+
+
+_LITERAL = re.compile(rb"\{(\d+)\+?\}$")
+_HEADER_FIELDS = re.compile(r"HEADER\.FIELDS \(([^)]*)\)", re.IGNORECASE)
+
+
+def _header_block(raw_message: bytes) -> bytes:
+    for separator in (b"\r\n\r\n", b"\n\n"):
+        position = raw_message.find(separator)
+        if position != -1:
+            return raw_message[: position + len(separator)]
+    return raw_message
+
+
+def _header_fields(raw_message: bytes, fields: List[str]) -> bytes:
+    """Return the header lines (with continuations) of the requested fields, like BODY[HEADER.FIELDS (...)]."""
+    wanted = {field.upper().encode() for field in fields}
+    selected, keep = [], False
+    for line in _header_block(raw_message).splitlines(keepends=True):
+        if line[:1] in (b" ", b"\t"):
+            if keep:
+                selected.append(line)
+            continue
+        keep = line.split(b":", 1)[0].strip().upper() in wanted
+        if keep:
+            selected.append(line)
+    return b"".join(selected) + b"\r\n"
+
+
+class _InflatingReader:
+    """rfile replacement after COMPRESS DEFLATE: readline/read over the inflated client stream."""
+
+    def __init__(self, raw_file) -> None:
+        self._raw_file = raw_file
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._buffer = bytearray()
+
+    def __getattr__(self, name: str):
+        # flush, close and closed are used by StreamRequestHandler.finish.
+        return getattr(self._raw_file, name)
+
+    def _fill(self) -> bool:
+        data = self._raw_file.read1(65536)
+        self._buffer += self._decompressor.decompress(data)
+        return bool(data)
+
+    def readline(self) -> bytes:
+        while (position := self._buffer.find(b"\n")) == -1:
+            if not self._fill():
+                position = len(self._buffer) - 1
+                break
+        line = bytes(self._buffer[: position + 1])
+        del self._buffer[: position + 1]
+        return line
+
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) < size and self._fill():
+            pass
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class _DeflatingWriter:
+    """wfile replacement after COMPRESS DEFLATE, every write is sync-flushed."""
+
+    def __init__(self, raw_file) -> None:
+        self._raw_file = raw_file
+        self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    def __getattr__(self, name: str):
+        # flush, close and closed are used by StreamRequestHandler.finish.
+        return getattr(self._raw_file, name)
+
+    def write(self, data: bytes) -> None:
+        self._raw_file.write(self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+class _IMAPHandler(socketserver.StreamRequestHandler):
+    """Minimal IMAP4rev1 session: LOGIN, SELECT, (UID) SEARCH, (UID) FETCH, COMPRESS, NOOP, LOGOUT."""
+
+    # Small responses must not wait for delayed ACKs, the server would dominate per-message latency.
+    disable_nagle_algorithm = True
+
+    def handle(self) -> None:
+        self._send(b"* OK [CAPABILITY " + self._capabilities() + b"] benchmark server ready")
+        while True:
+            line = self._read_command()
+            if line is None:
+                return
+            tag, _, rest = line.partition(b" ")
+            command, _, arguments = rest.partition(b" ")
+            command = command.upper().decode()
+            uid = command == "UID"
+            if uid:
+                command, _, arguments = arguments.partition(b" ")
+                command = command.upper().decode()
+            handler = getattr(self, f"_command_{command.lower()}", None)
+            if handler is None:
+                self._send(tag + b" BAD unsupported command")
+                continue
+            if handler(arguments.decode("utf-8", "replace"), uid) is False:
+                self._send(tag + b" OK LOGOUT completed")
+                return
+            self._send(tag + f" OK {command} completed".encode())
+            if command == "COMPRESS":
+                # RFC 4978: both directions are deflated right after the tagged OK.
+                self.rfile, self.wfile = _InflatingReader(self.rfile), _DeflatingWriter(self.wfile)
+
+    def _capabilities(self) -> bytes:
+        return b"IMAP4rev1 COMPRESS=DEFLATE" if self.server._compress else b"IMAP4rev1"
+
+    def _send(self, line: bytes) -> None:
+        self.wfile.write(line + b"\r\n")
+
+    def _read_command(self) -> [bytes | None]:
+        """Read a command line, including literals sent after a continuation request."""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        line = line.rstrip(b"\r\n")
+        literal = _LITERAL.search(line)
+        while literal:
+            self._send(b"+ ready for literal")
+            data = self.rfile.read(int(literal.group(1)))
+            rest = self.rfile.readline().rstrip(b"\r\n")
+            line = line[: literal.start()] + b'"' + data + b'"' + rest
+            literal = _LITERAL.search(rest)
+        return line
+
+    def _messages(self, message_set: str, uid: bool) -> List[Tuple[int, int, bytes]]:
+        """Return (sequence number, uid, raw message) entries matching an IMAP sequence set."""
+        messages = self.server._messages
+        if not messages:
+            return []
+        highest = messages[-1][0] if uid else len(messages)
+        numbers = set()
+        for part in message_set.split(","):
+            start, _, end = part.partition(":")
+            start = highest if start == "*" else int(start)
+            end = start if not end else highest if end == "*" else int(end)
+            numbers.update(range(min(start, end), max(start, end) + 1))
+        return [
+            (sequence_number, message_uid, raw_message)
+            for sequence_number, (message_uid, raw_message) in enumerate(messages, start=1)
+            if (message_uid if uid else sequence_number) in numbers
+        ]
+
+    def _command_capability(self, arguments: str, uid: bool) -> None:
+        self._send(b"* CAPABILITY " + self._capabilities())
+
+    def _command_compress(self, arguments: str, uid: bool) -> None:
+        pass
+
+    def _command_login(self, arguments: str, uid: bool) -> None:
+        pass
+
+    def _command_noop(self, arguments: str, uid: bool) -> None:
+        pass
+
+    def _command_close(self, arguments: str, uid: bool) -> None:
+        pass
+
+    def _command_logout(self, arguments: str, uid: bool) -> bool:
+        self._send(b"* BYE benchmark server closing")
+        return False
+
+    def _command_select(self, arguments: str, uid: bool) -> None:
+        messages = self.server._messages
+        uidnext = messages[-1][0] + 1 if messages else 1
+        self._send(f"* {len(messages)} EXISTS".encode())
+        self._send(b"* OK [UIDVALIDITY 1] UIDs valid")
+        self._send(f"* OK [UIDNEXT {uidnext}] predicted next UID".encode())
+        self._send(b"* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)")
+
+    def _command_examine(self, arguments: str, uid: bool) -> None:
+        self._command_select(arguments, uid)
+
+    def _command_search(self, arguments: str, uid: bool) -> None:
+        # Only "UID <set>" narrows the result, other criteria match every message.
+        match = re.search(r"\bUID ([\d:*,]+)", arguments, re.IGNORECASE)
+        if match:
+            entries = self._messages(match.group(1), uid=True)
+        else:
+            entries = self._messages("1:*", uid=False)
+        numbers = [message_uid if uid else sequence_number for sequence_number, message_uid, _ in entries]
+        self._send(b"* SEARCH" + b"".join(f" {number}".encode() for number in numbers))
+
+    def _command_fetch(self, arguments: str, uid: bool) -> None:
+        message_set, _, items = arguments.partition(" ")
+        fields = _HEADER_FIELDS.search(items)
+        for sequence_number, message_uid, raw_message in self._messages(message_set, uid):
+            if fields:
+                name = f"BODY[HEADER.FIELDS ({fields.group(1).upper()})]"
+                payload = _header_fields(raw_message, fields.group(1).split())
+            elif "HEADER" in items.upper():
+                name, payload = "BODY[HEADER]", _header_block(raw_message)
+            else:
+                name, payload = "RFC822", raw_message
+            prefix = f"* {sequence_number} FETCH ({'UID %d ' % message_uid if uid else ''}{name} {{{len(payload)}}}"
+            self.wfile.write(prefix.encode() + b"\r\n" + payload + b")\r\n")
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    """
+    In-process IMAP server serving a fixed mailbox over plain TCP, for benchmarks without a live account:
+    server = FakeIMAPServer(messages)
+    host, port = server._start()
+    connector._connection = imaplib.IMAP4(host, port)
+
+    With compress=True the server announces COMPRESS=DEFLATE (RFC 4978), use compressed_imap.CompressedIMAP4 to enable it.
+    Every mailbox name selects the same messages, search criteria other than UID ranges match all of them.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, messages: list, host: str = "127.0.0.1", port: int = 0, compress: bool = True) -> None:
+        """
+        Parameters
+        -----------
+        messages (list): raw RFC822 messages, UIDs are assigned from 1.
+        host (str): address to listen on.
+        port (int): port to listen on, 0 picks a free port.
+        compress (bool): announce COMPRESS=DEFLATE.
+        """
+        super().__init__((host, port), _IMAPHandler)
+        self._messages = [(index + 1, message) for index, message in enumerate(messages)]
+        self._compress = compress
+        self._thread = None
+
+    def _start(self) -> Tuple[str, int]:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self.server_address
+
+    def _stop(self) -> None:
+        self.shutdown()
+        self.server_close()
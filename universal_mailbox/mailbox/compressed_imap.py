@@ -0,0 +1,127 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import zlib
+import imaplib
+from dataclasses import dataclass
+
+
+# imaplib refuses commands it does not know.
+imaplib.Commands.setdefault("COMPRESS", ("AUTH", "SELECTED"))
+
+
+@dataclass
+class TransferStats:
+    """
+    Bytes of a session before and after compression.
+
+    sent / received: IMAP protocol bytes as seen by imaplib.
+    sent_wire / received_wire: bytes that crossed the socket. Equal to the above until COMPRESS is active.
+    """
+
+    sent: int = 0
+    sent_wire: int = 0
+    received: int = 0
+    received_wire: int = 0
+
+    def _ratio(self) -> float:
+        """Protocol bytes per wire byte, for example 3.5 means the link carried 3.5x less data."""
+        wire = self.sent_wire + self.received_wire
+        return (self.sent + self.received) / wire if wire else 1.0
+
+    def _as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "sent_wire": self.sent_wire,
+            "received": self.received,
+            "received_wire": self.received_wire,
+            "ratio": round(self._ratio(), 2),
+        }
+
+
+class _CompressionMixin:
+    """
+    RFC 4978 COMPRESS=DEFLATE for imaplib sessions: connection._compress() after login.
+    Both directions become raw DEFLATE streams, every sent command is flushed with Z_SYNC_FLUSH.
+    """
+
+    def __init__(self, *args, compress_level: int = zlib.Z_DEFAULT_COMPRESSION, **kwargs) -> None:
+        self._transfer = TransferStats()
+        self._compress_level = compress_level
+        self._compressor = None
+        self._decompressor = None
+        self._inflated = bytearray()
+        super().__init__(*args, **kwargs)
+
+    def _server_capabilities(self) -> tuple:
+        """Ask for capabilities again, servers announce more of them after login."""
+        typ, data = self.capability()
+        if typ == "OK" and data and data[-1]:
+            self.capabilities = tuple(data[-1].decode("ascii", "replace").upper().split())
+        return self.capabilities
+
+    def _compress(self) -> bool:
+        """Start compression. Returns False when the server rejects COMPRESS DEFLATE."""
+        if self._compressor is not None:
+            return True
+        typ, _ = self._simple_command("COMPRESS", "DEFLATE")
+        if typ != "OK":
+            return False
+        self._compressor = zlib.compressobj(self._compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return True
+
+    def _compressed(self) -> bool:
+        return self._compressor is not None
+
+    def _inflate(self) -> None:
+        data = self.file.read1(65536)
+        if not data:
+            raise self.abort("socket error: EOF")
+        self._transfer.received_wire += len(data)
+        self._inflated += self._decompressor.decompress(data)
+
+    def read(self, size: int) -> bytes:
+        if self._decompressor is None:
+            data = super().read(size)
+            self._transfer.received_wire += len(data)
+        else:
+            while len(self._inflated) < size:
+                self._inflate()
+            data = bytes(self._inflated[:size])
+            del self._inflated[:size]
+        self._transfer.received += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        if self._decompressor is None:
+            line = super().readline()
+            self._transfer.received_wire += len(line)
+        else:
+            start = 0
+            while (position := self._inflated.find(b"\n", start)) == -1:
+                start = len(self._inflated)
+                self._inflate()
+            line = bytes(self._inflated[: position + 1])
+            del self._inflated[: position + 1]
+        self._transfer.received += len(line)
+        return line
+
+    def send(self, data: bytes) -> None:
+        self._transfer.sent += len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._transfer.sent_wire += len(data)
+        super().send(data)
+
+
+class CompressedIMAP4(_CompressionMixin, imaplib.IMAP4):
+    """imaplib.IMAP4 with COMPRESS=DEFLATE support and transfer counters."""
+
+
+class CompressedIMAP4_SSL(_CompressionMixin, imaplib.IMAP4_SSL):
+    """imaplib.IMAP4_SSL with COMPRESS=DEFLATE support and transfer counters."""
@@ -0,0 +1,188 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import time
+import threading
+from logger import logger
+from collections import deque
+from contextlib import contextmanager
+from email_connector import EmailConnector
+
+
+class ConnectionPool:
+    """
+    Bounded pool of authenticated IMAP sessions for one account.
+
+    Example:
+    pool = ConnectionPool("your_user", email_provider="gmail", size=4)
+    with pool._connection() as connector:
+        for data, _ in EmailParser(connector)._get_emails(batch_size=500):
+            ...
+    pool._close()
+    """
+
+    def __init__(
+        self,
+        mailbox: str,
+        email_provider: str,
+        size: int = 4,
+        settings: str = None,
+        console_messages: bool = False,
+        health_check_interval: float = 30.0,
+        compress: bool = False,
+    ) -> None:
+        """
+        Parameters
+        -----------
+        mailbox (str): key name under which the user was added to settings.json.
+        email_provider (str): imap server key name, for example: gmail, outlook, aol.
+        size (int): maximum number of sessions opened for the account.
+        settings (str): optional path to a json file with account settings, passed to EmailConnector._connect.
+        console_messages (bool): print connect/disconnect messages.
+        health_check_interval (float): seconds a session may stay idle before NOOP is sent on checkout.
+        compress (bool): open sessions with COMPRESS=DEFLATE when the server supports it.
+        """
+        self._mailbox = mailbox
+        self._email_provider = email_provider
+        self._size = size
+        self._settings = settings
+        self._console_messages = console_messages
+        self._health_check_interval = health_check_interval
+        self._compress = compress
+        self._idle = deque()
+        self._opened = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __str__(self) -> str:
+        return f"{self._mailbox} ({self._opened}/{self._size} sessions)"
+
+    def _create(self) -> EmailConnector:
+        """Open and authenticate a new session."""
+        connector = EmailConnector(
+            self._mailbox,
+            email_provider=self._email_provider,
+            console_messages=self._console_messages,
+            compress=self._compress,
+        )
+        connector._connect(self._settings)
+        return connector
+
+    def _discard(self, connector: EmailConnector) -> None:
+        """Log out a session without failing on a dead socket."""
+        try:
+            connector._connection.logout()
+        except Exception:
+            pass
+
+    def _healthy(self, connector: EmailConnector, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self._health_check_interval:
+            return True
+        return connector._noop()
+
+    def _acquire(self, timeout: float = None) -> [EmailConnector | None]:
+        """
+        Check out a healthy session. Blocks while all sessions are in use.
+
+        Parameters
+        -----------
+        timeout (float): seconds to wait for a free session. None waits forever.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    logger.error(f"Connection pool {self._mailbox} is closed.")
+                    return None
+                if self._idle:
+                    connector, idle_since = self._idle.pop()
+                    break
+                if self._opened < self._size:
+                    self._opened += 1
+                    connector, idle_since = None, None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.error(f"No free connection for {self._mailbox} after {timeout}s.")
+                    return None
+                self._condition.wait(remaining)
+
+        try:
+            if connector is None:
+                return self._create()
+            if not self._healthy(connector, idle_since):
+                logger.info(f"Reconnecting stale session of {self._mailbox}.")
+                self._discard(connector)
+                return self._create()
+            return connector
+        except (Exception, SystemExit) as e:
+            # EmailConnector calls sys.exit on configuration and login errors.
+            logger.exception(f"Cannot open session for {self._mailbox}: {e}")
+            self._free_slot()
+            return None
+        except BaseException:
+            # KeyboardInterrupt and the like still end the caller, but without leaking the slot.
+            self._free_slot()
+            raise
+
+    def _free_slot(self) -> None:
+        with self._condition:
+            self._opened -= 1
+            self._condition.notify()
+
+    def _release(self, connector: EmailConnector, broken: bool = False) -> None:
+        """
+        Return a session to the pool.
+
+        Parameters
+        -----------
+        connector (EmailConnector): session checked out with _acquire.
+        broken (bool): the session failed and must not be reused.
+        """
+        with self._condition:
+            if broken or self._closed:
+                self._opened -= 1
+            else:
+                self._idle.append((connector, time.monotonic()))
+            self._condition.notify()
+        if broken or self._closed:
+            self._discard(connector)
+
+    @contextmanager
+    def _connection(self, timeout: float = None):
+        """
+        Check out a session for the duration of a with block.
+        A session that raised an exception inside the block is replaced by a new one on the next checkout.
+
+        Parameters
+        -----------
+        timeout (float): seconds to wait for a free session.
+        """
+        connector = self._acquire(timeout=timeout)
+        if connector is None:
+            raise ConnectionError(f"No IMAP session available for {self._mailbox}.")
+        broken = False
+        try:
+            yield connector
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self._release(connector, broken=broken)
+
+    def _close(self) -> None:
+        """Log out all idle sessions. Sessions in use are logged out when released."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._condition.notify_all()
+        for connector, _ in idle:
+            self._discard(connector)
+        if self._console_messages:
+            print(f"Connection pool closed: {self._mailbox}")
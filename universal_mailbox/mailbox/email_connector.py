@@ -1,55 +1,45 @@
 #!/usr/bin/python3.11
 
 __created__ = "01.11.2023"
-__last_update__ = "05.11.2023"
+__last_update__ = "18.10.2026"
 __author__ = "https://github.com/pyautoml"
 
 import gc
 import os
 import sys
 import json
+import time
 import imaplib
+import threading
 from logger import logger
 from typing import Any, List
+from imap_utils import LineReader, parse_list_response, quote_mailbox
 from utils import absolute_path, load_json_data
+from compressed_imap import CompressedIMAP4_SSL
 
 
 class EmailConnector:
-    _instance: Any = None
-
     def __init__(
         self,
         mailbox: str,
         email_provider: str,
         console_messages: bool = False,
         settings_file_abs_path: str = None,
+        compress: bool = False,
     ) -> None:
+        """
+        Parameters
+        -----------
+        compress (bool): negotiate COMPRESS=DEFLATE (RFC 4978) after login when the server supports it.
+        """
         self._instancebox = mailbox
         self._set_email_provider(email_provider)
         self._console_messages = console_messages
+        self._compression = compress
 
         if settings_file_abs_path:
             self._settings_file_abs_path = settings_file_abs_path
 
-    def __new__(cls, *args, **kwargs):
-        """
-        Create singleton connector.
-
-        Parameters
-        -----------
-        cls - class instance
-        *args - objects as list
-        ** kwargs - objects as dict
-        """
-
-        try:
-            if cls._instance is None:
-                cls._instance = super(cls.__class__, cls).__new__(cls)
-            return cls._instance
-        except Exception as e:
-            logger.exception(f"{e}")
-            sys.exit(1)
-
     def __str__(self) -> str:
         return self._instancebox
 
@@ -59,10 +49,11 @@ class EmailConnector:
 
         return ["_load_settings", "_forbidden_access", "_settings_file_abs_path"]
 
-    @classmethod
-    def __setattr__(cls, attribute: str, value: Any) -> None:
+    def __setattr__(self, attribute: str, value: Any) -> None:
         """
-        Set class attributes. Disallow to add new attributes.
+        Set instance attributes. Disallow to add new attributes.
+        Every connector keeps its own state, so one process can hold several accounts
+        or several connections to one account (see ConnectionPool).
 
         Parameters
         -----------
@@ -70,18 +61,15 @@ class EmailConnector:
         value (str): attribute's value
         """
 
-        if attribute == "_instancebox":
-            cls._instancebox = value
-        elif attribute == "_instance":
-            cls._instance = "_instance"
-        elif attribute == "_connection":
-            cls._connection = value
-        elif attribute == "_console_messages":
-            cls._console_messages = value
-        elif attribute == "_email_provider":
-            cls._email_provider = value
-        elif attribute == "_settings_file_abs_path":
-            cls._settings_file_abs_path = value
+        if attribute in (
+            "_instancebox",
+            "_connection",
+            "_console_messages",
+            "_email_provider",
+            "_settings_file_abs_path",
+            "_compression",
+        ):
+            object.__setattr__(self, attribute, value)
         else:
             pass
 
@@ -150,17 +138,166 @@ class EmailConnector:
             logger.exception(f"{e}")
             sys.exit(1)
 
-    def _select(self, mailbox: str = "Inbox") -> None:
-        """Select a mailbox."""
+    def _select(self, mailbox: str = "Inbox") -> bool:
+        """Select a mailbox. Returns False when the server refused it."""
         try:
-            self._connection.select(mailbox=mailbox)
+            status, data = self._connection.select(mailbox=quote_mailbox(mailbox))
         except Exception as e:
             logger.exception(f"{e}")
+            return False
+        if status != "OK":
+            logger.error(f"{self._instancebox}: cannot select {mailbox}: {data}")
+            return False
+        return True
+
+    def _list_mailboxes(self, pattern: str = "*") -> [list | None]:
+        """
+        Return names of selectable mailboxes, for example: ["INBOX", "Archive/2024", "[Gmail]/Sent Mail"].
+        Mailboxes flagged \\Noselect or \\NonExistent are left out.
+
+        Parameters
+        -----------
+        pattern (str): LIST pattern, "*" lists the whole tree, "%" only the top level.
+        """
+        try:
+            status, data = self._connection.list('""', pattern)
+            if status != "OK":
+                logger.error(f"{self._instancebox}: LIST failed: {data}")
+                return None
+        except Exception as e:
+            logger.exception(f"{e}")
+            return None
+        return [
+            name
+            for flags, _, name in parse_list_response(data)
+            if not {flag.upper() for flag in flags} & {"\\NOSELECT", "\\NONEXISTENT"}
+        ]
+
+    def _uidvalidity(self) -> [int | None]:
+        """Return UIDVALIDITY of the selected mailbox."""
+        try:
+            _, data = self._connection.response("UIDVALIDITY")
+            return int(data[0]) if data and data[0] else None
+        except Exception as e:
+            logger.exception(f"{e}")
+            return None
+
+    def _uidnext(self) -> [int | None]:
+        """Return UIDNEXT of the selected mailbox."""
+        try:
+            _, data = self._connection.response("UIDNEXT")
+            return int(data[0]) if data and data[0] else None
+        except Exception as e:
+            logger.exception(f"{e}")
+            return None
+
+    def _capabilities(self) -> tuple:
+        """Return capabilities announced by the server, for example: ("IMAP4REV1", "IDLE")."""
+        capabilities = tuple(getattr(self._connection, "capabilities", ()))
+        if self._compressed():
+            # _idle waits on the raw socket, which carries deflated data once COMPRESS is active.
+            return tuple(capability for capability in capabilities if capability != "IDLE")
+        return capabilities
+
+    def _compressed(self) -> bool:
+        """Return True when the connection exchanges deflated data."""
+        compressed = getattr(self._connection, "_compressed", None)
+        return bool(compressed and compressed())
+
+    def _enable_compression(self) -> bool:
+        """Start COMPRESS=DEFLATE on a logged in connection, if the server supports it."""
+        try:
+            if "COMPRESS=DEFLATE" not in self._connection._server_capabilities():
+                logger.info(f"{self._instancebox}: server does not support COMPRESS=DEFLATE, staying uncompressed.")
+                return False
+            return self._connection._compress()
+        except Exception as e:
+            logger.exception(f"Cannot enable compression: {e}")
+            return False
+
+    def _transfer_stats(self) -> [dict | None]:
+        """
+        Return bytes exchanged by a connection opened with compress=True, for example:
+        {"sent": 310, "sent_wire": 190, "received": 524288, "received_wire": 131072, "ratio": 3.98}
+        """
+        transfer = getattr(self._connection, "_transfer", None)
+        return transfer._as_dict() if transfer is not None else None
+
+    def _idle(self, timeout: float, stop: threading.Event = None) -> [list | None]:
+        """
+        Wait in IDLE (RFC 2177) until the server reports a change, timeout passes or stop is set.
+        The connection always leaves IDLE before returning, so other commands can follow.
+        Returns untagged responses received meanwhile, for example: [b"* 12 EXISTS"], or None on errors.
+
+        Parameters
+        -----------
+        timeout (float): maximum time in IDLE in seconds, keep it below the server timeout (29 minutes).
+        stop (threading.Event): leave IDLE early when set, checked every second.
+        """
+        connection = self._connection
+        reader = LineReader(connection)
+        tag = connection._new_tag()
+        try:
+            connection.send(tag + b" IDLE\r\n")
+            responses = []
+            line = reader._readline(timeout=30)
+            while line is not None and line.startswith(b"*"):
+                # Untagged responses received before IDLE, for example buffered by imaplib.
+                responses.append(line)
+                line = reader._readline(timeout=30)
+            if line is None or not line.startswith(b"+"):
+                logger.error(f"IDLE rejected: {line}")
+                return None
+
+            deadline = time.monotonic() + timeout
+            while not responses and not (stop and stop.is_set()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                line = reader._readline(timeout=min(remaining, 1.0))
+                if line is not None:
+                    responses.append(line)
+
+            connection.send(b"DONE\r\n")
+            while True:
+                line = reader._readline(timeout=30)
+                if line is None:
+                    raise TimeoutError("No response to DONE")
+                if line.startswith(tag):
+                    break
+                responses.append(line)
+            return responses
+        except Exception as e:
+            logger.exception(f"IDLE failed: {e}")
             return None
+        finally:
+            # _new_tag registers the tag for imaplib's _command, which is not used here to wait for it.
+            connection.tagged_commands.pop(tag, None)
+
+    def _account_key(self) -> str:
+        """Identify the account independently of the settings file layout."""
+        return f"{self._instancebox}@{self._email_provider}"
 
-    def _search(self, search_filter: str = "ALL") -> None:
-        """Search with set up filter."""
-        status, data = self._connection.search(None, search_filter)
+    def _search(
+        self, search_filter: str = "ALL", uid: bool = False, charset: str = None, literal: bytes = None
+    ) -> None:
+        """
+        Search with set up filter.
+
+        Parameters
+        -----------
+        search_filter (str): IMAP search criteria.
+        uid (bool): run UID SEARCH and return UIDs instead of sequence numbers.
+        charset (str): CHARSET of search strings, for example: UTF-8
+        literal (bytes): string sent as IMAP literal after the criteria, see search_query.compile_query.
+        """
+        if literal is not None:
+            self._connection.literal = literal
+        if uid:
+            charset_arguments = ("CHARSET", charset) if charset else ()
+            status, data = self._connection.uid("SEARCH", *charset_arguments, search_filter)
+        else:
+            status, data = self._connection.search(charset, search_filter)
         if status == "OK":
             return data
         else:
@@ -170,6 +307,36 @@ class EmailConnector:
     def _fetch(self, message_id: str) -> str:
         return self._connection.fetch(message_id, "(RFC822)")
 
+    def _fetch_batch(
+        self, message_set: str, message_parts: str = "(RFC822)", uid: bool = False
+    ) -> [list | None]:
+        """
+        Fetch several messages with a single FETCH command.
+
+        Parameters
+        -----------
+        message_set (str): IMAP sequence set, for example: "1:500" or "1:3,7".
+        message_parts (str): message data items to fetch.
+        uid (bool): message_set contains UIDs, run UID FETCH.
+        """
+        if uid:
+            status, data = self._connection.uid("FETCH", message_set, message_parts)
+        else:
+            status, data = self._connection.fetch(message_set, message_parts)
+        if status == "OK":
+            return data
+        else:
+            logger.exception(f"{status}")
+            return None
+
+    def _noop(self) -> bool:
+        """Check if the connection is still alive."""
+        try:
+            status, _ = self._connection.noop()
+            return status == "OK"
+        except Exception:
+            return False
+
     def _connect(self, settings: str = None) -> None:
         """Connect to the specified email account."""
 
@@ -187,12 +354,15 @@ class EmailConnector:
                 sys.exit(1)
 
         try:
-            self._connection = imaplib.IMAP4_SSL(
+            imap_class = CompressedIMAP4_SSL if self._compression else imaplib.IMAP4_SSL
+            self._connection = imap_class(
                 settings["imap_server"], settings["imap_port"]
             )
             self._connection.login(
                 settings["email_address"], settings["email_password"]
             )
+            if self._compression:
+                self._enable_compression()
             del settings
             gc.collect()
 
@@ -1,33 +1,75 @@
 #!/usr/bin/python3.11
 
 __created__ = "01.11.2023"
-__last_update__ = "05.11.2023"
+__last_update__ = "18.10.2026"
 __author__ = "https://github.com/pyautoml"
 
 import re
-import gc
 import os
 import sys
 import email
 import emoji
-from copy import deepcopy
+import pickle
+import asyncio
+import threading
 from logger import logger
 from typing import Any, List
 from datetime import datetime
 from bs4 import BeautifulSoup
-from functools import lru_cache
+from run_stats import RunStats
 from utils import absolute_path
-from email.parser import Parser
-from typing import Final, Generator
-from email.header import decode_header
-from dataclasses import dataclass, field
+from html_text import html_to_text
+from emoji_text import demojize_text
+from search_index import SearchIndex
+from idle_listener import IdleListener
+from message_cache import MessageCache
+from parse_pipeline import ParsePipeline
 from email_connector import EmailConnector
+from address_parsing import AddressTable
+from attachment_store import AttachmentStore
+from header_decoding import decode_header_value
+from dataclasses import dataclass, field, replace
+from email.parser import BytesHeaderParser, Parser
+from sync_state import SyncStateStore, UidWatermark
+from search_query import SearchQuery, compile_query, uid_range
+from attachment_stream import AttachmentHandle, stream_attachment
+from imap_utils import chunks, parse_fetch_response, sequence_set
+from typing import AsyncGenerator, Callable, Final, Generator, Iterable
+from email_record import EmailRecord, LazyEmailRecord, columns, record_keys
+
+
+BASIC_HEADER_FIELDS: Final[tuple] = (
+    "SUBJECT",
+    "FROM",
+    "TO",
+    "CC",
+    "BCC",
+    "DATE",
+    "REPLY-TO",
+    "MESSAGE-ID",
+)
+
+BOOLEAN_FILTERS: Final[frozenset] = frozenset(
+    {
+        "seen",
+        "unseen",
+        "answered",
+        "unanswered",
+        "deleted",
+        "flagged",
+        "high_priority",
+        "low_priority",
+        "has_attachment",
+    }
+)
+INT_FILTERS: Final[frozenset] = frozenset({"attachment_smaller_than", "attachment_larger_than"})
 
 
 @dataclass
 class EmailParser:
     _mail: EmailConnector
     _parser: Parser = Parser()
+    _header_parser: BytesHeaderParser = BytesHeaderParser()
     _filter_tags: dict = field(
         default_factory=lambda: {
             "body": "BODY",
@@ -73,6 +115,9 @@ class EmailParser:
     _blocked_file_extensions: Final[list] = field(
         default_factory=lambda: [".7z", ".zip", ".tar", ".gzip"]
     )
+    _run_stats: RunStats = field(default_factory=RunStats)
+    _address_table: AddressTable = field(default_factory=AddressTable)
+    _watermark: UidWatermark = field(default_factory=UidWatermark)
 
     def __hash__(self):
         return hash(tuple())
@@ -103,8 +148,7 @@ class EmailParser:
         attachment_smaller_than: int = None,
         attachment_larger_than: int = None,
     ) -> dict:
-        requested_filter_parameters = deepcopy(self._filter_tags)
-        possible_values = [
+        possible_values = (
             body,
             by_keyword,
             subject,
@@ -128,50 +172,22 @@ class EmailParser:
             has_attachment,
             attachment_smaller_than,
             attachment_larger_than,
-        ]
-        boolean_values = [
-            "seen",
-            "unseen",
-            "answered",
-            "unanswered",
-            "deleted",
-            "flagged",
-            "high_priority",
-            "low_priority",
-            "has_attachment",
-        ]
-        int_values = ["attachment_smaller_than", "attachment_larger_than"]
+        )
 
-        for key, value in zip(self._filter_tags.keys(), possible_values):
-            if key in boolean_values:
-                requested_filter_parameters[key] = (
-                    f"{self._filter_tags[key]}" if value else None
-                )
-            elif key in int_values:
-                requested_filter_parameters[key] = (
-                    f"{self._filter_tags[key]} {value}" if value else None
-                )
+        parameters = []
+        for (key, tag), value in zip(self._filter_tags.items(), possible_values):
+            if not value:
+                continue
+            if key in BOOLEAN_FILTERS:
+                parameters.append(tag)
+            elif key in INT_FILTERS:
+                parameters.append(f"{tag} {value}")
             else:
-                requested_filter_parameters[key] = (
-                    f'{self._filter_tags[key]} "{value}"' if value else None
-                )
-
-        cleaned_parameters = ""
-        for value in requested_filter_parameters.values():
-            if value:
-                cleaned_parameters += value + " "
-        cleaned_parameters = cleaned_parameters[:-1]
-
-        del requested_filter_parameters
-        gc.collect()
-        return f"({cleaned_parameters.rstrip()})"
+                parameters.append(f'{tag} "{value}"')
+        return f"({' '.join(parameters)})"
 
     def _decode_headers(self, data: str) -> str:
-        try:
-            subject, charset = decode_header(data)[0]
-            return subject if charset is None else subject.decode(charset)
-        except:
-            return data
+        return decode_header_value(data)
 
     def _parse_timestamp(self, date: str) -> str:
         parsed_date = datetime.strptime(date, "%a, %d %b %Y %H:%M:%S %z")
@@ -219,13 +235,6 @@ class EmailParser:
                 "Thread-Index": email["thread-index"],
             }
 
-    def _separate_sender_and_email(self, data: str) -> dict:
-        try:
-            sender, email = data.split("<")
-            return sender.strip(), email[:-1].strip()
-        except:
-            return data
-
     def _save_attachment_locally(
         self,
         email_timestamp: str,
@@ -252,6 +261,48 @@ class EmailParser:
             logger.critical(f"Cannot save attachment: {e}")
             sys.exit(1)
 
+    def _stream_attachment(
+        self,
+        part,
+        file_name: str,
+        email_timestamp: str,
+        save_attachment: bool = False,
+        local_path: str = None,
+        attachment_sink: Callable = None,
+    ) -> [AttachmentHandle | None]:
+        """
+        Decode an attachment in chunks straight to disk or to a caller-supplied sink.
+        Returns None when the attachment cannot be decoded or written, the error is logged.
+
+        Parameters
+        -----------
+        attachment_sink (Callable): called with the file name, returns a writable binary object.
+            Used instead of the local file when set.
+        """
+        try:
+            if attachment_sink is not None:
+                sink = attachment_sink(file_name)
+            elif save_attachment:
+                sink = os.path.join(
+                    self._attachments_directory(local_path),
+                    f"{email_timestamp}_{os.path.basename(file_name)}",
+                )
+            else:
+                sink = None
+            return stream_attachment(part, file_name, sink=sink)
+        except Exception as e:
+            # A single malformed attachment must not end the run, it is skipped.
+            logger.exception(f"Cannot decode attachment {file_name}: {e}")
+            return None
+
+    def _attachments_directory(self, local_path: str = None) -> str:
+        if not local_path:
+            local_path = absolute_path("attachments")
+        elif not os.path.exists(local_path) and os.path.exists(absolute_path(local_path)):
+            local_path = absolute_path(local_path)
+        os.makedirs(local_path, exist_ok=True)
+        return local_path
+
     def _find_attachments(
         self,
         email_message,
@@ -259,6 +310,9 @@ class EmailParser:
         save_attachment: bool = False,
         local_path: str = None,
         return_attachments: bool = False,
+        stream_attachments: bool = False,
+        attachment_sink: Callable = None,
+        attachment_store: AttachmentStore = None,
     ) -> [list | None]:
         attachments = []
         for part in email_message.walk():
@@ -267,8 +321,29 @@ class EmailParser:
             if part.get("Content-Disposition") is not None:
                 filename = part.get_filename()
                 if filename:
-                    attachment_data = part.get_payload(decode=True)
                     file_extension = os.path.splitext(filename)[1].lower()
+                    if file_extension in self._accepted_file_extensions and attachment_store:
+                        handle = attachment_store._store(
+                            part,
+                            file_name=filename,
+                            message_id=str(email_message["message-id"]).strip("<> "),
+                        )
+                        if handle is not None:
+                            attachments.append(handle)
+                        continue
+                    if file_extension in self._accepted_file_extensions and stream_attachments:
+                        handle = self._stream_attachment(
+                            part,
+                            file_name=filename,
+                            email_timestamp=email_timestamp,
+                            save_attachment=save_attachment,
+                            local_path=local_path,
+                            attachment_sink=attachment_sink,
+                        )
+                        if handle is not None:
+                            attachments.append(handle)
+                        continue
+                    attachment_data = part.get_payload(decode=True)
                     if file_extension in self._accepted_file_extensions:
                         if save_attachment:
                             self._save_attachment_locally(
@@ -284,6 +359,7 @@ class EmailParser:
                     else:
                         logger.critical("Unsupported file extension: {file_name}")
                         return None
+        self._run_stats._add_attachments(attachments)
         if return_attachments:
             return attachments
         else:
@@ -302,7 +378,18 @@ class EmailParser:
             )
         return text
 
-    def _replace_emojis_with_text(self, text: str) -> str:
+    def _replace_emojis_with_text(self, text: str, emoji_engine: str = "legacy") -> str:
+        """
+        Replace emojis with their text names, for example: 😀 -> :grinning_face:
+
+        Parameters
+        -----------
+        emoji_engine (str): "legacy" demojizes every match with a separate str.replace,
+            "fast" translates the text in one pass with a memoized table and keeps ZWJ sequences, flags and skin tones whole.
+        """
+        if emoji_engine == "fast":
+            return demojize_text(text)
+
         emojis = [
             match.group()
             for match in re.finditer(
@@ -315,7 +402,15 @@ class EmailParser:
             text = text.replace(e, emoji.demojize(e))
         return text
 
-    def _extract_email_body(self, email_message):
+    def _extract_email_body(self, email_message, html_engine: str = "bs4"):
+        """
+        Join text of all text/plain and text/html parts.
+
+        Parameters
+        -----------
+        html_engine (str): "bs4" builds a BeautifulSoup tree for every text/html part,
+            "stream" uses the single-pass html_to_text extractor and keeps link targets.
+        """
         body = ""
 
         if email_message.is_multipart():
@@ -330,101 +425,193 @@ class EmailParser:
                             charset, "ignore"
                         )
 
-                        if content_type == "text/html":
+                        if content_type == "text/html" and html_engine == "stream":
+                            email_text = html_to_text(email_text)
+                        elif content_type == "text/html":
                             soup = BeautifulSoup(email_text, "html.parser")
                             email_text = soup.get_text()
                         body += email_text
         return body
 
-    @lru_cache(maxsize=100, typed=True)
-    def _get_emails(
+    def _record(self, decoded_data: dict, record_type: str = "dict") -> [dict | EmailRecord]:
+        if record_type == "record":
+            return EmailRecord._from_dict(decoded_data)
+        return {key: decoded_data[key] for key in sorted(decoded_data)}
+
+    def _fetch_messages(
         self,
-        mailbox: str = "Inbox",
+        message_ids: list,
+        batch_size: int = None,
+        uid: bool = False,
+        message_parts: str = "(RFC822)",
+    ) -> Generator:
+        """
+        Fetch raw RFC822 messages, one FETCH per message or one FETCH per batch.
+        Yields (message id, raw message) tuples in the order of message_ids.
+
+        Parameters
+        -----------
+        message_ids (list): sequence numbers or UIDs returned by search.
+        batch_size (int): number of messages requested with a single FETCH command. None fetches messages one by one.
+        uid (bool): message_ids are UIDs, use UID FETCH.
+        message_parts (str): message data items to fetch, for example: (BODY.PEEK[HEADER]).
+        """
+        if not batch_size and not uid and message_parts == "(RFC822)":
+            for message_id in message_ids:
+                with self._run_stats._stage("fetch"):
+                    _, message_data = self._mail._fetch(message_id)
+                self._run_stats._add_fetch([message_data[0][1]])
+                yield int(message_id), message_data[0][1]
+            return
+
+        for chunk in chunks(message_ids, batch_size or 1):
+            with self._run_stats._stage("fetch"):
+                data = self._mail._fetch_batch(
+                    sequence_set(chunk), message_parts=message_parts, uid=uid
+                )
+            if data is None:
+                continue
+            yield from self._split_fetch_response(chunk, data, uid)
+
+    def _split_fetch_response(self, chunk: list, data: list, uid: bool = False) -> Generator:
+        """
+        Split a FETCH response of one batch into (message id, raw message) tuples in the order of chunk.
+        Messages missing in the response are logged and skipped. Shared by _fetch_messages and _afetch_messages.
+
+        Parameters
+        -----------
+        chunk (list): sequence numbers or UIDs requested with the FETCH command.
+        data (list): response data returned by _fetch_batch.
+        uid (bool): chunk contains UIDs.
+        """
+        fetched = {
+            message_uid if uid else sequence_number: payload
+            for sequence_number, message_uid, payload in parse_fetch_response(data)
+        }
+        self._run_stats._add_fetch(list(fetched.values()))
+        del data
+
+        for message_id in chunk:
+            raw_message = fetched.pop(int(message_id), None)
+            if raw_message is None:
+                logger.error(f"Message {message_id!r} missing in FETCH response.")
+                continue
+            yield int(message_id), raw_message
+
+    def _parse_message(
+        self,
+        email_message,
         emoji_support: bool = True,
         clean_body_text: bool = False,
         format_datetime: bool = False,
         return_attachments: bool = False,
         save_attachments: bool = False,
         save_attachments_path: str = None,
-        search_filter: str = "ALL",
         only_basic_headers: bool = True,
         separate_sender_email: bool = False,
-    ) -> Generator:
-        self._mail._select(mailbox=mailbox)
-        data = self._mail._search(search_filter)
-        message_ids = data[0].split()
+        headers_only: bool = False,
+        stream_attachments: bool = False,
+        attachment_sink: Callable = None,
+        attachment_store: AttachmentStore = None,
+        html_engine: str = "bs4",
+        emoji_engine: str = "legacy",
+        record_type: str = "dict",
+    ) -> tuple:
+        decoded_data = self._decoded_headers(
+            email_message,
+            only_basic_headers=only_basic_headers,
+            format_datetime=format_datetime,
+            separate_sender_email=separate_sender_email,
+        )
+
+        if headers_only:
+            decoded_data["Body"] = None
+            return self._record(decoded_data, record_type), None
+
+        decoded_data["Body"] = self._body_text(
+            email_message,
+            emoji_support=emoji_support,
+            clean_body_text=clean_body_text,
+            html_engine=html_engine,
+            emoji_engine=emoji_engine,
+        )
+        decoded_data = self._record(decoded_data, record_type)
 
-        for message_id in message_ids:
-            _, message_data = self._mail._fetch(message_id)
-            email_message = email.message_from_bytes(message_data[0][1])
-            email_body = self._extract_email_body(email_message)
+        attachments = self._message_attachments(
+            email_message,
+            decoded_data["Date"],
+            format_datetime=format_datetime,
+            return_attachments=return_attachments,
+            save_attachments=save_attachments,
+            save_attachments_path=save_attachments_path,
+            stream_attachments=stream_attachments,
+            attachment_sink=attachment_sink,
+            attachment_store=attachment_store,
+        )
+        return decoded_data, attachments
+
+    def _decoded_headers(
+        self,
+        email_message,
+        only_basic_headers: bool = True,
+        format_datetime: bool = False,
+        separate_sender_email: bool = False,
+    ) -> dict:
+        """Decode header fields of a message. The "Body" key is None."""
+        with self._run_stats._stage("headers"):
             headers = self._headers(
                 email_message, only_basic_headers=only_basic_headers
             )
 
-            decoded_data = {}
-            for key, value in headers.items():
-                decoded_data[key] = self._decode_headers(value)
-
-            if emoji_support:
-                email_body = self._replace_emojis_with_text(email_body)
+            decoded_data = {key: self._decode_headers(value) for key, value in headers.items()}
 
             decoded_data["Message-ID"] = str(decoded_data["Message-ID"])[1:-1]
 
-            if format_datetime:
+            if separate_sender_email:
+                self._separate_sender_emails(decoded_data, headers)
+
+        if format_datetime:
+            with self._run_stats._stage("timestamp"):
                 decoded_data["Date"] = self._parse_timestamp(decoded_data["Date"])
+        return decoded_data
 
-            if separate_sender_email:
-                if decoded_data["From"]:
-                    try:
-                        from_sender, from_email = self._separate_sender_and_email(
-                            decoded_data["From"]
-                        )
-                        decoded_data["From"] = from_sender
-                        decoded_data["From Email"] = from_email
-                    except:
-                        pass
-
-                if decoded_data["CC"]:
-                    try:
-                        cc_sender, cc_email = self._separate_sender_and_email(
-                            decoded_data["CC"]
-                        )
-                        decoded_data["CC"] = cc_sender
-                        decoded_data["CC Email"] = cc_email
-                    except:
-                        pass
-
-                if decoded_data["BCC"]:
-                    try:
-                        cc_sender, cc_email = self._separate_sender_and_email(
-                            decoded_data["BCC"]
-                        )
-                        decoded_data["BCC"] = cc_sender
-                        decoded_data["BCC Email"] = cc_email
-                    except:
-                        pass
-
-                if decoded_data["Reply-To"]:
-                    try:
-                        reply_sender, reply_email = self._separate_sender_and_email(
-                            decoded_data["Reply-To"]
-                        )
-                        decoded_data["Reply-To"] = reply_sender
-                        decoded_data["Reply-To Email"] = reply_email
-                    except:
-                        pass
-
-                if decoded_data["To"]:
-                    try:
-                        to_sender, to_email = self._separate_sender_and_email(
-                            decoded_data["To"]
-                        )
-                        decoded_data["To"] = to_sender
-                        decoded_data["To Email"] = to_email
-                    except:
-                        pass
+    def _separate_sender_emails(self, decoded_data: dict, headers: dict = None) -> None:
+        """
+        Move addresses of From, CC, BCC, Reply-To and To to "... Email" keys, display names stay in the original keys.
+        Several recipients are joined with ", " and display names with commas are quoted, for example:
+        "To": 'Jan, "Nowak, Anna"', "To Email": "jan@example.com, anna@example.com"
+        Parsed values are interned in self._address_table for the duration of the run.
+
+        Parameters
+        -----------
+        decoded_data (dict): decoded header fields.
+        headers (dict): raw header fields, parsed instead of decoded_data so that encoded display names
+            with commas do not split addresses.
+        """
+        headers = headers or decoded_data
+        for key in ("From", "CC", "BCC", "Reply-To", "To"):
+            if headers[key]:
+                separated = self._address_table._split(headers[key])
+                if separated is not None:
+                    decoded_data[key], decoded_data[f"{key} Email"] = separated
 
+    def _body_text(
+        self,
+        email_message,
+        emoji_support: bool = True,
+        clean_body_text: bool = False,
+        html_engine: str = "bs4",
+        emoji_engine: str = "legacy",
+    ) -> str:
+        """Extract the text of a message body, see _parse_message for the options."""
+        with self._run_stats._stage("body"):
+            email_body = self._extract_email_body(email_message, html_engine=html_engine)
+
+        if emoji_support:
+            with self._run_stats._stage("emoji"):
+                email_body = self._replace_emojis_with_text(email_body, emoji_engine=emoji_engine)
+
+        with self._run_stats._stage("body"):
             try:
                 self._replace_html_tags_with_links(email_body)
             except:
@@ -433,28 +620,702 @@ class EmailParser:
             if clean_body_text:
                 email_body = re.sub(r"\s+", " ", str(email_body))
                 email_body = email_body.split("\n")
-                decoded_data["Body"] = str(email_body[0]).lstrip().rstrip()
-            else:
-                decoded_data["Body"] = email_body
-            decoded_data = {key: decoded_data[key] for key in sorted(decoded_data)}
+                return str(email_body[0]).lstrip().rstrip()
+        return email_body
 
+    def _message_attachments(
+        self,
+        email_message,
+        date: str,
+        format_datetime: bool = False,
+        return_attachments: bool = False,
+        save_attachments: bool = False,
+        save_attachments_path: str = None,
+        stream_attachments: bool = False,
+        attachment_sink: Callable = None,
+        attachment_store: AttachmentStore = None,
+    ) -> [list | None]:
+        """Save, stream or return attachments of a message. Returns them only with return_attachments."""
+        with self._run_stats._stage("timestamp"):
             attachment_timestamp = (
-                str(self._parse_timestamp(decoded_data["Date"]))
+                str(self._parse_timestamp(date))
                 .replace(" ", "_")
                 .replace(":", "-")
                 if not format_datetime
-                else str(decoded_data["Date"]).replace(" ", "_").replace(":", "-")
+                else str(date).replace(" ", "_").replace(":", "-")
             )
 
+        with self._run_stats._stage("attachments"):
             attachments = self._find_attachments(
                 email_message=email_message,
                 email_timestamp=attachment_timestamp,
                 save_attachment=save_attachments,
                 local_path=save_attachments_path,
                 return_attachments=return_attachments,
+                stream_attachments=stream_attachments,
+                attachment_sink=attachment_sink,
+                attachment_store=attachment_store,
             )
 
-            if return_attachments:
+        if return_attachments:
+            return attachments
+        else:
+            return None
+
+    def _message_parts(self, headers_only: bool, only_basic_headers: bool) -> str:
+        """Return FETCH data items for the requested retrieval mode."""
+        if not headers_only:
+            return "(RFC822)"
+        elif only_basic_headers:
+            return f"(BODY.PEEK[HEADER.FIELDS ({' '.join(BASIC_HEADER_FIELDS)})])"
+        else:
+            return "(BODY.PEEK[HEADER])"
+
+    def _resume_uid(
+        self,
+        sync_state: SyncStateStore,
+        account: str,
+        mailbox: str,
+        uidvalidity: int,
+        since_uid: int = None,
+    ) -> [int | None]:
+        """Return the UID after which incremental sync continues. None means full sync."""
+        state = sync_state._load(account, mailbox)
+        if state and state["uidvalidity"] == uidvalidity:
+            return max(state["last_uid"], since_uid or 0)
+        elif state:
+            logger.info(f"UIDVALIDITY of {account}/{mailbox} changed, full resync.")
+        return since_uid
+
+    def _uid_filter(self, search_filter: str, since_uid: int = None, until_uid: int = None) -> str:
+        """Restrict search criteria to UIDs greater than since_uid and, with until_uid, not greater than until_uid."""
+        if until_uid:
+            return f"UID {(since_uid or 0) + 1}:{until_uid} {search_filter}"
+        if since_uid:
+            return f"UID {since_uid + 1}:* {search_filter}"
+        return search_filter
+
+    def _search_arguments(
+        self, search_filter: [str | SearchQuery], since_uid: int = None, until_uid: int = None
+    ) -> dict:
+        """
+        Keyword arguments of EmailConnector._search for a criteria string or a SearchQuery expression.
+
+        Parameters
+        -----------
+        search_filter (str | SearchQuery): for example: "ALL", self._set_filter(...) or
+            (Term("FROM", "a@b.com") | Term("FROM", "c@d.com")) & Term("SINCE", "01-Jan-2024")
+        since_uid (int): restrict the search to UIDs greater than this value.
+        until_uid (int): restrict the search to UIDs not greater than this value.
+        """
+        if not isinstance(search_filter, SearchQuery):
+            return {"search_filter": self._uid_filter(search_filter, since_uid, until_uid)}
+        if since_uid or until_uid:
+            search_filter = search_filter & uid_range((since_uid or 0) + 1, until_uid)
+        compiled = compile_query(search_filter)
+        return {"search_filter": compiled.criteria, "charset": compiled.charset, "literal": compiled.literal}
+
+    def _search_windows(
+        self, search_filter: [str | SearchQuery], since_uid: int = None, search_window: int = 5000
+    ) -> Generator:
+        """
+        Yield UIDs matching search_filter window by window, one UID SEARCH per search_window UIDs,
+        from since_uid + 1 up to the highest UID at the start of the run.
+        The next window is searched only after the consumer took the previous one,
+        so at most one window of UIDs is held in memory.
+
+        Parameters
+        -----------
+        search_filter (str | SearchQuery): search criteria.
+        since_uid (int): start after this UID.
+        search_window (int): number of UIDs covered by a single UID SEARCH.
+        """
+        uidnext = self._mail._uidnext()
+        if uidnext:
+            highest = uidnext - 1
+        else:
+            data = self._mail._search("UID *", uid=True)
+            highest = max(map(int, data[0].split()), default=0) if data else 0
+
+        for start in range((since_uid or 0) + 1, highest + 1, search_window):
+            end = min(start + search_window - 1, highest)
+            data = self._mail._search(uid=True, **self._search_arguments(search_filter, start - 1, end))
+            if data and data[0]:
+                yield data[0].split()
+
+    def _newer_than(self, message_ids: list, since_uid: int = None) -> list:
+        """Drop UIDs not greater than since_uid. "n:*" always matches the newest message, even below n."""
+        if since_uid:
+            return [uid for uid in message_ids if int(uid) > since_uid]
+        return message_ids
+
+    def _worker_copy(self) -> "EmailParser":
+        """Copy of the parser without the connector, safe to send to worker processes."""
+        return replace(
+            self, _mail=None, _run_stats=RunStats(), _address_table=AddressTable(), _watermark=UidWatermark()
+        )
+
+    def _parse_raw_message(
+        self,
+        raw_message: bytes,
+        headers_only: bool = False,
+        search_index: SearchIndex = None,
+        search_scope: tuple = None,
+        **options,
+    ) -> tuple:
+        """
+        Parse raw message bytes returned by FETCH.
+
+        Parameters
+        -----------
+        raw_message (bytes): RFC822 message or header block when headers_only is set.
+        headers_only (bool): raw_message contains headers only.
+        search_index (SearchIndex): index the parsed message.
+        search_scope (tuple): (account, mailbox) the message belongs to, required with search_index.
+        **options: keyword arguments of _parse_message.
+        """
+        self._run_stats._add_message()
+        if options.get("record_type") == "lazy":
+            decoded_data = LazyEmailRecord(self, raw_message, headers_only=headers_only, **options)
+            if search_index is None:
+                return decoded_data, None
+            email_message, attachments = decoded_data._message, None
+        else:
+            with self._run_stats._stage("mime"):
+                if headers_only:
+                    email_message = self._header_parser.parsebytes(raw_message)
+                else:
+                    email_message = email.message_from_bytes(raw_message)
+            decoded_data, attachments = self._parse_message(email_message, headers_only=headers_only, **options)
+        if search_index is not None:
+            account, mailbox = search_scope
+            attachment_names = self._attachment_names(email_message)
+            with self._run_stats._stage("index"):
+                search_index._add(
+                    account,
+                    mailbox,
+                    decoded_data,
+                    attachment_names=attachment_names,
+                    size=None if headers_only else len(raw_message),
+                )
+        return decoded_data, attachments
+
+    def _attachment_names(self, email_message) -> List[str]:
+        return [
+            part.get_filename()
+            for part in email_message.walk()
+            if part.get_content_maintype() != "multipart"
+            and part.get("Content-Disposition") is not None
+            and part.get_filename()
+        ]
+
+    def _cached_fetch_messages(
+        self,
+        message_cache: MessageCache,
+        mailbox: str,
+        uidvalidity: int,
+        message_ids: list,
+        batch_size: int = None,
+        message_parts: str = "(RFC822)",
+    ) -> Generator:
+        """
+        Serve messages from the local cache and fetch only the missing ones with UID FETCH.
+        Full RFC822 downloads are added to the cache.
+        """
+        account = self._mail._account_key()
+        for window in chunks(message_ids, max(batch_size or 1, 100)):
+            uids = [int(uid) for uid in window]
+            cached = message_cache._get_many(account, mailbox, uidvalidity, uids)
+            self._run_stats.cache_hits += len(cached)
+            missing = [uid for uid in uids if uid not in cached]
+            fetched = dict(
+                self._fetch_messages(
+                    missing, batch_size=batch_size, uid=True, message_parts=message_parts
+                )
+            )
+            if message_parts == "(RFC822)":
+                for uid, raw_message in fetched.items():
+                    message_cache._put(account, mailbox, uidvalidity, uid, raw_message)
+
+            for uid in uids:
+                raw_message = cached.pop(uid, None) or fetched.pop(uid, None)
+                if raw_message is not None:
+                    yield uid, raw_message
+
+    def _get_emails(
+        self,
+        mailbox: str = "Inbox",
+        emoji_support: bool = True,
+        clean_body_text: bool = False,
+        format_datetime: bool = False,
+        return_attachments: bool = False,
+        save_attachments: bool = False,
+        save_attachments_path: str = None,
+        search_filter: [str | SearchQuery] = "ALL",
+        only_basic_headers: bool = True,
+        separate_sender_email: bool = False,
+        batch_size: int = None,
+        incremental: bool = False,
+        sync_state: SyncStateStore = None,
+        since_uid: int = None,
+        headers_only: bool = False,
+        parse_workers: int = None,
+        ordered: bool = True,
+        stream_attachments: bool = False,
+        attachment_sink: Callable = None,
+        attachment_store: AttachmentStore = None,
+        message_cache: MessageCache = None,
+        html_engine: str = "bs4",
+        emoji_engine: str = "legacy",
+        record_type: str = "dict",
+        search_index: SearchIndex = None,
+        stage_timings: bool = False,
+        stats_interval: float = None,
+        search_window: int = None,
+    ) -> Generator:
+        """
+        Fetch and parse messages from a mailbox.
+
+        Parameters
+        -----------
+        search_filter (str | SearchQuery): IMAP criteria, for example: self._set_filter(subject="Invoice"),
+            or a search_query expression compiled to SEARCH syntax with OR/NOT support.
+        batch_size (int): fetch messages in chunks of this size with a single FETCH command per chunk,
+            for example: 500 -> "1:500". None keeps one FETCH command per message.
+            Counters of the run are available in self._run_stats.
+        incremental (bool): use UID SEARCH/UID FETCH and fetch only messages newer than the UID saved by
+            the previous run. The whole mailbox is synced again when UIDVALIDITY changes.
+        sync_state (SyncStateStore): store for the high-water marks. Default: SyncStateStore().
+        since_uid (int): fetch only messages with UID greater than this value.
+        headers_only (bool): fetch only header fields with BODY.PEEK (messages are not marked as \\Seen).
+            Body is None and attachments are neither downloaded nor parsed.
+        parse_workers (int): parse messages in this many processes while a separate thread keeps fetching.
+            None parses in the calling thread.
+        ordered (bool): with parse_workers, yield messages in fetch order. False yields them as soon as they are parsed.
+            With incremental=True the saved UID never passes a message that was not yielded yet.
+        stream_attachments (bool): decode attachments in chunks straight to disk (or attachment_sink) and return
+            AttachmentHandle objects (file name, path, size, sha256 digest) instead of bytes.
+        attachment_sink (Callable): called with the attachment file name, returns a writable binary object.
+            With parse_workers it is sent to worker processes, so it has to be picklable (a module-level
+            function, not a lambda or closure). ValueError is raised otherwise.
+        attachment_store (AttachmentStore): store attachments once per content in a content-addressed store
+            instead of {timestamp}_{filename} files. AttachmentHandle objects are returned.
+        message_cache (MessageCache): keep raw messages on disk keyed by account, mailbox, UIDVALIDITY and UID.
+            Cached messages are not downloaded again, messages cached under another UIDVALIDITY are dropped.
+            Implies UID mode. See also _get_cached_emails.
+        html_engine (str): text extraction for text/html parts: "bs4" (BeautifulSoup) or "stream" (html_to_text).
+        emoji_engine (str): emoji translation used with emoji_support: "legacy" or "fast" (single pass, see emoji_text).
+        record_type (str): "dict" yields dicts with sorted keys, "record" yields compact EmailRecord objects
+            converted from the parsed dict without key sorting, so only the slotted record is kept per message.
+            See also _get_email_batches.
+            "lazy" yields LazyEmailRecord objects which keep the raw message and parse the body, attachments
+            and extended headers on first access. Attachments are then available as record.attachments
+            (the second item is None) and parse_workers is ignored.
+        search_index (SearchIndex): index headers, cleaned body and attachment names of parsed messages
+            in a local full-text index, queried with SearchIndex._search(**_set_filter arguments).
+        stage_timings (bool): measure time spent in fetch, MIME parsing, header decoding, timestamps, body,
+            emoji and attachment stages, available in self._run_stats.stage_seconds.
+            With parse_workers only the fetch stage is measured.
+        stats_interval (float): log a summary of self._run_stats every stats_interval seconds and at the end of the run.
+        search_window (int): walk the mailbox in UID windows of this size, for example 5000, with one UID SEARCH
+            per window instead of a single SEARCH returning every id. Implies UID mode. A window is searched
+            only when the previous one was consumed, so memory stays flat in huge folders.
+            Messages arriving during the run are left for the next run.
+        In UID mode every record contains an additional "UID" key.
+        """
+        if record_type == "lazy":
+            # Lazy records are parsed on access, there is nothing to parse ahead in workers.
+            parse_workers = None
+        self._check_worker_options(parse_workers, attachment_sink)
+        self._run_stats = RunStats(batch_size=batch_size, stage_timings=stage_timings, log_interval=stats_interval)
+        self._address_table = AddressTable()
+        self._mail._select(mailbox=mailbox)
+        use_uid = incremental or since_uid is not None or message_cache is not None or bool(search_window)
+        parse_options = self._parse_options(
+            mailbox,
+            search_index=search_index,
+            emoji_support=emoji_support,
+            clean_body_text=clean_body_text,
+            format_datetime=format_datetime,
+            return_attachments=return_attachments,
+            save_attachments=save_attachments,
+            save_attachments_path=save_attachments_path,
+            only_basic_headers=only_basic_headers,
+            separate_sender_email=separate_sender_email,
+            headers_only=headers_only,
+            stream_attachments=stream_attachments,
+            attachment_sink=attachment_sink,
+            attachment_store=attachment_store,
+            html_engine=html_engine,
+            emoji_engine=emoji_engine,
+            record_type=record_type,
+        )
+
+        uidvalidity = None
+        if incremental or message_cache is not None:
+            account = self._mail._account_key()
+            uidvalidity = self._mail._uidvalidity()
+        if message_cache is not None and uidvalidity is not None:
+            # UIDs cached under another UIDVALIDITY point to other messages, _get_cached_emails must not serve them.
+            message_cache._invalidate(account, mailbox, uidvalidity)
+        if incremental:
+            sync_state = sync_state or SyncStateStore()
+            since_uid = self._resume_uid(sync_state, account, mailbox, uidvalidity, since_uid)
+
+        if search_window:
+            message_id_windows = self._search_windows(search_filter, since_uid, search_window)
+        else:
+            data = self._mail._search(uid=use_uid, **self._search_arguments(search_filter, since_uid))
+            message_id_windows = [self._newer_than(data[0].split(), since_uid)]
+        # A requested UID blocks the saved high-water mark until it was yielded. With ordered=False a lower UID
+        # can still be in flight after a higher one was yielded, and a FETCH may fail or leave UIDs out.
+        self._watermark = UidWatermark(since_uid or 0)
+        message_id_windows = self._watermark._request(message_id_windows)
+
+        message_parts = self._message_parts(headers_only, only_basic_headers)
+        if message_cache is not None and uidvalidity is not None:
+            raw_messages = (
+                raw_message
+                for message_ids in message_id_windows
+                for raw_message in self._cached_fetch_messages(
+                    message_cache,
+                    mailbox,
+                    uidvalidity,
+                    message_ids,
+                    batch_size=batch_size,
+                    message_parts=message_parts,
+                )
+            )
+        else:
+            raw_messages = (
+                raw_message
+                for message_ids in message_id_windows
+                for raw_message in self._fetch_messages(
+                    message_ids, batch_size=batch_size, uid=use_uid, message_parts=message_parts
+                )
+            )
+        parsed_messages = self._parse_stream(raw_messages, parse_options, parse_workers, ordered)
+
+        try:
+            for message_id, (decoded_data, attachments) in parsed_messages:
+                if parse_workers:
+                    self._run_stats._add_message()
+                if use_uid:
+                    decoded_data["UID"] = message_id
                 yield decoded_data, attachments
-            else:
-                yield decoded_data, None
+                self._watermark._deliver(message_id)
+        finally:
+            if incremental and uidvalidity is not None and self._watermark._value:
+                sync_state._save(account, mailbox, uidvalidity, self._watermark._value)
+            if stats_interval is not None:
+                logger.info(self._run_stats._summary())
+
+    @staticmethod
+    def _check_worker_options(parse_workers: int = None, attachment_sink: Callable = None) -> None:
+        """Fail before fetching when options cannot be sent to parse worker processes."""
+        if not parse_workers or attachment_sink is None:
+            return
+        try:
+            pickle.dumps(attachment_sink)
+        except Exception as e:
+            raise ValueError(
+                f"attachment_sink {attachment_sink!r} cannot be sent to parse workers, "
+                "use a module-level function or parse_workers=None."
+            ) from e
+
+    def _parse_options(self, mailbox: str, search_index: SearchIndex = None, **options) -> dict:
+        """
+        Return keyword arguments of _parse_raw_message shared by _get_emails and _aget_emails.
+
+        Parameters
+        -----------
+        mailbox (str): selected mailbox, part of the search_scope of indexed messages.
+        search_index (SearchIndex): index filled while parsing, None skips indexing.
+        options (dict): parse options of _get_emails, passed through unchanged.
+        """
+        if search_index is not None:
+            options.update(search_index=search_index, search_scope=(self._mail._account_key(), mailbox))
+        return options
+
+    def _parse_stream(
+        self, raw_messages: Iterable, parse_options: dict, parse_workers: int = None, ordered: bool = True
+    ) -> Generator:
+        """Parse (message id, raw message) pairs in the calling thread or in a ParsePipeline."""
+        if parse_workers:
+            pipeline = ParsePipeline(workers=parse_workers, ordered=ordered)
+            return pipeline._map(self, raw_messages, parse_options)
+        return (
+            (message_id, self._parse_raw_message(raw_message, **parse_options))
+            for message_id, raw_message in raw_messages
+        )
+
+    def _watch_emails(
+        self,
+        mailbox: str = "Inbox",
+        since_uid: int = None,
+        batch_size: int = None,
+        parse_workers: int = None,
+        ordered: bool = True,
+        renew_interval: float = 25 * 60,
+        poll_interval: float = 30.0,
+        settings: str = None,
+        stop: threading.Event = None,
+        stage_timings: bool = False,
+        stats_interval: float = None,
+        **options,
+    ) -> Generator:
+        """
+        Yield new messages as they arrive, using IDLE (or NOOP polling) instead of repeated _get_emails calls.
+        Records contain an additional "UID" key. Runs until stop is set or the generator is closed.
+
+        Parameters
+        -----------
+        mailbox (str): mailbox to watch.
+        since_uid (int): also yield messages with UID greater than this value. Default: only new messages.
+        batch_size (int): UIDs fetched with a single UID FETCH command.
+        parse_workers (int): parse messages in a ParsePipeline fed directly by the listener.
+        renew_interval (float): seconds after which IDLE is restarted.
+        poll_interval (float): seconds between NOOP checks when the server does not support IDLE.
+        settings (str): settings used to reconnect a dropped connection.
+        stop (threading.Event): stop watching when set.
+        stage_timings (bool) / stats_interval (float): see _get_emails.
+        **options: keyword arguments of _parse_message, for example: clean_body_text=True, headers_only=True.
+        """
+        self._run_stats = RunStats(batch_size=batch_size, stage_timings=stage_timings, log_interval=stats_interval)
+        self._address_table = AddressTable()
+        stop = stop or threading.Event()
+        listener = IdleListener(
+            self._mail,
+            mailbox=mailbox,
+            since_uid=since_uid,
+            renew_interval=renew_interval,
+            poll_interval=poll_interval,
+            settings=settings,
+            stop=stop,
+        )
+        message_parts = self._message_parts(
+            options.get("headers_only", False), options.get("only_basic_headers", True)
+        )
+        if options.get("search_index") is not None:
+            options.setdefault("search_scope", (self._mail._account_key(), mailbox))
+        if options.get("record_type") == "lazy":
+            parse_workers = None
+        self._check_worker_options(parse_workers, options.get("attachment_sink"))
+
+        raw_messages = (
+            raw_message
+            for event in listener._events()
+            for raw_message in self._fetch_messages(
+                event.uids, batch_size=batch_size, uid=True, message_parts=message_parts
+            )
+        )
+        parsed_messages = self._parse_stream(raw_messages, options, parse_workers, ordered)
+        try:
+            for uid, (decoded_data, attachments) in parsed_messages:
+                if parse_workers:
+                    self._run_stats._add_message()
+                decoded_data["UID"] = uid
+                yield decoded_data, attachments
+        finally:
+            # The listener has to leave IDLE before the pipeline waits for its I/O thread.
+            stop.set()
+            parsed_messages.close()
+            if stats_interval is not None:
+                logger.info(self._run_stats._summary())
+
+    def _get_email_batches(self, rows: int = 1000, **options) -> Generator:
+        """
+        Yield messages in columnar chunks: {"Subject": [...], "From": [...], ...}, one list per field.
+        A field missing in some messages, for example "CC Email", is None in their rows.
+        Chunks can be passed directly to pandas.DataFrame or pyarrow.table.
+        With return_attachments=True every chunk has an additional "Attachments" column.
+
+        Parameters
+        -----------
+        rows (int): number of messages per chunk.
+        **options: keyword arguments of _get_emails, for example: mailbox="Inbox", batch_size=500.
+        """
+        options["record_type"] = "record"
+        # Columns only grow, a chunk keeps every column of the chunks before it.
+        keys = []
+        records, attachments = [], []
+        for record, message_attachments in self._get_emails(**options):
+            records.append(record)
+            attachments.append(message_attachments)
+            if len(records) == rows:
+                keys = record_keys(records, keys)
+                yield self._columns(records, attachments, keys, options)
+                records, attachments = [], []
+        if records:
+            yield self._columns(records, attachments, record_keys(records, keys), options)
+
+    def _columns(self, records: list, attachments: list, keys: list, options: dict) -> dict:
+        chunk = columns(records, keys)
+        if options.get("return_attachments"):
+            chunk["Attachments"] = attachments
+        return chunk
+
+    def _get_cached_emails(
+        self,
+        message_cache: MessageCache,
+        mailbox: str = "Inbox",
+        uidvalidity: int = None,
+        since_uid: int = None,
+        **options,
+    ) -> Generator:
+        """
+        Parse messages kept in the local cache without connecting to the server.
+
+        Parameters
+        -----------
+        message_cache (MessageCache): cache filled by _get_emails(message_cache=...).
+        mailbox (str): mailbox name.
+        uidvalidity (int): UIDVALIDITY to read. Default: the newest cached one.
+        since_uid (int): parse only messages with UID greater than this value.
+        **options: keyword arguments of _parse_message, for example: clean_body_text=True, emoji_support=False.
+        """
+        self._run_stats = RunStats()
+        self._address_table = AddressTable()
+        account = self._mail._account_key()
+        if uidvalidity is None:
+            uidvalidity = message_cache._latest_uidvalidity(account, mailbox)
+        if uidvalidity is None:
+            return
+
+        if options.get("search_index") is not None:
+            options.setdefault("search_scope", (account, mailbox))
+        for uid, raw_message in message_cache._iterate(account, mailbox, uidvalidity, since_uid):
+            self._run_stats.cache_hits += 1
+            decoded_data, attachments = self._parse_raw_message(raw_message, **options)
+            decoded_data["UID"] = uid
+            yield decoded_data, attachments
+
+    async def _afetch_messages(
+        self,
+        message_ids: list,
+        batch_size: int = None,
+        uid: bool = False,
+        message_parts: str = "(RFC822)",
+    ) -> AsyncGenerator:
+        """Async counterpart of _fetch_messages for AsyncEmailConnector. Always uses _fetch_batch."""
+        for chunk in chunks(message_ids, batch_size or 1):
+            with self._run_stats._stage("fetch"):
+                data = await self._mail._fetch_batch(
+                    sequence_set(chunk), message_parts=message_parts, uid=uid
+                )
+            if data is None:
+                continue
+            for message_id, raw_message in self._split_fetch_response(chunk, data, uid):
+                yield message_id, raw_message
+
+    async def _aget_emails(
+        self,
+        mailbox: str = "Inbox",
+        emoji_support: bool = True,
+        clean_body_text: bool = False,
+        format_datetime: bool = False,
+        return_attachments: bool = False,
+        save_attachments: bool = False,
+        save_attachments_path: str = None,
+        search_filter: [str | SearchQuery] = "ALL",
+        only_basic_headers: bool = True,
+        separate_sender_email: bool = False,
+        batch_size: int = None,
+        incremental: bool = False,
+        sync_state: SyncStateStore = None,
+        since_uid: int = None,
+        headers_only: bool = False,
+        stream_attachments: bool = False,
+        attachment_sink: Callable = None,
+        attachment_store: AttachmentStore = None,
+        html_engine: str = "bs4",
+        emoji_engine: str = "legacy",
+        record_type: str = "dict",
+        search_index: SearchIndex = None,
+        stage_timings: bool = False,
+        stats_interval: float = None,
+    ) -> AsyncGenerator:
+        """
+        Async generator counterpart of _get_emails, used with AsyncEmailConnector:
+        async for data, attachments in EmailParser(async_connector)._aget_emails(): ...
+
+        Parsing runs in a worker thread, so large messages do not stall the event loop.
+        Messages are always fetched with one FETCH per batch and yielded in fetch order.
+
+        Parameters
+        -----------
+        mailbox (str): mailbox to select, for example: Inbox.
+        emoji_support, clean_body_text, format_datetime, return_attachments, save_attachments,
+            save_attachments_path, only_basic_headers, separate_sender_email: parse options of _parse_message.
+        search_filter (str | SearchQuery): IMAP criteria, for example: self._set_filter(subject="Invoice").
+        batch_size (int): number of messages requested with a single FETCH command. None fetches them one by one.
+        incremental (bool): fetch only messages newer than the UID saved by the previous run, see _get_emails.
+        sync_state (SyncStateStore): store for the high-water marks. Default: SyncStateStore().
+        since_uid (int): fetch only messages with UID greater than this value.
+        headers_only (bool): fetch only header fields with BODY.PEEK, Body is None.
+        stream_attachments (bool): return AttachmentHandle objects instead of bytes, see _get_emails.
+        attachment_sink (Callable): called with the attachment file name, returns a writable binary object.
+        attachment_store (AttachmentStore): store attachments once per content, see _get_emails.
+        html_engine (str): "bs4" or "stream".
+        emoji_engine (str): "legacy" or "fast".
+        record_type (str): "dict", "record" or "lazy", see _get_emails.
+        search_index (SearchIndex): index parsed messages in a local full-text index.
+        stage_timings (bool): measure time spent per parsing stage in self._run_stats.stage_seconds.
+        stats_interval (float): log a summary of self._run_stats every stats_interval seconds and at the end of the run.
+        parse_workers, ordered, message_cache and search_window of _get_emails are not supported.
+        In UID mode every record contains an additional "UID" key.
+        """
+        self._run_stats = RunStats(batch_size=batch_size, stage_timings=stage_timings, log_interval=stats_interval)
+        self._address_table = AddressTable()
+        await self._mail._select(mailbox=mailbox)
+        use_uid = incremental or since_uid is not None
+        parse_options = self._parse_options(
+            mailbox,
+            search_index=search_index,
+            emoji_support=emoji_support,
+            clean_body_text=clean_body_text,
+            format_datetime=format_datetime,
+            return_attachments=return_attachments,
+            save_attachments=save_attachments,
+            save_attachments_path=save_attachments_path,
+            only_basic_headers=only_basic_headers,
+            separate_sender_email=separate_sender_email,
+            headers_only=headers_only,
+            stream_attachments=stream_attachments,
+            attachment_sink=attachment_sink,
+            attachment_store=attachment_store,
+            html_engine=html_engine,
+            emoji_engine=emoji_engine,
+            record_type=record_type,
+        )
+
+        if incremental:
+            sync_state = sync_state or SyncStateStore()
+            account = self._mail._account_key()
+            uidvalidity = await self._mail._uidvalidity()
+            since_uid = self._resume_uid(sync_state, account, mailbox, uidvalidity, since_uid)
+
+        data = await self._mail._search(uid=use_uid, **self._search_arguments(search_filter, since_uid))
+        message_ids = self._newer_than(data[0].split(), since_uid)
+
+        self._watermark = UidWatermark(since_uid or 0)
+        message_ids = next(self._watermark._request([message_ids]))
+        try:
+            async for message_id, raw_message in self._afetch_messages(
+                message_ids,
+                batch_size=batch_size,
+                uid=use_uid,
+                message_parts=self._message_parts(headers_only, only_basic_headers),
+            ):
+                decoded_data, attachments = await asyncio.to_thread(
+                    self._parse_raw_message, raw_message, **parse_options
+                )
+                if use_uid:
+                    decoded_data["UID"] = message_id
+                yield decoded_data, attachments
+                self._watermark._deliver(message_id)
+        finally:
+            if incremental and uidvalidity is not None and self._watermark._value:
+                sync_state._save(account, mailbox, uidvalidity, self._watermark._value)
+            if stats_interval is not None:
+                logger.info(self._run_stats._summary())
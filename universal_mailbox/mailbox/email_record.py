@@ -0,0 +1,288 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import email
+from email.message import Message
+from functools import cached_property
+from typing import Any, Final, Iterable, List
+
+
+# Record keys of EmailParser._parse_message mapped to attribute names.
+FIELDS: Final[dict] = {
+    "BCC": "bcc",
+    "BCC Email": "bcc_email",
+    "Body": "body",
+    "CC": "cc",
+    "CC Email": "cc_email",
+    "Content-Description": "content_description",
+    "Content-Disposition": "content_disposition",
+    "Content-Language": "content_language",
+    "Content-Location": "content_location",
+    "Content-Transfer-Encoding": "content_transfer_encoding",
+    "Content-Type": "content_type",
+    "Date": "date",
+    "From": "from_",
+    "From Email": "from_email",
+    "In-Reply-To": "in_reply_to",
+    "MIME-Version": "mime_version",
+    "Mailbox": "mailbox",
+    "Message-ID": "message_id",
+    "Received": "received",
+    "References": "references",
+    "Reply-To": "reply_to",
+    "Reply-To Email": "reply_to_email",
+    "Subject": "subject",
+    "Thread-Index": "thread_index",
+    "To": "to",
+    "To Email": "to_email",
+    "UID": "uid",
+    "X-MS-TNEF-Correlator": "x_ms_tnef_correlator",
+    "X-Mailer": "x_mailer",
+    "X-Original-Sender": "x_original_sender",
+    "X-Priority": "x_priority",
+    "X-Sender": "x_sender",
+}
+ATTRIBUTES: Final[dict] = {attribute: key for key, attribute in FIELDS.items()}
+# Keys of records parsed with only_basic_headers. "... Email" keys are added by separate_sender_email.
+BASIC_KEYS: Final[frozenset] = frozenset(
+    (
+        "BCC",
+        "BCC Email",
+        "CC",
+        "CC Email",
+        "Date",
+        "From",
+        "From Email",
+        "Message-ID",
+        "Reply-To",
+        "Reply-To Email",
+        "Subject",
+        "To",
+        "To Email",
+    )
+)
+
+
+class EmailRecord:
+    """
+    Compact email record with a fixed set of slots instead of a per-message dict.
+
+    Attributes use snake case names (record.subject, record.from_, record.message_id),
+    item access keeps the keys of dict records working: record["Message-ID"].
+    Only fields set by the parser are part of the record, see _keys().
+    """
+
+    __slots__ = tuple(FIELDS.values())
+
+    @classmethod
+    def _from_dict(cls, data: dict) -> "EmailRecord":
+        record = cls()
+        for key, value in data.items():
+            object.__setattr__(record, FIELDS[key], value)
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, FIELDS[key])
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        setattr(self, FIELDS[key], value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELDS and hasattr(self, FIELDS[key])
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, EmailRecord):
+            return self._as_dict() == other._as_dict()
+        if isinstance(other, dict):
+            return self._as_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EmailRecord({self._as_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, FIELDS[key], default) if key in FIELDS else default
+
+    def _keys(self) -> List[str]:
+        """Return record keys which were set, in sorted order like dict records."""
+        return [key for key, attribute in FIELDS.items() if hasattr(self, attribute)]
+
+    def _as_dict(self) -> dict:
+        return {key: getattr(self, attribute) for key, attribute in FIELDS.items() if hasattr(self, attribute)}
+
+
+class LazyEmailRecord:
+    """
+    Email record keeping the raw message and parsing fields on first access,
+    returned by EmailParser._get_emails(record_type="lazy").
+
+    Basic headers are decoded together when the first of them is read. The body, the extended headers
+    (only_basic_headers=False) and the attachments are parsed on their own first access.
+    Parsed values are kept, so a field is never parsed twice.
+    Attachments are saved, streamed or returned when record.attachments is read.
+    """
+
+    HEADER_OPTIONS: Final[tuple] = ("only_basic_headers", "format_datetime", "separate_sender_email")
+    BODY_OPTIONS: Final[tuple] = ("emoji_support", "clean_body_text", "html_engine", "emoji_engine")
+    ATTACHMENT_OPTIONS: Final[tuple] = (
+        "format_datetime",
+        "return_attachments",
+        "save_attachments",
+        "save_attachments_path",
+        "stream_attachments",
+        "attachment_sink",
+        "attachment_store",
+    )
+
+    def __init__(self, parser: Any, raw_message: bytes, headers_only: bool = False, **options) -> None:
+        """
+        Parameters
+        -----------
+        parser (EmailParser): parser providing the parsing steps.
+        raw_message (bytes): RFC822 message or header block when headers_only is set.
+        headers_only (bool): raw_message contains headers only.
+        **options: keyword arguments of EmailParser._parse_message.
+        """
+        self._parser = parser
+        self._raw_message = raw_message
+        self._headers_only = headers_only
+        self._options = options
+        self._assigned = {}
+
+    def _selected(self, names: tuple) -> dict:
+        return {name: self._options[name] for name in names if name in self._options}
+
+    @cached_property
+    def _header_message(self) -> Message:
+        return self._parser._header_parser.parsebytes(self._raw_message)
+
+    @cached_property
+    def _message(self) -> Message:
+        if self._headers_only:
+            return self._header_message
+        return email.message_from_bytes(self._raw_message)
+
+    @cached_property
+    def _basic_headers(self) -> dict:
+        options = self._selected(self.HEADER_OPTIONS)
+        options["only_basic_headers"] = True
+        decoded_data = self._parser._decoded_headers(self._header_message, **options)
+        del decoded_data["Body"]
+        return decoded_data
+
+    @cached_property
+    def _extended_headers(self) -> dict:
+        if self._options.get("only_basic_headers", True):
+            return {}
+        headers = self._parser._headers(self._header_message, only_basic_headers=False)
+        return {
+            key: self._parser._decode_headers(value)
+            for key, value in headers.items()
+            if key != "Body" and key not in BASIC_KEYS
+        }
+
+    @cached_property
+    def body(self) -> [str | None]:
+        if self._headers_only:
+            return None
+        return self._parser._body_text(self._message, **self._selected(self.BODY_OPTIONS))
+
+    @cached_property
+    def attachments(self) -> [list | None]:
+        if self._headers_only:
+            return None
+        return self._parser._message_attachments(
+            self._message, self["Date"], **self._selected(self.ATTACHMENT_OPTIONS)
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._assigned:
+            return self._assigned[key]
+        if key == "Body":
+            return self.body
+        if key in BASIC_KEYS:
+            return self._basic_headers[key]
+        return self._extended_headers[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._assigned[key] = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Attribute names of EmailRecord, for example: record.subject, record.from_
+        if name in ATTRIBUTES:
+            try:
+                return self[ATTRIBUTES[name]]
+            except KeyError:
+                pass
+        raise AttributeError(name)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (EmailRecord, LazyEmailRecord)):
+            return self._as_dict() == other._as_dict()
+        if isinstance(other, dict):
+            return self._as_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyEmailRecord({len(self._raw_message)} bytes)"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _keys(self) -> List[str]:
+        """Return record keys in sorted order like dict records. Decodes the headers, not the body."""
+        return sorted({"Body", *self._basic_headers, *self._extended_headers, *self._assigned})
+
+    def _as_dict(self) -> dict:
+        """Return a dict record, parsing all fields."""
+        return {key: self[key] for key in self._keys()}
+
+
+def record_keys(records: Iterable, keys: Iterable[str] = ()) -> List[str]:
+    """
+    Return the union of keys of all records, so a field missing in some messages (CC Email, Reply-To Email)
+    still gets a column. Keys of EmailRecord objects keep the FIELDS order, keys of dicts are sorted.
+
+    Parameters
+    -----------
+    records (Iterable): EmailRecord objects, LazyEmailRecord objects or dicts.
+    keys (Iterable): keys to include in any case, for example columns of earlier chunks.
+    """
+    union = set(keys)
+    for record in records:
+        union.update(record._keys() if isinstance(record, (EmailRecord, LazyEmailRecord)) else record)
+    return [key for key in FIELDS if key in union] + sorted(union.difference(FIELDS))
+
+
+def columns(records: Iterable, keys: List[str] = None) -> dict:
+    """
+    Transpose records into columns: {key: [value of record 1, value of record 2, ...]}.
+    Records without a key get None in its column.
+    The result can be passed directly to pandas.DataFrame or pyarrow.table.
+
+    Parameters
+    -----------
+    records (Iterable): EmailRecord objects, LazyEmailRecord objects or dicts.
+    keys (list): columns to build. Default: keys of all records, see record_keys.
+    """
+    records = list(records)
+    if keys is None:
+        keys = record_keys(records)
+    return {key: [record.get(key) for record in records] for key in keys}
@@ -0,0 +1,55 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import re
+import emoji
+from functools import lru_cache
+from typing import Final
+
+
+_PICTOGRAPHS: Final = (
+    "\u231A-\u23FF\u2600-\u27BF\u2B00-\u2BFF\u3030\u303D\u3297\u3299"
+    "\U0001F004-\U0001F0CF\U0001F170-\U0001F251\U0001F300-\U0001FAFF"
+)
+# Skin tones, VS16, combining keycap and tag characters of subdivision flags.
+_MODIFIERS: Final = "\U0001F3FB-\U0001F3FF\uFE0F\u20E3\U000E0020-\U000E007F"
+
+# One run of pictographs with their modifiers, ZWJ-joined sequences, flags and keycaps.
+_EMOJI_RUN: Final = re.compile(
+    rf"(?:[{_PICTOGRAPHS}\U0001F1E6-\U0001F1FF][{_MODIFIERS}]*(?:\u200D[{_PICTOGRAPHS}][{_MODIFIERS}]*)*"
+    rf"|[#*0-9]\uFE0F?\u20E3)+"
+)
+
+
+@lru_cache(maxsize=4096)
+def emoji_name(sequence: str) -> str:
+    """
+    Translate a run of emojis to text, for example: 👨‍👩‍👧👍🏽 -> :family_man_woman_girl::thumbs_up_medium_skin_tone:
+    Results are memoized, emails tend to repeat the same few emojis.
+
+    Parameters
+    -----------
+    sequence (str): emoji run matched in a text.
+    """
+    return emoji.demojize(sequence)
+
+
+def _replace(match: re.Match) -> str:
+    return emoji_name(match.group())
+
+
+def demojize_text(text: str) -> str:
+    """
+    Replace emojis in a text with their names in a single pass.
+
+    Parameters
+    -----------
+    text (str): text to translate.
+    """
+    if text.isascii():
+        return text
+    return _EMOJI_RUN.sub(_replace, text)
@@ -0,0 +1,157 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import queue
+import fnmatch
+import threading
+from logger import logger
+from email_parser import EmailParser
+from connection_pool import ConnectionPool
+from typing import Any, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+
+_FOLDER_DONE: Any = object()
+
+
+class FolderScanner:
+    """
+    Scan many folders of one account in parallel, every folder on its own pooled session.
+    Records of all folders are merged into one stream and carry an additional "Mailbox" key.
+
+    Example:
+    pool = ConnectionPool("your_user", email_provider="gmail", size=4)
+    scanner = FolderScanner(pool, exclude=["[Gmail]/Spam", "[Gmail]/Trash"])
+    for data, attachments in scanner._get_emails(batch_size=500, headers_only=True):
+        print(data["Mailbox"], data["Subject"])
+    pool._close()
+
+    A failing folder is logged and reported in scanner._errors, the other folders keep going.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        include: Iterable[str] = ("*",),
+        exclude: Iterable[str] = (),
+        workers: int = None,
+        queue_size: int = 256,
+    ) -> None:
+        """
+        Parameters
+        -----------
+        pool (ConnectionPool): sessions of the account, one is used per folder being scanned.
+        include (Iterable): patterns of folders to scan with * and ? wildcards, for example: ["INBOX", "Archive/*"].
+        exclude (Iterable): patterns of folders to skip, applied after include.
+        workers (int): folders scanned at the same time. Default: size of the pool.
+        queue_size (int): maximum number of parsed messages waiting for the consumer.
+        """
+        self._pool = pool
+        self._include = tuple(include)
+        self._exclude = tuple(exclude)
+        self._workers = workers or pool._size
+        self._queue_size = queue_size
+        self._run_stats = {}
+        self._errors = {}
+
+    @staticmethod
+    def _matches(name: str, patterns: tuple) -> bool:
+        # Folder names are compared case-insensitively, "Inbox" matches "INBOX".
+        # Brackets are literal, so "[Gmail]/*" matches Gmail system folders instead of a character class.
+        return any(
+            fnmatch.fnmatchcase(name.lower(), pattern.lower().replace("[", "[[]")) for pattern in patterns
+        )
+
+    def _folders(self, names: list = None) -> list:
+        """
+        Return folders selected by the include and exclude patterns.
+
+        Parameters
+        -----------
+        names (list): candidate folder names. Default: the whole folder tree returned by LIST.
+        """
+        if names is None:
+            with self._pool._connection() as connector:
+                names = connector._list_mailboxes()
+            if names is None:
+                raise ConnectionError(f"Cannot list folders of {self._pool._mailbox}.")
+        return [
+            name for name in names if self._matches(name, self._include) and not self._matches(name, self._exclude)
+        ]
+
+    def _put(self, output: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put an item into the output queue unless the consumer stopped."""
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan(self, folder: str, output: queue.Queue, stop: threading.Event, options: dict) -> None:
+        """Worker: run _get_emails for a single folder and move tagged records into the output queue."""
+        try:
+            with self._pool._connection() as connector:
+                # _get_emails selects the folder as well, but it cannot tell a refused folder from an empty one.
+                if not connector._select(mailbox=folder):
+                    self._errors[folder] = "Cannot select folder"
+                    return
+                parser = EmailParser(connector)
+                records = parser._get_emails(mailbox=folder, **options)
+                try:
+                    for decoded_data, attachments in records:
+                        decoded_data["Mailbox"] = folder
+                        if not self._put(output, (decoded_data, attachments), stop):
+                            break
+                finally:
+                    records.close()
+                    self._run_stats[folder] = parser._run_stats
+        except (Exception, SystemExit) as e:
+            # EmailConnector exits on configuration and login errors, which must not end the other folders.
+            logger.exception(f"Scanning folder {folder} of {self._pool._mailbox} failed: {e}")
+            self._errors[folder] = repr(e)
+        finally:
+            self._put(output, _FOLDER_DONE, stop)
+
+    def _get_emails(self, folders: list = None, **options) -> Generator:
+        """
+        Yield (data, attachments) of all selected folders, in the order messages are parsed.
+        Messages of one folder keep their order, folders are interleaved.
+
+        Parameters
+        -----------
+        folders (list): folder names to scan instead of listing them, include and exclude still apply.
+        **options: keyword arguments of EmailParser._get_emails, for example: batch_size=500, incremental=True.
+            Per-folder counters are available in self._run_stats after the run.
+        """
+        if "mailbox" in options:
+            raise TypeError("FolderScanner selects folders itself, use include/exclude instead of mailbox.")
+        folders = self._folders(folders)
+        self._run_stats, self._errors = {}, {}
+        if not folders:
+            return
+
+        output = queue.Queue(maxsize=self._queue_size)
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(self._workers, len(folders)))
+        for folder in folders:
+            executor.submit(self._scan, folder, output, stop, options)
+
+        remaining = len(folders)
+        try:
+            while remaining:
+                item = output.get()
+                if item is _FOLDER_DONE:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if self._errors:
+                logger.error(f"{len(self._errors)} of {len(folders)} folders failed: {', '.join(self._errors)}")
@@ -0,0 +1,56 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import codecs
+from typing import Any
+from functools import lru_cache
+from email.header import decode_header
+
+
+def _decode_chunk(chunk: [bytes | str], charset: str = None) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    try:
+        codecs.lookup(charset or "ascii")
+    except LookupError:
+        # Unknown or misspelled charsets, including "unknown-8bit" of raw 8-bit headers.
+        charset = "utf-8"
+    return chunk.decode(charset or "ascii", "replace")
+
+
+@lru_cache(maxsize=8192)
+def decode_encoded_words(value: str) -> str:
+    """
+    Decode a header value with RFC 2047 encoded-words, joining all of them with the plain text around, for example:
+    "Re: =?utf-8?q?Faktura?= =?utf-8?b?IG5yIDEy?=" -> "Re: Faktura nr 12"
+    Results are memoized, newsletters repeat the same Subject and From values in every message.
+
+    Parameters
+    -----------
+    value (str): raw header value.
+    """
+    return "".join(_decode_chunk(chunk, charset) for chunk, charset in decode_header(value))
+
+
+def decode_header_value(value: Any) -> Any:
+    """
+    Decode a header value returned by email.message.Message, None stays None.
+    Values without encoded-words are returned as they are, without a cache lookup.
+
+    Parameters
+    -----------
+    value (Any): str, email.header.Header or None.
+    """
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str):
+            return value if "=?" not in value else decode_encoded_words(value)
+        # Header objects of raw 8-bit values are not hashable, so they are not cached.
+        return "".join(_decode_chunk(chunk, charset) for chunk, charset in decode_header(value))
+    except Exception:
+        return value
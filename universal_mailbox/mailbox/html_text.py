@@ -0,0 +1,102 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import re
+from html import unescape
+from typing import Final, Generator
+
+
+_TOKEN: Final = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<!\[CDATA\[(.*?)(?:\]\]>|\Z)"
+    r"|<[!?][^<>]*+>"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9:-]*+)((?:[^<>\"']++|\"[^\"]*+\"|'[^']*+')*+)>",
+    re.S,
+)
+_HREF: Final = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+_RAW_TEXT_END: Final = {
+    "script": re.compile(r"</script\s*>", re.I),
+    "style": re.compile(r"</style\s*>", re.I),
+    "template": re.compile(r"</template\s*>", re.I),
+}
+_BLOCK_TAGS: Final = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+        "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "ol",
+        "p", "pre", "section", "table", "tbody", "td", "th", "thead", "tr", "ul",
+    }
+)
+
+TEXT, START_TAG, END_TAG = 0, 1, 2
+
+
+def html_events(html: str) -> Generator:
+    """
+    Tokenize HTML into (event, tag, data) tuples without building a tree.
+    Text is yielded unescaped; script, style and template content is skipped.
+
+    Parameters
+    -----------
+    html (str): HTML document or fragment.
+    """
+    position = 0
+    length = len(html)
+    while position < length:
+        match = _TOKEN.search(html, position)
+        if match is None:
+            yield TEXT, None, unescape(html[position:])
+            return
+        if match.start() > position:
+            text = html[position : match.start()]
+            yield TEXT, None, unescape(text) if "&" in text else text
+        position = match.end()
+
+        tag = match.group(3)
+        if tag is None:
+            if match.group(1):
+                yield TEXT, None, match.group(1)
+            continue
+        tag = tag.lower()
+        if match.group(2):
+            yield END_TAG, tag, None
+            continue
+        yield START_TAG, tag, match.group(4)
+        if tag in _RAW_TEXT_END:
+            end = _RAW_TEXT_END[tag].search(html, position)
+            position = length if end is None else end.end()
+            yield END_TAG, tag, None
+
+
+def html_to_text(html: str, keep_links: bool = True) -> str:
+    """
+    Extract readable text from HTML in a single pass.
+
+    Block elements are separated with new lines. Link targets are kept next to the link text,
+    for example: <a href="https://example.com">Shop</a> -> Shop (https://example.com)
+
+    Parameters
+    -----------
+    html (str): HTML document or fragment.
+    keep_links (bool): append href of links to their text.
+    """
+    parts = []
+    links = []
+    for event, tag, data in html_events(html):
+        if event == TEXT:
+            parts.append(data)
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+        elif tag == "a" and keep_links:
+            if event == START_TAG:
+                href = _HREF.search(data or "")
+                href = href and unescape(next(group for group in href.groups() if group is not None))
+                links.append((href, len(parts)))
+            elif links:
+                href, start = links.pop()
+                if href and href.startswith(("http://", "https://")) and href not in "".join(parts[start:]):
+                    parts.append(f" ({href})")
+    return "".join(parts)
@@ -0,0 +1,119 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import threading
+from logger import logger
+from dataclasses import dataclass
+from typing import Generator, List
+from email_connector import EmailConnector
+
+
+@dataclass
+class MailboxEvent:
+    """New messages that arrived in a mailbox."""
+
+    mailbox: str
+    uids: List[int]
+
+
+class IdleListener:
+    """
+    Long-lived listener that reports new messages of a mailbox:
+    listener = IdleListener(connector, mailbox="Inbox")
+    for event in listener._events(): print(event.uids)
+
+    The server pushes changes with IDLE. Servers without the IDLE capability are polled with NOOP.
+    IDLE is renewed before the 29 minutes server timeout of RFC 2177.
+    """
+
+    def __init__(
+        self,
+        connector: EmailConnector,
+        mailbox: str = "Inbox",
+        since_uid: int = None,
+        renew_interval: float = 25 * 60,
+        poll_interval: float = 30.0,
+        settings: str = None,
+        stop: threading.Event = None,
+    ) -> None:
+        """
+        Parameters
+        -----------
+        connector (EmailConnector): connected connector used only by this listener.
+        mailbox (str): mailbox to watch.
+        since_uid (int): report messages with UID greater than this value. Default: only messages arriving from now on.
+        renew_interval (float): seconds after which IDLE is restarted.
+        poll_interval (float): seconds between NOOP checks when IDLE is not supported.
+        settings (str): settings used to reconnect a dropped connection, see EmailConnector._connect.
+        stop (threading.Event): stop listening when set.
+        """
+        self._connector = connector
+        self._mailbox = mailbox
+        self._last_uid = since_uid
+        self._renew_interval = renew_interval
+        self._poll_interval = poll_interval
+        self._settings = settings
+        self._stop_event = stop or threading.Event()
+
+    def _stop(self) -> None:
+        self._stop_event.set()
+
+    def _start(self) -> None:
+        self._connector._select(mailbox=self._mailbox)
+        if self._last_uid is None:
+            uidnext = self._connector._uidnext()
+            self._last_uid = uidnext - 1 if uidnext else self._highest_uid()
+
+    def _highest_uid(self) -> int:
+        data = self._connector._search("ALL", uid=True)
+        uids = [int(uid) for uid in data[0].split()] if data else []
+        return max(uids, default=0)
+
+    def _new_uids(self) -> List[int]:
+        data = self._connector._search(f"UID {self._last_uid + 1}:*", uid=True)
+        if not data:
+            return []
+        # "n:*" always matches the newest message, even below n.
+        return sorted(uid for uid in map(int, data[0].split()) if uid > self._last_uid)
+
+    def _wait(self, idle: bool) -> bool:
+        """Wait for a change of the mailbox. Returns True when new messages may have arrived."""
+        if idle:
+            responses = self._connector._idle(self._renew_interval, stop=self._stop_event)
+            if responses is not None:
+                return any(response.endswith((b"EXISTS", b"RECENT")) for response in responses)
+        elif self._stop_event.wait(self._poll_interval):
+            return False
+        elif self._connector._noop():
+            _, data = self._connector._connection.response("EXISTS")
+            return bool(data and data[0])
+
+        if self._stop_event.is_set():
+            return False
+        logger.error(f"Connection lost while watching {self._mailbox}, reconnecting.")
+        self._connector._connect(self._settings)
+        self._connector._select(mailbox=self._mailbox)
+        return True
+
+    def _events(self) -> Generator:
+        """Yield a MailboxEvent whenever new messages arrive, until stopped."""
+        self._start()
+        idle = "IDLE" in self._connector._capabilities()
+        if not idle:
+            logger.info(f"IDLE not supported, polling {self._mailbox} every {self._poll_interval}s.")
+
+        # Messages newer than since_uid, or delivered since SELECT, are reported before waiting.
+        changed = True
+        while not self._stop_event.is_set():
+            if not changed:
+                changed = self._wait(idle)
+                continue
+            changed = False
+            uids = self._new_uids()
+            if uids:
+                self._last_uid = uids[-1]
+                yield MailboxEvent(mailbox=self._mailbox, uids=uids)
@@ -0,0 +1,202 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import re
+import ssl
+import time
+import select
+from typing import Any, Generator, List, Tuple
+
+
+_UID_PATTERN = re.compile(rb"UID (\d+)")
+_LIST_PATTERN = re.compile(rb'\((?P<flags>[^)]*)\) (?P<delimiter>"(?:[^"\\]|\\.)*"|NIL) ?(?P<name>.*)', re.IGNORECASE)
+_ATOM_SPECIALS = re.compile(r'[\s"\\(){%*\]]')
+
+
+def sequence_set(message_ids: list) -> str:
+    """
+    Build a compact IMAP sequence set from message ids.
+
+    Parameters
+    -----------
+    message_ids (list): sequence numbers or UIDs as bytes, str or int. Example: [b"1", b"2", b"3", b"7"] -> "1:3,7"
+    """
+    numbers = sorted({int(message_id) for message_id in message_ids})
+    ranges = []
+    start = previous = None
+    for number in numbers:
+        if start is None:
+            start = previous = number
+        elif number == previous + 1:
+            previous = number
+        else:
+            ranges.append(f"{start}:{previous}" if start != previous else f"{start}")
+            start = previous = number
+    if start is not None:
+        ranges.append(f"{start}:{previous}" if start != previous else f"{start}")
+    return ",".join(ranges)
+
+
+def chunks(items: list, size: int) -> Generator:
+    """
+    Split a list into consecutive chunks.
+
+    Parameters
+    -----------
+    items (list): items to split.
+    size (int): maximum length of a single chunk.
+    """
+    for index in range(0, len(items), size):
+        yield items[index : index + size]
+
+
+def parse_fetch_response(data: list) -> List[Tuple[int, int, bytes]]:
+    """
+    Split a multi-message FETCH response into (sequence number, uid, payload) entries.
+
+    Parameters
+    -----------
+    data (list): response data returned by imaplib, for example:
+        [(b'1 (UID 10 RFC822 {342}', b'...'), b')', (b'2 (RFC822 {512}', b'...'), b' UID 11)']
+        The uid is None when it was not requested.
+    """
+    messages = []
+    for item in data:
+        if isinstance(item, tuple):
+            prefix = item[0]
+            uid = _UID_PATTERN.search(prefix)
+            messages.append(
+                [int(prefix.split(b" ", 1)[0]), int(uid.group(1)) if uid else None, item[1]]
+            )
+        elif isinstance(item, bytes) and messages and messages[-1][1] is None:
+            # Some servers send the UID after the message literal.
+            uid = _UID_PATTERN.search(item)
+            if uid:
+                messages[-1][1] = int(uid.group(1))
+    return [tuple(message) for message in messages]
+
+
+def _unquote(value: bytes) -> bytes:
+    if value[:1] == b'"' and value[-1:] == b'"':
+        return re.sub(rb"\\(.)", rb"\1", value[1:-1])
+    return value
+
+
+def parse_list_response(data: list) -> List[tuple]:
+    """
+    Split a LIST response into (flags, hierarchy delimiter, mailbox name) entries.
+
+    Parameters
+    -----------
+    data (list): response data returned by imaplib, for example:
+        [b'(\\HasNoChildren) "/" "INBOX"', (b'(\\HasNoChildren) "/" {9}', b'Work/2024')]
+        Example result: [(("\\HasNoChildren",), "/", "INBOX"), (("\\HasNoChildren",), "/", "Work/2024")]
+    """
+    mailboxes = []
+    for item in data:
+        if isinstance(item, tuple):
+            # The name was sent as a literal.
+            line, name = item[0], item[1]
+        elif isinstance(item, bytes):
+            line, name = item, None
+        else:
+            continue
+        match = _LIST_PATTERN.match(line)
+        if not match:
+            continue
+        delimiter = match.group("delimiter")
+        delimiter = None if delimiter.upper() == b"NIL" else _unquote(delimiter).decode("utf-8", "replace")
+        if name is None:
+            name = _unquote(match.group("name").strip())
+        mailboxes.append(
+            (
+                tuple(match.group("flags").decode("ascii", "replace").split()),
+                delimiter,
+                name.decode("utf-8", "replace"),
+            )
+        )
+    return mailboxes
+
+
+def quote_mailbox(name: str) -> str:
+    """
+    Quote a mailbox name for SELECT when it contains spaces or other special characters.
+    imaplib sends arguments as they are. Example: "Sent Items" -> '"Sent Items"', "INBOX" -> "INBOX"
+    """
+    if name.startswith('"') or not _ATOM_SPECIALS.search(name):
+        return name
+    return '"' + name.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class LineReader:
+    """
+    Read CRLF terminated lines of an imaplib connection with a timeout.
+    Used while the connection is in IDLE, where imaplib would block on readline() without a timeout.
+
+    Lines are read from connection.file, so responses imaplib already buffered are not missed
+    and bytes received after the last returned line stay in imaplib's buffer for the next command.
+    """
+
+    def __init__(self, connection: Any) -> None:
+        """
+        Parameters
+        -----------
+        connection (Any): imaplib.IMAP4 connection, read through its buffered file and waited on with its sock.
+        """
+        self._file = connection.file
+        self._sock = connection.sock
+        self._buffer = b""
+
+    def _read_available(self) -> [bytes | None]:
+        """
+        Move bytes available without waiting, up to the end of the current line, to self._buffer.
+        Returns them, b"" at the end of the stream and None when nothing arrived yet.
+        """
+        # A socket timeout would leave imaplib's file unreadable for good, so the socket is non-blocking here.
+        # peek() reads the socket only when imaplib's buffer is empty, and read() then takes buffered bytes only,
+        # so bytes of a line split across TLS records are never lost to SSLWantReadError.
+        previous = self._sock.gettimeout()
+        self._sock.settimeout(0.0)
+        try:
+            available = self._file.peek()
+        except (ssl.SSLWantReadError, BlockingIOError):
+            return None
+        finally:
+            self._sock.settimeout(previous)
+        end = available.find(b"\n")
+        data = self._file.read(len(available) if end < 0 else end + 1)
+        self._buffer += data
+        return data
+
+    def _readline(self, timeout: float) -> [bytes | None]:
+        """
+        Return the next line without the line break, or None when nothing arrived within timeout seconds.
+        A partial line stays buffered for the next call.
+
+        Parameters
+        -----------
+        timeout (float): maximum waiting time in seconds.
+        """
+        deadline = time.monotonic() + timeout
+        readable = False
+        while True:
+            data = self._read_available()
+            if data:
+                if data.endswith(b"\n"):
+                    line, self._buffer = self._buffer, b""
+                    return line.rstrip(b"\r\n")
+                readable = False
+                continue
+            if data == b"" and readable:
+                # Non-blocking reads of a plain socket return b"" for no data as well, but select() reported some.
+                raise ConnectionError("Connection closed by the server")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            readable = bool(select.select([self._sock], [], [], remaining)[0])
+            if not readable:
+                return None
@@ -0,0 +1,176 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = [
+    "python mail_export.py your_user --provider gmail --mailbox Inbox --directory export",
+    "python mail_export.py your_user --provider gmail --format parquet --partition-size 50000",
+]
+
+import os
+import re
+import sys
+import json
+import argparse
+from logger import logger
+from typing import Final, List
+from email_record import columns
+from email_parser import EmailParser
+from sync_state import SyncStateStore
+from email_connector import EmailConnector
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS: Final[tuple] = ("jsonl", "parquet")
+
+
+class MailExporter:
+    """
+    Stream parsed messages to partition files without collecting the mailbox in memory:
+    exporter = MailExporter(EmailParser(connector), "export", file_format="jsonl")
+    exporter._export(mailbox="Inbox", clean_body_text=True)
+
+    Partitions are written to {directory}/{account}/{mailbox}/{uidvalidity}/part-{first uid}-{last uid}.{format}.
+    After each partition the UID up to which every message was exported is saved in {directory}/checkpoint.json,
+    so an interrupted export continues after the last written partition.
+    The export starts over in a new {uidvalidity} directory when UIDVALIDITY changes.
+    """
+
+    def __init__(
+        self,
+        parser: EmailParser,
+        directory: str,
+        file_format: str = "jsonl",
+        partition_size: int = 10_000,
+        checkpoint: SyncStateStore = None,
+    ) -> None:
+        """
+        Parameters
+        -----------
+        parser (EmailParser): parser of a connected account.
+        directory (str): export directory.
+        file_format (str): "jsonl" or "parquet" (requires pyarrow).
+        partition_size (int): messages per partition file, also the maximum number of records kept in memory.
+        checkpoint (SyncStateStore): store for the last exported UID. Default: {directory}/checkpoint.json
+        """
+        if file_format not in FORMATS:
+            logger.critical(f"Unsupported export format: {file_format}. Supported formats: {', '.join(FORMATS)}")
+            sys.exit(1)
+        if file_format == "parquet" and pyarrow is None:
+            logger.critical("Parquet export requires pyarrow: pip install pyarrow")
+            sys.exit(1)
+        self._parser = parser
+        self._directory = directory
+        self._file_format = file_format
+        self._partition_size = partition_size
+        self._checkpoint = checkpoint or SyncStateStore(os.path.join(directory, "checkpoint.json"))
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        # Mailbox names like "[Gmail]/All Mail" become a single directory.
+        return re.sub(r"[^\w.@-]+", "_", name).strip("_") or "_"
+
+    def _row(self, record) -> dict:
+        return record._as_dict() if hasattr(record, "_as_dict") else record
+
+    def _export(self, mailbox: str = "Inbox", since_uid: int = None, **options) -> int:
+        """
+        Export messages newer than the checkpoint (or since_uid) and return the number of exported messages.
+
+        Parameters
+        -----------
+        mailbox (str): mailbox to export.
+        since_uid (int): export only messages with UID greater than this value when it is ahead of the checkpoint.
+        **options: keyword arguments of EmailParser._get_emails, for example: clean_body_text=True,
+            search_filter=..., batch_size=500. Attachments are not exported, ordered is always True.
+        """
+        connector = self._parser._mail
+        account = connector._account_key()
+        connector._select(mailbox=mailbox)
+        uidvalidity = connector._uidvalidity()
+        since_uid = self._parser._resume_uid(self._checkpoint, account, mailbox, uidvalidity, since_uid)
+        if since_uid:
+            logger.info(f"Resuming export of {account}/{mailbox} after UID {since_uid}.")
+
+        options.pop("return_attachments", None)
+        # The checkpoint is the parser's UID watermark after a written partition, which stops below UIDs
+        # missing in a FETCH response. Parse workers must keep fetch order, so a written partition
+        # holds every delivered UID below it.
+        options["ordered"] = True
+        exported = 0
+        rows = []
+        for record, _ in self._parser._get_emails(mailbox=mailbox, since_uid=since_uid or 0, **options):
+            rows.append(self._row(record))
+            if len(rows) >= self._partition_size:
+                exported += self._flush(account, mailbox, uidvalidity, rows)
+                rows = []
+        if rows:
+            exported += self._flush(account, mailbox, uidvalidity, rows)
+        return exported
+
+    def _partition_path(self, account: str, mailbox: str, uidvalidity: int, rows: List[dict]) -> str:
+        uids = [row["UID"] for row in rows]
+        directory = os.path.join(
+            self._directory, self._safe_name(account), self._safe_name(mailbox), str(uidvalidity or 0)
+        )
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"part-{min(uids):010d}-{max(uids):010d}.{self._file_format}")
+
+    def _flush(self, account: str, mailbox: str, uidvalidity: int, rows: List[dict]) -> int:
+        """Write one partition atomically, then move the checkpoint past it, but not past a UID that was not exported."""
+        path = self._partition_path(account, mailbox, uidvalidity, rows)
+        temporary_path = f"{path}.tmp"
+        if self._file_format == "parquet":
+            keys = sorted({key for row in rows for key in row})
+            pyarrow.parquet.write_table(pyarrow.table(columns(rows, keys)), temporary_path)
+        else:
+            with open(temporary_path, "w", encoding="utf-8") as export_file:
+                for row in rows:
+                    export_file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        os.replace(temporary_path, path)
+        # The parser counts the last row as delivered only when the next one is requested.
+        watermark = self._parser._watermark
+        watermark._deliver(rows[-1]["UID"])
+        self._checkpoint._save(account, mailbox, uidvalidity, watermark._value)
+        logger.info(f"Exported {len(rows)} messages of {account}/{mailbox} to {path}.")
+        return len(rows)
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Export parsed messages to partitioned JSONL or Parquet files.")
+    arguments.add_argument("account", help="account key in configuration/settings.json")
+    arguments.add_argument("--provider", required=True, help="imap server key name, for example: gmail")
+    arguments.add_argument("--mailbox", default="Inbox")
+    arguments.add_argument("--directory", default="export")
+    arguments.add_argument("--format", default="jsonl", choices=FORMATS)
+    arguments.add_argument("--partition-size", type=int, default=10_000)
+    arguments.add_argument("--batch-size", type=int, default=500, help="messages requested with a single FETCH")
+    arguments.add_argument("--clean-body-text", action="store_true")
+    options = arguments.parse_args()
+
+    connector = EmailConnector(options.account, email_provider=options.provider)
+    connector._connect()
+    try:
+        exporter = MailExporter(
+            EmailParser(connector), options.directory, file_format=options.format, partition_size=options.partition_size
+        )
+        exported = exporter._export(
+            mailbox=options.mailbox,
+            batch_size=options.batch_size,
+            clean_body_text=options.clean_body_text,
+            record_type="record",
+        )
+        print(f"Exported {exported} messages to {options.directory}", flush=True)
+    finally:
+        connector._disconnect()
+
+
+if __name__ == "__main__":
+    main()
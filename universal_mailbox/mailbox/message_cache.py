@@ -0,0 +1,174 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import time
+import sqlite3
+import threading
+from logger import logger
+from utils import absolute_path
+from typing import Generator, List
+
+
+class MessageCache:
+    """
+    On-disk cache of raw RFC822 messages keyed by account, mailbox, UIDVALIDITY and UID.
+
+    The least recently used messages are evicted when the cache grows above max_bytes.
+    UIDs are only stable within one UIDVALIDITY, so entries of an older UIDVALIDITY are never returned.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 1024 * 1024 * 1024) -> None:
+        """
+        Parameters
+        -----------
+        path (str): sqlite file holding the cache. Default: mailbox/cache/messages.sqlite3
+        max_bytes (int): maximum total size of cached messages. Default: 1 GiB.
+        """
+        self._path = path or absolute_path(os.path.join("cache", "messages.sqlite3"))
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._database = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+        self._database.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                account TEXT NOT NULL,
+                mailbox TEXT NOT NULL,
+                uidvalidity INTEGER NOT NULL,
+                uid INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                raw BLOB NOT NULL,
+                PRIMARY KEY (account, mailbox, uidvalidity, uid)
+            )
+            """
+        )
+        self._database.execute(
+            "CREATE INDEX IF NOT EXISTS messages_last_access ON messages (last_access)"
+        )
+        self._size = self._database.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM messages"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._database.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def _get_many(self, account: str, mailbox: str, uidvalidity: int, uids: List[int]) -> dict:
+        """
+        Return cached raw messages as {uid: raw message}.
+
+        Parameters
+        -----------
+        account (str): account identifier, for example: EmailConnector._account_key().
+        mailbox (str): mailbox name.
+        uidvalidity (int): UIDVALIDITY of the selected mailbox.
+        uids (list): requested UIDs.
+        """
+        if not uids:
+            return {}
+        placeholders = ",".join("?" * len(uids))
+        with self._lock:
+            rows = self._database.execute(
+                f"SELECT uid, raw FROM messages WHERE account = ? AND mailbox = ? "
+                f"AND uidvalidity = ? AND uid IN ({placeholders})",
+                (account, mailbox, uidvalidity, *uids),
+            ).fetchall()
+            if rows:
+                self._database.execute(
+                    f"UPDATE messages SET last_access = ? WHERE account = ? AND mailbox = ? "
+                    f"AND uidvalidity = ? AND uid IN ({placeholders})",
+                    (time.time(), account, mailbox, uidvalidity, *uids),
+                )
+                self._database.commit()
+        return {uid: raw for uid, raw in rows}
+
+    def _put(self, account: str, mailbox: str, uidvalidity: int, uid: int, raw_message: bytes) -> None:
+        """Cache a raw message and evict old ones when the cache is full."""
+        if len(raw_message) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._database.execute(
+                "SELECT size FROM messages WHERE account = ? AND mailbox = ? AND uidvalidity = ? AND uid = ?",
+                (account, mailbox, uidvalidity, uid),
+            ).fetchone()
+            self._database.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account, mailbox, uidvalidity, uid, len(raw_message), time.time(), raw_message),
+            )
+            self._size += len(raw_message) - (previous[0] if previous else 0)
+            if self._size > self._max_bytes:
+                self._evict()
+            self._database.commit()
+
+    def _evict(self) -> None:
+        """Remove least recently used messages until the cache fits in max_bytes."""
+        cursor = self._database.execute(
+            "SELECT account, mailbox, uidvalidity, uid, size FROM messages ORDER BY last_access"
+        )
+        removed = []
+        for account, mailbox, uidvalidity, uid, size in cursor:
+            if self._size <= self._max_bytes:
+                break
+            removed.append((account, mailbox, uidvalidity, uid))
+            self._size -= size
+        self._database.executemany(
+            "DELETE FROM messages WHERE account = ? AND mailbox = ? AND uidvalidity = ? AND uid = ?",
+            removed,
+        )
+        logger.info(f"Evicted {len(removed)} messages from cache {self._path}.")
+
+    def _latest_uidvalidity(self, account: str, mailbox: str) -> [int | None]:
+        with self._lock:
+            row = self._database.execute(
+                "SELECT MAX(uidvalidity) FROM messages WHERE account = ? AND mailbox = ?",
+                (account, mailbox),
+            ).fetchone()
+        return row[0]
+
+    def _iterate(
+        self, account: str, mailbox: str, uidvalidity: int, since_uid: int = None, batch_size: int = 100
+    ) -> Generator:
+        """
+        Yield (uid, raw message) of a mailbox in UID order without touching the network.
+
+        Parameters
+        -----------
+        since_uid (int): yield only messages with UID greater than this value.
+        batch_size (int): number of messages read from disk at once.
+        """
+        last_uid = since_uid or 0
+        while True:
+            with self._lock:
+                rows = self._database.execute(
+                    "SELECT uid, raw FROM messages WHERE account = ? AND mailbox = ? AND uidvalidity = ? "
+                    "AND uid > ? ORDER BY uid LIMIT ?",
+                    (account, mailbox, uidvalidity, last_uid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_uid = rows[-1][0]
+
+    def _invalidate(self, account: str, mailbox: str, uidvalidity: int) -> None:
+        """Drop messages cached under a UIDVALIDITY other than the current one."""
+        with self._lock:
+            parameters = (account, mailbox, uidvalidity)
+            self._size -= self._database.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM messages WHERE account = ? AND mailbox = ? AND uidvalidity != ?",
+                parameters,
+            ).fetchone()[0]
+            self._database.execute(
+                "DELETE FROM messages WHERE account = ? AND mailbox = ? AND uidvalidity != ?",
+                parameters,
+            )
+            self._database.commit()
+
+    def _close(self) -> None:
+        with self._lock:
+            self._database.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import queue
+import threading
+import multiprocessing
+from logger import logger
+from collections import deque
+from typing import Any, Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+_worker_parser: Any = None
+_END_OF_STREAM: Any = object()
+
+
+def _init_worker(parser: Any) -> None:
+    """Keep one parser per worker process."""
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _parse_in_worker(message_id: int, raw_message: bytes, options: dict) -> tuple:
+    return message_id, _worker_parser._parse_raw_message(raw_message, **options)
+
+
+class ParsePipeline:
+    """
+    Run IMAP I/O and MIME parsing in separate stages.
+
+    An I/O thread pulls raw messages into a bounded queue, a process pool parses them
+    and results are yielded in input order (or as soon as they are ready when ordered=False).
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = 64, ordered: bool = True) -> None:
+        """
+        Parameters
+        -----------
+        workers (int): number of parsing processes. Default: number of CPUs.
+        queue_size (int): maximum number of raw messages waiting for a free worker.
+        ordered (bool): yield results in the order messages were fetched.
+        """
+        self._workers = workers
+        self._queue_size = queue_size
+        self._ordered = ordered
+
+    def _context(self) -> multiprocessing.context.BaseContext:
+        # Forking while the I/O thread (or any other thread of the caller) holds a lock
+        # leaves the worker deadlocked, so workers are forked from a clean server process.
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context("forkserver")
+        return multiprocessing.get_context()
+
+    def _put(self, buffer: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put an item into the buffer unless the consumer stopped."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, raw_messages: Iterable, buffer: queue.Queue, stop: threading.Event) -> None:
+        """I/O stage: move fetched messages into the bounded buffer."""
+        try:
+            for item in raw_messages:
+                if not self._put(buffer, item, stop):
+                    return
+            self._put(buffer, _END_OF_STREAM, stop)
+        except BaseException as e:
+            logger.exception(f"Fetching messages failed: {e}")
+            self._put(buffer, e, stop)
+
+    def _map(self, parser: Any, raw_messages: Iterable, options: dict) -> Generator:
+        """
+        Parse (message id, raw message) pairs in worker processes.
+        Yields (message id, (decoded data, attachments)).
+
+        Parameters
+        -----------
+        parser (EmailParser): parser whose settings are copied to the workers. Its connector is not sent.
+        raw_messages (Iterable): (message id, raw message) pairs, consumed in the I/O thread.
+        options (dict): keyword arguments of EmailParser._parse_raw_message.
+        """
+        buffer = queue.Queue(maxsize=self._queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(raw_messages, buffer, stop), daemon=True
+        )
+        workers = self._workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=self._context(),
+            initializer=_init_worker,
+            initargs=(parser._worker_copy(),),
+        )
+        max_in_flight = workers * 2
+        in_flight = deque() if self._ordered else set()
+        exhausted = False
+        producer.start()
+
+        try:
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        # Do not wait for new messages while parsed ones are ready.
+                        item = buffer.get(block=not in_flight)
+                    except queue.Empty:
+                        break
+                    if item is _END_OF_STREAM:
+                        exhausted = True
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        future = executor.submit(_parse_in_worker, item[0], item[1], options)
+                        if self._ordered:
+                            in_flight.append(future)
+                        else:
+                            in_flight.add(future)
+
+                if not in_flight:
+                    continue
+                if self._ordered:
+                    yield in_flight.popleft().result()
+                else:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.discard(future)
+                        yield future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            producer.join()
@@ -0,0 +1,130 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import time
+from logger import logger
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+
+# Pipeline stages timed with RunStats._stage, in pipeline order.
+STAGES = ("fetch", "mime", "headers", "timestamp", "body", "emoji", "attachments", "index")
+_NO_TIMER = nullcontext()
+
+
+class _StageTimer:
+    """Add the monotonic duration of a with block to a stage of RunStats."""
+
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats: "RunStats", name: str) -> None:
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        stats = self._stats
+        stats.stage_seconds[self._name] = stats.stage_seconds.get(self._name, 0.0) + time.perf_counter() - self._start
+        stats.stage_calls[self._name] = stats.stage_calls.get(self._name, 0) + 1
+
+
+@dataclass
+class RunStats:
+    """
+    Counters collected during a single EmailParser._get_emails run.
+
+    With stage_timings, time spent in every pipeline stage (see STAGES) is measured:
+    fetch (IMAP round-trips), mime (message_from_bytes), headers (decoding), timestamp (_parse_timestamp),
+    body (_extract_email_body and cleaning), emoji (_replace_emojis_with_text), attachments (decoding and I/O)
+    and index (SearchIndex). With log_interval, a summary line is logged every log_interval seconds.
+    """
+
+    batch_size: int = None
+    fetch_commands: int = 0
+    messages: int = 0
+    bytes_fetched: int = 0
+    cache_hits: int = 0
+    attachments: int = 0
+    attachment_bytes: int = 0
+    stage_timings: bool = False
+    log_interval: float = None
+    stage_seconds: dict = field(default_factory=dict)
+    stage_calls: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+    _last_log: float = field(default_factory=time.monotonic, repr=False)
+
+    def _stage(self, name: str) -> [_StageTimer | nullcontext]:
+        """
+        Time a pipeline stage: with self._run_stats._stage("body"): ...
+        Returns a shared no-op context when stage timings are disabled.
+
+        Parameters
+        -----------
+        name (str): stage name, see STAGES.
+        """
+        if not self.stage_timings:
+            return _NO_TIMER
+        return _StageTimer(self, name)
+
+    def _add_fetch(self, payloads: list) -> None:
+        """
+        Register one FETCH round-trip.
+
+        Parameters
+        -----------
+        payloads (list): raw messages returned by the command.
+        """
+        self.fetch_commands += 1
+        self.bytes_fetched += sum(len(payload) for payload in payloads)
+
+    def _add_attachments(self, attachments: list) -> None:
+        """Register attachments as bytes or AttachmentHandle objects."""
+        self.attachments += len(attachments)
+        self.attachment_bytes += sum(
+            len(attachment) if isinstance(attachment, bytes) else attachment.size for attachment in attachments
+        )
+
+    def _add_message(self) -> None:
+        """Register a parsed message and log the summary when log_interval has passed."""
+        self.messages += 1
+        if self.log_interval is not None:
+            now = time.monotonic()
+            if now - self._last_log >= self.log_interval:
+                self._last_log = now
+                logger.info(self._summary())
+
+    def _summary(self) -> str:
+        """One line summary, for example:
+        messages 1200 (85.3/s), fetched 45.10 MB in 12 commands, attachments 3 (3.20 MB) | fetch 4.10s 48%, body 1.20s 14%
+        """
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        line = (
+            f"messages {self.messages} ({self.messages / elapsed:.1f}/s), "
+            f"fetched {self.bytes_fetched / 1024 / 1024:.2f} MB in {self.fetch_commands} commands, "
+            f"attachments {self.attachments} ({self.attachment_bytes / 1024 / 1024:.2f} MB)"
+        )
+        if self.stage_seconds:
+            stages = sorted(self.stage_seconds, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+            line += " | " + ", ".join(
+                f"{name} {self.stage_seconds[name]:.2f}s {self.stage_seconds[name] / elapsed:.0%}" for name in stages
+            )
+        return line
+
+    def _as_dict(self) -> dict:
+        return {
+            "batch_size": self.batch_size,
+            "fetch_commands": self.fetch_commands,
+            "messages": self.messages,
+            "bytes_fetched": self.bytes_fetched,
+            "cache_hits": self.cache_hits,
+            "attachments": self.attachments,
+            "attachment_bytes": self.attachment_bytes,
+            "stage_seconds": dict(self.stage_seconds),
+            "stage_calls": dict(self.stage_calls),
+        }
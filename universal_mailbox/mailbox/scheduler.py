@@ -0,0 +1,220 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import json
+import time
+import threading
+from logger import logger
+from utils import absolute_path
+from dataclasses import dataclass, replace
+from email_connector import EmailConnector
+from typing import Callable, Dict, Final, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# Providers of configuration/imap_servers.json recognized by the domain of email_address.
+PROVIDER_DOMAINS: Final[dict] = {
+    "gmail.com": "gmail",
+    "googlemail.com": "gmail",
+    "outlook.com": "outlook",
+    "hotmail.com": "outlook",
+    "live.com": "outlook",
+    "msn.com": "outlook",
+    "yahoo.com": "yahoo",
+    "icloud.com": "apple",
+    "me.com": "apple",
+    "mac.com": "apple",
+    "aol.com": "aol",
+}
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    """
+    Limits shared by all accounts of one provider.
+
+    connections (int): sessions open at the same time.
+    logins_per_minute (float): new logins per minute, bursts of up to connections logins are allowed.
+    """
+
+    connections: int = 8
+    logins_per_minute: float = 30.0
+
+
+DEFAULT_LIMITS: Final[dict] = {
+    "gmail": ProviderLimit(connections=10, logins_per_minute=60),
+    "outlook": ProviderLimit(connections=8, logins_per_minute=30),
+    "yahoo": ProviderLimit(connections=5, logins_per_minute=20),
+    "apple": ProviderLimit(connections=5, logins_per_minute=20),
+    "aol": ProviderLimit(connections=5, logins_per_minute=20),
+}
+
+
+@dataclass
+class AccountResult:
+    """Progress of one account. The task updates messages, the scheduler everything else."""
+
+    account: str
+    provider: str = None
+    status: str = "pending"
+    messages: int = 0
+    error: str = None
+    seconds: float = 0.0
+
+
+class RateLimiter:
+    """Thread-safe token bucket."""
+
+    def __init__(self, per_minute: float, burst: int = 1) -> None:
+        """
+        Parameters
+        -----------
+        per_minute (float): tokens added per minute.
+        burst (int): maximum number of tokens available at once.
+        """
+        self._rate = per_minute / 60
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+class AccountScheduler:
+    """
+    Run a task for many accounts of settings.json concurrently, within per-provider limits:
+
+    def task(connector: EmailConnector, result: AccountResult) -> None:
+        for data, _ in EmailParser(connector)._get_emails(batch_size=500):
+            result.messages += 1
+
+    results = AccountScheduler(task, workers=32)._run()
+
+    A failing account is reported with status "failed" and does not stop the others.
+    """
+
+    def __init__(
+        self,
+        task: Callable[[EmailConnector, AccountResult], None],
+        accounts: Dict[str, str] = None,
+        workers: int = 16,
+        limits: Dict[str, ProviderLimit] = None,
+        settings: str = None,
+    ) -> None:
+        """
+        Parameters
+        -----------
+        task (Callable): called with a connected EmailConnector and the AccountResult of the account.
+        accounts (dict): {account key: provider}. Default: all accounts of settings.json.
+        workers (int): accounts processed at the same time.
+        limits (dict): {provider: ProviderLimit} overriding DEFAULT_LIMITS.
+        settings (str): settings.json listing the accounts. Default: configuration/settings.json
+        """
+        self._task = task
+        self._workers = workers
+        self._limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._accounts = accounts if accounts is not None else self._load_accounts(settings)
+        self._results = {account: AccountResult(account, provider) for account, provider in self._accounts.items()}
+        self._semaphores = {}
+        self._rate_limiters = {}
+        self._lock = threading.Lock()
+
+    def _load_accounts(self, settings: str = None) -> Dict[str, str]:
+        """
+        Read account keys of settings.json with their providers.
+        The provider is the "email_provider" value of an account, or derived from the domain of "email_address".
+        """
+        settings = settings or absolute_path(os.path.join("..", "configuration/settings.json"))
+        try:
+            with open(settings, "r") as json_file:
+                accounts = json.load(json_file)
+        except Exception as e:
+            logger.exception(f"Cannot read accounts: {e}")
+            return {}
+        return {key: self._provider(values) for key, values in accounts.items()}
+
+    @staticmethod
+    def _provider(account_settings: dict) -> [str | None]:
+        if account_settings.get("email_provider"):
+            return account_settings["email_provider"].lower()
+        domain = str(account_settings.get("email_address", "")).rsplit("@", 1)[-1].lower()
+        return PROVIDER_DOMAINS.get(domain)
+
+    def _provider_limits(self, provider: str) -> tuple:
+        """Return the (semaphore, rate limiter) pair shared by accounts of a provider."""
+        with self._lock:
+            if provider not in self._semaphores:
+                limit = self._limits.get(provider, ProviderLimit())
+                self._semaphores[provider] = threading.BoundedSemaphore(limit.connections)
+                self._rate_limiters[provider] = RateLimiter(limit.logins_per_minute, burst=limit.connections)
+            return self._semaphores[provider], self._rate_limiters[provider]
+
+    def _connect(self, account: str, provider: str) -> EmailConnector:
+        connector = EmailConnector(account, email_provider=provider)
+        connector._connect()
+        return connector
+
+    def _process(self, account: str) -> AccountResult:
+        result = self._results[account]
+        if result.provider is None:
+            result.status, result.error = "failed", "Unknown provider, set email_provider in settings.json"
+            return result
+
+        semaphore, rate_limiter = self._provider_limits(result.provider)
+        with semaphore:
+            start = time.monotonic()
+            result.status = "running"
+            connector = None
+            try:
+                rate_limiter._acquire()
+                connector = self._connect(account, result.provider)
+                self._task(connector, result)
+                result.status = "done"
+            except (Exception, SystemExit) as e:
+                # EmailConnector exits on configuration and login errors, which must not end the other accounts.
+                logger.exception(f"Account {account} failed: {e!r}")
+                result.status, result.error = "failed", repr(e)
+            finally:
+                if connector is not None:
+                    try:
+                        connector._disconnect()
+                    except (Exception, SystemExit):
+                        pass
+                result.seconds = time.monotonic() - start
+        return result
+
+    def _progress(self) -> List[AccountResult]:
+        """Snapshot of all accounts, safe to call from another thread while _run is working."""
+        return [replace(result) for result in self._results.values()]
+
+    def _run(self) -> List[AccountResult]:
+        """Process all accounts and return their results in the order of settings.json."""
+        finished = failed = 0
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = [executor.submit(self._process, account) for account in self._accounts]
+            for future in as_completed(futures):
+                result = future.result()
+                finished += 1
+                failed += result.status == "failed"
+                logger.info(
+                    f"{finished}/{len(futures)} accounts finished, {failed} failed. "
+                    f"{result.account}: {result.status}, {result.messages} messages in {result.seconds:.1f}s"
+                )
+        return self._progress()
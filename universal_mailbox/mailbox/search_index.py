@@ -0,0 +1,324 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import re
+import sqlite3
+import threading
+from logger import logger
+from datetime import datetime, timezone
+from utils import absolute_path
+from typing import Final, Iterable, List
+from email.utils import parsedate_to_datetime
+
+
+# _set_filter arguments answered from the index mapped to FTS5 columns.
+TEXT_FILTERS: Final[dict] = {
+    "body": "body",
+    "subject": "subject",
+    "mail_from": "mail_from",
+    "mail_to": "mail_to",
+    "cc": "cc",
+    "bcc": "bcc",
+    "user_agent": "user_agent",
+}
+# Flags and keywords live on the server only.
+SERVER_ONLY_FILTERS: Final[tuple] = (
+    "by_keyword",
+    "custom_search",
+    "seen",
+    "unseen",
+    "answered",
+    "unanswered",
+    "deleted",
+    "flagged",
+)
+
+
+class SearchIndex:
+    """
+    Local SQLite FTS5 index of parsed messages, filled by EmailParser._get_emails(search_index=...):
+    index = SearchIndex()
+    for data, _ in parser._get_emails(search_index=index): ...
+    index._search(subject="invoice", since="01-Jan-2024")
+
+    Messages are identified by account, mailbox and Message-ID.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        """
+        Parameters
+        -----------
+        path (str): sqlite file holding the index. Default: mailbox/cache/search_index.sqlite3
+        """
+        self._path = path or absolute_path(os.path.join("cache", "search_index.sqlite3"))
+        self._lock = threading.Lock()
+        self._database = None
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        # Worker processes open their own connection.
+        state = self.__dict__.copy()
+        state["_database"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._database is None:
+            self._database = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+            self._database.execute("PRAGMA journal_mode = WAL")
+            self._database.execute("PRAGMA synchronous = NORMAL")
+            self._database.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    account TEXT NOT NULL,
+                    mailbox TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    date TEXT,
+                    day TEXT,
+                    size INTEGER,
+                    priority INTEGER,
+                    attachments INTEGER NOT NULL,
+                    UNIQUE (account, mailbox, message_id)
+                )
+                """
+            )
+            self._database.execute("CREATE INDEX IF NOT EXISTS messages_day ON messages (day)")
+            self._database.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_text USING fts5 (
+                    subject, mail_from, mail_to, cc, bcc, user_agent, body, attachment_names,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+                """
+            )
+        return self._database
+
+    def _date(self, value: [str | datetime]) -> [datetime | None]:
+        if isinstance(value, datetime):
+            return value
+        try:
+            return parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            try:
+                return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                return None
+
+    def _utc(self, date: [datetime | None]) -> [str | None]:
+        """
+        Return the date as an ISO string in UTC, so that ORDER BY date sorts chronologically.
+        Dates without an offset (-0000 or the format_datetime format) are taken as UTC.
+        """
+        if date is None:
+            return None
+        if date.tzinfo is None:
+            return date.replace(tzinfo=timezone.utc).isoformat()
+        return date.astimezone(timezone.utc).isoformat()
+
+    def _address_text(self, record: dict, key: str) -> [str | None]:
+        # With separate_sender_email the addresses are kept under "... Email" keys, the names under key.
+        values = [str(value) for value in (record.get(key), record.get(f"{key} Email")) if value]
+        return " ".join(values) if values else None
+
+    def _priority(self, value: str) -> [int | None]:
+        match = re.match(r"\s*(\d)", str(value or ""))
+        return int(match.group(1)) if match else None
+
+    def _add(
+        self,
+        account: str,
+        mailbox: str,
+        record: dict,
+        attachment_names: List[str] = None,
+        size: int = None,
+    ) -> None:
+        """
+        Index a parsed message, replacing a previously indexed copy.
+
+        Parameters
+        -----------
+        account (str): account identifier, for example: EmailConnector._account_key().
+        mailbox (str): mailbox name.
+        record (dict | EmailRecord): record returned by EmailParser._parse_message.
+        attachment_names (list): file names of the message attachments.
+        size (int): size of the raw message in bytes.
+        """
+        message_id = record.get("Message-ID")
+        if not message_id:
+            return
+        date = self._date(record.get("Date"))
+        body = record.get("Body")
+        attachment_names = attachment_names or []
+        text = (
+            record.get("Subject"),
+            self._address_text(record, "From"),
+            self._address_text(record, "To"),
+            self._address_text(record, "CC"),
+            self._address_text(record, "BCC"),
+            record.get("X-Mailer"),
+            re.sub(r"\s+", " ", body) if body else None,
+            " ".join(attachment_names),
+        )
+        text = tuple(None if value is None else str(value) for value in text)
+
+        with self._lock:
+            database = self._connection()
+            row = database.execute(
+                "SELECT id FROM messages WHERE account = ? AND mailbox = ? AND message_id = ?",
+                (account, mailbox, message_id),
+            ).fetchone()
+            if row:
+                database.execute("DELETE FROM messages_text WHERE rowid = ?", row)
+                database.execute("DELETE FROM messages WHERE id = ?", row)
+            cursor = database.execute(
+                "INSERT INTO messages (account, mailbox, message_id, date, day, size, priority, attachments) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    account,
+                    mailbox,
+                    message_id,
+                    self._utc(date),
+                    # IMAP SINCE and BEFORE compare the date of the message, not the UTC one.
+                    date.date().isoformat() if date else None,
+                    size,
+                    self._priority(record.get("X-Priority")),
+                    len(attachment_names),
+                ),
+            )
+            database.execute(
+                "INSERT INTO messages_text (rowid, subject, mail_from, mail_to, cc, bcc, user_agent, body, "
+                "attachment_names) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cursor.lastrowid, *text),
+            )
+            database.commit()
+
+    def _phrase(self, value: str) -> str:
+        return '"' + str(value).replace('"', '""') + '"'
+
+    def _day(self, value: str) -> str:
+        # _set_filter dates use the IMAP format, for example: 01-Jan-2024
+        return datetime.strptime(value, "%d-%b-%Y").date().isoformat()
+
+    def _search(
+        self,
+        account: str = None,
+        mailbox: str = None,
+        limit: int = None,
+        body: str = None,
+        subject: str = None,
+        mail_from: str = None,
+        mail_to: str = None,
+        since: str = None,
+        before: str = None,
+        cc: str = None,
+        bcc: str = None,
+        user_agent: str = None,
+        header_message_id: str = None,
+        high_priority: bool = None,
+        low_priority: bool = None,
+        has_attachment: bool = None,
+        attachment_smaller_than: int = None,
+        attachment_larger_than: int = None,
+        **server_filters,
+    ) -> [list | None]:
+        """
+        Search indexed messages with the keyword arguments of EmailParser._set_filter.
+        Text criteria match words and phrases, for example: subject="march invoice".
+        Returns a list of {"Account", "Mailbox", "Message-ID", "Date"} dicts, newest first, with ISO dates in UTC,
+        or None when a criterion can only be answered by the server (flags and keywords).
+
+        Parameters
+        -----------
+        account (str): limit results to one account.
+        mailbox (str): limit results to one mailbox.
+        limit (int): maximum number of results.
+        attachment_smaller_than (int) / attachment_larger_than (int): message size in bytes, like SMALLER/LARGER.
+        """
+        unsupported = [key for key, value in server_filters.items() if value]
+        unknown = [key for key in unsupported if key not in SERVER_ONLY_FILTERS]
+        if unknown:
+            raise TypeError(f"Unexpected search arguments: {', '.join(unknown)}")
+        if unsupported:
+            logger.error(f"Search criteria available on the server only: {', '.join(unsupported)}")
+            return None
+
+        text_values = dict(
+            body=body, subject=subject, mail_from=mail_from, mail_to=mail_to, cc=cc, bcc=bcc, user_agent=user_agent
+        )
+        match = " AND ".join(
+            f"{TEXT_FILTERS[key]} : {self._phrase(value)}" for key, value in text_values.items() if value
+        )
+        conditions, parameters = [], []
+        if match:
+            conditions.append("messages.id IN (SELECT rowid FROM messages_text WHERE messages_text MATCH ?)")
+            parameters.append(match)
+        for column, value in (("account", account), ("mailbox", mailbox), ("message_id", header_message_id)):
+            if value:
+                conditions.append(f"{column} = ?")
+                parameters.append(str(value).strip("<> ") if column == "message_id" else value)
+        if since:
+            conditions.append("day >= ?")
+            parameters.append(self._day(since))
+        if before:
+            conditions.append("day < ?")
+            parameters.append(self._day(before))
+        if high_priority:
+            conditions.append("priority IN (1, 2)")
+        if low_priority:
+            conditions.append("priority IN (4, 5)")
+        if has_attachment:
+            conditions.append("attachments > 0")
+        if attachment_smaller_than:
+            conditions.append("size < ?")
+            parameters.append(attachment_smaller_than)
+        if attachment_larger_than:
+            conditions.append("size > ?")
+            parameters.append(attachment_larger_than)
+
+        query = "SELECT account, mailbox, message_id, date FROM messages"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date DESC"
+        if limit:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self._connection().execute(query, parameters).fetchall()
+        return [
+            {"Account": account, "Mailbox": mailbox, "Message-ID": message_id, "Date": date}
+            for account, mailbox, message_id, date in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def _remove(self, account: str, mailbox: str, message_ids: Iterable[str]) -> None:
+        """Remove messages from the index, for example after they were deleted on the server."""
+        with self._lock:
+            database = self._connection()
+            for message_id in message_ids:
+                row = database.execute(
+                    "SELECT id FROM messages WHERE account = ? AND mailbox = ? AND message_id = ?",
+                    (account, mailbox, message_id),
+                ).fetchone()
+                if row:
+                    database.execute("DELETE FROM messages_text WHERE rowid = ?", row)
+                    database.execute("DELETE FROM messages WHERE id = ?", row)
+            database.commit()
+
+    def _close(self) -> None:
+        if self._database is not None:
+            self._database.close()
+            self._database = None
@@ -0,0 +1,341 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from dataclasses import dataclass
+from imap_utils import sequence_set
+from typing import Final, Iterable, NamedTuple
+
+
+MONTHS: Final[tuple] = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# RFC 3501 search keys and kinds of their arguments.
+SEARCH_KEYS: Final[dict] = {
+    "ALL": (),
+    "ANSWERED": (),
+    "DELETED": (),
+    "DRAFT": (),
+    "FLAGGED": (),
+    "NEW": (),
+    "OLD": (),
+    "RECENT": (),
+    "SEEN": (),
+    "UNANSWERED": (),
+    "UNDELETED": (),
+    "UNDRAFT": (),
+    "UNFLAGGED": (),
+    "UNSEEN": (),
+    "BCC": ("string",),
+    "BODY": ("string",),
+    "CC": ("string",),
+    "FROM": ("string",),
+    "SUBJECT": ("string",),
+    "TEXT": ("string",),
+    "TO": ("string",),
+    "HEADER": ("string", "string"),
+    "KEYWORD": ("atom",),
+    "UNKEYWORD": ("atom",),
+    "BEFORE": ("date",),
+    "ON": ("date",),
+    "SINCE": ("date",),
+    "SENTBEFORE": ("date",),
+    "SENTON": ("date",),
+    "SENTSINCE": ("date",),
+    "LARGER": ("number",),
+    "SMALLER": ("number",),
+    "UID": ("set",),
+}
+_ATOM: Final = re.compile(r"^[^\s(){%*\"\\\]\x00-\x1f\x7f]+$")
+_SEQUENCE_SET: Final = re.compile(r"^(?:\d+|\*)(?::(?:\d+|\*))?(?:,(?:\d+|\*)(?::(?:\d+|\*))?)*$")
+_IMAP_DATE: Final = re.compile(r"^\d{1,2}-[A-Za-z]{3}-\d{4}$")
+
+
+class CompiledQuery(NamedTuple):
+    """
+    IMAP SEARCH arguments.
+    With a literal, criteria end with the search key expecting it, for example: FROM "a@b.com" SUBJECT
+    """
+
+    criteria: str
+    charset: str = None
+    literal: bytes = None
+
+
+class SearchQuery:
+    """Base of search expressions, combined with & (AND), | (OR) and ~ (NOT)."""
+
+    def __and__(self, other: "SearchQuery") -> "And":
+        return And(self, other)
+
+    def __or__(self, other: "SearchQuery") -> "Or":
+        return Or(self, other)
+
+    def __invert__(self) -> "Not":
+        return Not(self)
+
+    def _compile(self, literals: list) -> str:
+        raise NotImplementedError
+
+    def _operand(self, literals: list) -> str:
+        # OR and NOT take a single search key, so AND lists are grouped in parentheses.
+        return self._compile(literals)
+
+
+@dataclass(frozen=True)
+class Term(SearchQuery):
+    """
+    Single search key with its arguments, for example: Term("FROM", "a@b.com"), Term("SINCE", date(2024, 1, 1)).
+    """
+
+    key: str
+    arguments: tuple = ()
+
+    def __init__(self, key: str, *arguments) -> None:
+        key = key.upper()
+        if key not in SEARCH_KEYS:
+            raise ValueError(f"Unsupported search key: {key}")
+        if len(arguments) != len(SEARCH_KEYS[key]):
+            raise ValueError(f"{key} expects {len(SEARCH_KEYS[key])} argument(s), got {len(arguments)}")
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "arguments", tuple(arguments))
+
+    def _compile(self, literals: list) -> str:
+        parts = [self.key]
+        for kind, value in zip(SEARCH_KEYS[self.key], self.arguments):
+            if kind == "string":
+                parts.append(quote(value, literals))
+            elif kind == "date":
+                parts.append(imap_date(value))
+            elif kind == "number":
+                parts.append(str(int(value)))
+            elif kind == "set":
+                parts.append(_checked(str(value), _SEQUENCE_SET, "sequence set"))
+            else:
+                parts.append(_checked(str(value), _ATOM, "keyword"))
+        return " ".join(parts)
+
+
+@dataclass(frozen=True)
+class Raw(SearchQuery):
+    """Criteria passed to the server unchanged, for example provider extensions: Raw('X-GM-RAW "has:drive"')."""
+
+    criteria: str
+
+    def _compile(self, literals: list) -> str:
+        return self.criteria
+
+    def _operand(self, literals: list) -> str:
+        return f"({self.criteria})"
+
+
+@dataclass(frozen=True)
+class And(SearchQuery):
+    queries: tuple
+
+    def __init__(self, *queries: SearchQuery) -> None:
+        flat = []
+        for query in queries:
+            flat.extend(query.queries if isinstance(query, And) else (query,))
+        object.__setattr__(self, "queries", tuple(flat))
+
+    def _compile(self, literals: list) -> str:
+        # A literal can only be sent at the end of the command, so its term goes last.
+        ordered = sorted(self.queries, key=_has_literal)
+        return " ".join(query._operand(literals) for query in ordered) or "ALL"
+
+    def _operand(self, literals: list) -> str:
+        if len(self.queries) == 1:
+            return self.queries[0]._operand(literals)
+        return f"({self._compile(literals)})"
+
+
+@dataclass(frozen=True)
+class Or(SearchQuery):
+    queries: tuple
+
+    def __init__(self, *queries: SearchQuery) -> None:
+        if len(queries) < 2:
+            raise ValueError("Or needs at least two queries")
+        flat = []
+        for query in queries:
+            flat.extend(query.queries if isinstance(query, Or) else (query,))
+        object.__setattr__(self, "queries", tuple(flat))
+
+    def _compile(self, literals: list) -> str:
+        # IMAP OR is binary: OR a OR b c
+        first, *rest = sorted(self.queries, key=_has_literal)
+        if not rest:
+            return first._operand(literals)
+        return f"OR {first._operand(literals)} {Or._chain(rest)._operand(literals)}"
+
+    @staticmethod
+    def _chain(queries: list) -> SearchQuery:
+        return queries[0] if len(queries) == 1 else Or(*queries)
+
+
+@dataclass(frozen=True)
+class Not(SearchQuery):
+    query: SearchQuery
+
+    def _compile(self, literals: list) -> str:
+        return f"NOT {self.query._operand(literals)}"
+
+
+def _has_literal(query: SearchQuery) -> bool:
+    if isinstance(query, Term):
+        return any(
+            kind == "string" and not str(value).isascii()
+            for kind, value in zip(SEARCH_KEYS[query.key], query.arguments)
+        )
+    if isinstance(query, (And, Or)):
+        return any(_has_literal(part) for part in query.queries)
+    if isinstance(query, Not):
+        return _has_literal(query.query)
+    return False
+
+
+def _checked(value: str, pattern: re.Pattern, name: str) -> str:
+    if not pattern.match(value):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    return value
+
+
+def quote(value: str, literals: list) -> str:
+    """
+    Quote a search string. Non-ASCII strings are collected in literals and left out of the criteria.
+
+    Parameters
+    -----------
+    value (str): string argument of a search key.
+    literals (list): collected literals.
+    """
+    value = str(value)
+    if "\r" in value or "\n" in value:
+        raise ValueError("Search strings cannot contain line breaks")
+    if not value.isascii():
+        literals.append(value.encode("utf-8"))
+        return ""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def imap_date(value: [date | datetime | str]) -> str:
+    """Format a date as IMAP date, for example: date(2024, 1, 5) -> 5-Jan-2024"""
+    if isinstance(value, (date, datetime)):
+        return f"{value.day}-{MONTHS[value.month - 1]}-{value.year}"
+    return _checked(str(value), _IMAP_DATE, "date, expected for example 01-Jan-2024")
+
+
+def uid_range(start: int, end: int = None) -> Term:
+    """UIDs from start to end, or to the newest message when end is None."""
+    return Term("UID", f"{int(start)}:{'*' if end is None else int(end)}")
+
+
+def uids(values: Iterable[int]) -> Term:
+    return Term("UID", sequence_set(values))
+
+
+def date_range(since: [date | str] = None, before: [date | str] = None) -> SearchQuery:
+    """Messages with internal date in [since, before)."""
+    terms = [Term("SINCE", since)] if since else []
+    terms += [Term("BEFORE", before)] if before else []
+    return And(*terms)
+
+
+def criteria(
+    body: str = None,
+    by_keyword: str = None,
+    subject: str = None,
+    mail_from: str = None,
+    mail_to: str = None,
+    since: [date | str] = None,
+    before: [date | str] = None,
+    cc: str = None,
+    bcc: str = None,
+    user_agent: str = None,
+    header_message_id: str = None,
+    seen: bool = None,
+    unseen: bool = None,
+    answered: bool = None,
+    unanswered: bool = None,
+    deleted: bool = None,
+    flagged: bool = None,
+    custom_search: str = None,
+    high_priority: bool = None,
+    low_priority: bool = None,
+    has_attachment: bool = None,
+    attachment_smaller_than: int = None,
+    attachment_larger_than: int = None,
+) -> And:
+    """
+    Build a query from the keyword arguments of EmailParser._set_filter, so it can be combined:
+    criteria(mail_from="a@b.com") | criteria(mail_from="c@d.com")
+
+    Criteria without an RFC 3501 search key are expressed with HEADER:
+    user_agent -> User-Agent, high_priority/low_priority -> X-Priority 1/5,
+    has_attachment -> Content-Type multipart/mixed.
+    """
+    terms = []
+    for key, value in (
+        ("BODY", body),
+        ("KEYWORD", by_keyword),
+        ("SUBJECT", subject),
+        ("TO", mail_to),
+        ("FROM", mail_from),
+        ("SINCE", since),
+        ("BEFORE", before),
+        ("CC", cc),
+        ("BCC", bcc),
+        ("KEYWORD", custom_search),
+        ("SMALLER", attachment_smaller_than),
+        ("LARGER", attachment_larger_than),
+    ):
+        if value:
+            terms.append(Term(key, value))
+    for key, value in (
+        ("SEEN", seen),
+        ("UNSEEN", unseen),
+        ("ANSWERED", answered),
+        ("UNANSWERED", unanswered),
+        ("DELETED", deleted),
+        ("FLAGGED", flagged),
+    ):
+        if value:
+            terms.append(Term(key))
+    for header, value in (
+        ("User-Agent", user_agent),
+        ("Message-ID", header_message_id),
+        ("X-Priority", "1" if high_priority else None),
+        ("X-Priority", "5" if low_priority else None),
+        ("Content-Type", "multipart/mixed" if has_attachment else None),
+    ):
+        if value:
+            terms.append(Term("HEADER", header, value))
+    return And(*terms)
+
+
+@lru_cache(maxsize=1024)
+def compile_query(query: SearchQuery) -> CompiledQuery:
+    """
+    Compile a search expression into IMAP SEARCH arguments. Results are cached per expression.
+    A single non-ASCII string is sent as an UTF-8 literal at the end of the command,
+    so it cannot be part of a parenthesized group.
+
+    Parameters
+    -----------
+    query (SearchQuery): for example: (Term("FROM", "a@b.com") | Term("FROM", "c@d.com")) & Term("SINCE", "01-Jan-2024")
+    """
+    literals = []
+    criteria = query._compile(literals)
+    if not literals:
+        return CompiledQuery(criteria)
+    if len(literals) > 1:
+        raise ValueError("Only one non-ASCII search string is supported per query")
+    if not criteria.endswith(" "):
+        raise ValueError("A non-ASCII search string cannot be nested in parentheses")
+    return CompiledQuery(criteria.rstrip(), charset="UTF-8", literal=literals[0])
@@ -0,0 +1,150 @@
+#!/usr/bin/python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import os
+import json
+import tempfile
+import threading
+from logger import logger
+from utils import absolute_path
+from collections import deque
+from typing import Generator, Iterable
+
+
+# Stores of the same file share one lock, every _get_emails(incremental=True) call creates its own store.
+_FILE_LOCKS = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _file_lock(file_path: str) -> threading.Lock:
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(os.path.abspath(file_path), threading.Lock())
+
+
+class SyncStateStore:
+    """
+    Persist UIDVALIDITY and the last seen UID per account and mailbox.
+
+    State is kept in a small json file:
+    {"account|mailbox": {"uidvalidity": 1700000000, "last_uid": 4821}}
+    """
+
+    def __init__(self, file_path: str = None) -> None:
+        """
+        Parameters
+        -----------
+        file_path (str): path to the state file. Default: mailbox/state/sync_state.json
+        """
+        self._file_path = file_path or absolute_path(
+            os.path.join("state", "sync_state.json")
+        )
+        self._lock = _file_lock(self._file_path)
+
+    @staticmethod
+    def _key(account: str, mailbox: str) -> str:
+        return f"{account}|{mailbox}"
+
+    def _read(self) -> dict:
+        if not os.path.exists(self._file_path):
+            return {}
+        try:
+            with open(self._file_path, "r") as json_file:
+                return json.load(json_file)
+        except Exception as e:
+            logger.exception(f"Cannot read sync state, starting from scratch: {e}")
+            return {}
+
+    def _load(self, account: str, mailbox: str) -> [dict | None]:
+        """
+        Return saved state for a mailbox.
+
+        Parameters
+        -----------
+        account (str): account identifier, for example: EmailConnector._account_key().
+        mailbox (str): mailbox name, for example: Inbox.
+        """
+        with self._lock:
+            return self._read().get(self._key(account, mailbox))
+
+    def _save(self, account: str, mailbox: str, uidvalidity: int, last_uid: int) -> None:
+        """
+        Store the high-water mark of a mailbox. The file is replaced atomically.
+
+        Parameters
+        -----------
+        account (str): account identifier.
+        mailbox (str): mailbox name.
+        uidvalidity (int): UIDVALIDITY reported by the server on select.
+        last_uid (int): highest UID that was processed.
+        """
+        with self._lock:
+            state = self._read()
+            state[self._key(account, mailbox)] = {
+                "uidvalidity": uidvalidity,
+                "last_uid": last_uid,
+            }
+            self._write(state)
+
+    def _reset(self, account: str, mailbox: str) -> None:
+        """Forget the high-water mark so the next run does a full sync."""
+        with self._lock:
+            state = self._read()
+            if state.pop(self._key(account, mailbox), None) is not None:
+                self._write(state)
+
+    def _write(self, state: dict) -> None:
+        """Replace the state file atomically, called with self._lock held."""
+        directory = os.path.dirname(self._file_path)
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=directory, prefix=f"{os.path.basename(self._file_path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w") as json_file:
+                json.dump(state, json_file, indent=4)
+            os.replace(temporary_path, self._file_path)
+        except Exception as e:
+            logger.exception(f"Cannot save sync state: {e}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+
+class UidWatermark:
+    """
+    Highest UID up to which every requested message was delivered. UIDs missing in a FETCH response
+    or in a failed FETCH block it, as do messages delivered out of fetch order (parse_workers with ordered=False),
+    so saving it never skips a message. Messages above a blocked UID are fetched again by the next run.
+
+    message_id_windows = watermark._request(message_id_windows)   # UIDs in fetch order, window by window
+    watermark._deliver(uid)                                        # after the message was handed to the consumer
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        """
+        Parameters
+        -----------
+        start (int): watermark of the previous run.
+        """
+        self._value = start
+        self._requested = deque()
+        self._delivered = set()
+
+    def _request(self, message_id_windows: Iterable) -> Generator:
+        """Record requested UIDs before their window is fetched, may run in the I/O thread of a ParsePipeline."""
+        for message_ids in message_id_windows:
+            self._requested.extend(int(uid) for uid in message_ids)
+            yield message_ids
+
+    def _deliver(self, uid: int) -> None:
+        if uid <= self._value:
+            # Already counted, for example by MailExporter before the parser delivers it.
+            return
+        self._delivered.add(uid)
+        while self._requested and self._requested[0] in self._delivered:
+            head = self._requested.popleft()
+            self._delivered.discard(head)
+            self._value = max(self._value, head)
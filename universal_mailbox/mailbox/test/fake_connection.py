@@ -0,0 +1,252 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+
+import io
+import re
+import ssl
+import socket
+import threading
+from email.message import EmailMessage
+
+
+def build_message(
+    subject: str = "Subject",
+    body: str = "Body",
+    sender: str = "Sender <sender@example.com>",
+    date: str = "Mon, 01 Jan 2024 10:00:00 +0000",
+    message_id: str = "<id@example.com>",
+) -> bytes:
+    """Build a simple RFC822 message."""
+
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = "Receiver <receiver@example.com>"
+    message["Date"] = date
+    message["Message-ID"] = message_id
+    message.set_content(body)
+    return message.as_bytes()
+
+
+class TLSRecordSocketIO(io.RawIOBase):
+    """
+    Raw file of a socket behaving like an SSL socket in non-blocking mode:
+    a read with no complete TLS record raises SSLWantReadError instead of returning None.
+    Every sendall() of the fake server counts as one TLS record.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            return self._sock.recv_into(buffer)
+        except BlockingIOError:
+            raise ssl.SSLWantReadError("The operation did not complete (read)")
+
+
+class FakeIMAPConnection:
+    """In-memory stand-in for imaplib.IMAP4_SSL used by unit tests."""
+
+    def __init__(self, messages: list, uidvalidity: int = 1, tls: bool = False) -> None:
+        """
+        Parameters
+        -----------
+        messages (list): raw RFC822 messages or (uid, raw message) tuples.
+        uidvalidity (int): UIDVALIDITY reported on select.
+        tls (bool): read responses like from an SSL socket, see TLSRecordSocketIO.
+        """
+        self.messages = [
+            message if isinstance(message, tuple) else (index + 1, message)
+            for index, message in enumerate(messages)
+        ]
+        self.uidvalidity = uidvalidity
+        self.commands = []
+        self.untagged_responses = {}
+        self.literal = None
+        self.capabilities = ("IMAP4REV1", "IDLE")
+        self.tagged_commands = {}
+        # Message sets answered with NO, for example {"3:4"}.
+        self.failing_fetches = set()
+        self._tag_number = 0
+        self._tls = tls
+        self._file = None
+        self._idle_tag = None
+        self._unreported = False
+        self._sockets = None
+        self._idle_lock = threading.Lock()
+
+    def select(self, mailbox: str = "INBOX", readonly: bool = False) -> tuple:
+        self.commands.append(("SELECT", mailbox))
+        uid_next = max([uid for uid, _ in self.messages], default=0) + 1
+        self.untagged_responses = {
+            "EXISTS": [str(len(self.messages)).encode()],
+            "UIDVALIDITY": [str(self.uidvalidity).encode()],
+            "UIDNEXT": [str(uid_next).encode()],
+        }
+        return "OK", self.untagged_responses["EXISTS"]
+
+    def response(self, code: str) -> tuple:
+        # imaplib removes returned untagged responses.
+        return code, self.untagged_responses.pop(code, [None])
+
+    @property
+    def sock(self) -> socket.socket:
+        """Client end of a socket pair, the fake server writes IDLE responses to the other end."""
+        if self._sockets is None:
+            self._sockets = socket.socketpair()
+        return self._sockets[0]
+
+    @property
+    def file(self) -> io.BufferedReader:
+        """Buffered file of the socket, imaplib reads responses through it."""
+        if self._file is None:
+            self._file = io.BufferedReader(TLSRecordSocketIO(self.sock)) if self._tls else self.sock.makefile("rb")
+        return self._file
+
+    def readline(self) -> bytes:
+        return self.file.readline()
+
+    def _new_tag(self) -> bytes:
+        self._tag_number += 1
+        tag = f"FAKE{self._tag_number}".encode()
+        self.tagged_commands[tag] = None
+        return tag
+
+    def send(self, data: bytes) -> None:
+        with self._idle_lock:
+            self._send(data)
+
+    def _send(self, data: bytes) -> None:
+        server = self._sockets[1]
+        if data.endswith(b" IDLE\r\n"):
+            self.commands.append(("IDLE",))
+            self._idle_tag = data.split(b" ", 1)[0]
+            server.sendall(b"+ idling\r\n")
+            if self._unreported:
+                # Servers report changes made while the client was busy as soon as it idles.
+                server.sendall(f"* {len(self.messages)} EXISTS\r\n".encode())
+                self._unreported = False
+        elif data == b"DONE\r\n":
+            self.commands.append(("DONE",))
+            server.sendall(self._idle_tag + b" OK IDLE terminated\r\n")
+            self._idle_tag = None
+
+    def _deliver(self, raw_message: bytes) -> int:
+        """Add a new message like an MTA would and notify an idling client. Returns its UID."""
+        with self._idle_lock:
+            return self._add_message(raw_message)
+
+    def _add_message(self, raw_message: bytes) -> int:
+        uid = max([uid for uid, _ in self.messages], default=0) + 1
+        self.messages.append((uid, raw_message))
+        self.untagged_responses["EXISTS"] = [str(len(self.messages)).encode()]
+        if self._idle_tag is not None:
+            self._sockets[1].sendall(f"* {len(self.messages)} EXISTS\r\n".encode())
+        else:
+            self._unreported = True
+        return uid
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sockets is not None:
+            for end in self._sockets:
+                end.close()
+            self._sockets = None
+
+    def noop(self) -> tuple:
+        self.commands.append(("NOOP",))
+        return "OK", [b"NOOP completed"]
+
+    def logout(self) -> tuple:
+        self.commands.append(("LOGOUT",))
+        return "BYE", [b"Logging out"]
+
+    def search(self, charset, *criteria) -> tuple:
+        self.commands.append(("SEARCH", " ".join(criteria)))
+        self._take_literal()
+        numbers = [
+            str(index + 1)
+            for index, (uid, _) in enumerate(self.messages)
+            if self._matches(uid, " ".join(criteria))
+        ]
+        return "OK", [" ".join(numbers).encode()]
+
+    def fetch(self, message_set: str, message_parts: str) -> tuple:
+        self.commands.append(("FETCH", message_set, message_parts))
+        if message_set in self.failing_fetches:
+            return "NO", [b"FETCH failed"]
+        indexes = self._expand(message_set, len(self.messages))
+        return "OK", self._fetch_response([(index, False) for index in indexes], message_parts)
+
+    def uid(self, command: str, *args) -> tuple:
+        command = command.upper()
+        self.commands.append(("UID " + command,) + args)
+        if command == "SEARCH":
+            self._take_literal()
+            criteria = " ".join(args)
+            uids = [str(uid) for uid, _ in self.messages if self._matches(uid, criteria)]
+            if not uids and re.search(r"UID \d+:\*", criteria) and self.messages:
+                # RFC 3501: "n:*" always matches the last message.
+                uids = [str(self.messages[-1][0])]
+            return "OK", [" ".join(uids).encode()]
+        if command == "FETCH" and args[0] in self.failing_fetches:
+            return "NO", [b"FETCH failed"]
+        if command == "FETCH":
+            max_uid = max([uid for uid, _ in self.messages], default=0)
+            wanted = set(self._expand(args[0], max_uid))
+            indexes = [index for index, (uid, _) in enumerate(self.messages, 1) if uid in wanted]
+            return "OK", self._fetch_response([(index, True) for index in indexes], args[1])
+        return "NO", [b"Unsupported command"]
+
+    def _take_literal(self) -> None:
+        # imaplib sends the literal after the arguments of the next command and resets it.
+        if self.literal is not None:
+            self.commands.append(("LITERAL", self.literal))
+            self.literal = None
+
+    def _matches(self, uid: int, criteria: str) -> bool:
+        uid_range = re.search(r"UID (\S+)", criteria)
+        if not uid_range:
+            return True
+        max_uid = max([uid for uid, _ in self.messages], default=0)
+        return uid in self._expand(uid_range.group(1), max_uid)
+
+    def _fetch_response(self, indexes: list, message_parts: str) -> list:
+        data = []
+        for index, with_uid in indexes:
+            uid, raw_message = self.messages[index - 1]
+            if "HEADER" in message_parts:
+                item = "BODY[HEADER]"
+                payload = raw_message.split(b"\n\n", 1)[0] + b"\n\n"
+            else:
+                item = "RFC822"
+                payload = raw_message
+            uid_part = f"UID {uid} " if with_uid or "UID" in message_parts else ""
+            data.append((f"{index} ({uid_part}{item} {{{len(payload)}}}".encode(), payload))
+            data.append(b")")
+        return data
+
+    @staticmethod
+    def _expand(message_set, maximum: int) -> list:
+        if isinstance(message_set, bytes):
+            message_set = message_set.decode()
+        numbers = []
+        for part in str(message_set).split(","):
+            if ":" in part:
+                start, end = part.split(":")
+                start = maximum if start == "*" else int(start)
+                end = maximum if end == "*" else int(end)
+                numbers.extend(range(min(start, end), max(start, end) + 1))
+            else:
+                numbers.append(maximum if part == "*" else int(part))
+        return numbers
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_address_parsing"]
+
+import gc
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection
+from address_parsing import AddressTable, display_name, parse_addresses
+
+
+def build_raw_message(number: int) -> bytes:
+    return (
+        f"Subject: Newsletter {number}\r\n"
+        "From: =?utf-8?q?Sklep=2C_Sp=C3=B3=C5=82ka?= <shop@example.com>\r\n"
+        'To: Jan <jan@example.com>, "Nowak, Anna" <anna@example.com>, ola@example.com\r\n'
+        f"Message-ID: <{number}@example.com>\r\n\r\nBody\r\n"
+    ).encode()
+
+
+class TestAddressParsing(unittest.TestCase):
+    def test_positive_address_list(self) -> None:
+        self.assertEqual(
+            parse_addresses('Jan <jan@example.com>, "Nowak, Anna" <anna@example.com>, ola@example.com'),
+            [("Jan", "jan@example.com"), ("Nowak, Anna", "anna@example.com"), ("", "ola@example.com")],
+        )
+        self.assertEqual(
+            parse_addresses("=?utf-8?q?Kowalski=2C_Jan?= <jan@example.com>"), [("Kowalski, Jan", "jan@example.com")]
+        )
+
+    def test_negative_no_address(self) -> None:
+        self.assertEqual(parse_addresses("undisclosed-recipients:;"), [])
+        self.assertIsNone(AddressTable()._split("undisclosed-recipients:;"))
+
+    def test_positive_interning(self) -> None:
+        table = AddressTable()
+        first = table._split("Jan <jan@example.com>, Ola <ola@example.com>")
+        second = table._split("Jan <jan@example.com>, Ola <ola@example.com>")
+        self.assertEqual(first, ("Jan, Ola", "jan@example.com, ola@example.com"))
+        self.assertEqual(table._split("ola@example.com"), ("ola@example.com", "ola@example.com"))
+        self.assertIs(first[1], second[1])
+        # A different raw value with the same recipients shares the strings as well.
+        self.assertIs(table._split('"Jan" <jan@example.com>, "Ola" <ola@example.com>')[1], first[1])
+        self.assertEqual(len(table), 3)
+
+    def test_positive_names_with_commas_quoted(self) -> None:
+        self.assertEqual(display_name("Nowak, Anna", "anna@example.com"), '"Nowak, Anna"')
+        self.assertEqual(display_name('Jan "JK" K.', "jan@example.com"), '"Jan \\"JK\\" K."')
+        self.assertEqual(display_name("", "ola@example.com"), "ola@example.com")
+
+        names, addresses = AddressTable()._split('Jan <jan@example.com>, "Nowak, Anna" <anna@example.com>')
+        self.assertEqual(names, 'Jan, "Nowak, Anna"')
+        self.assertEqual(addresses, "jan@example.com, anna@example.com")
+
+    def test_positive_separate_sender_email(self) -> None:
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection([build_raw_message(number) for number in range(3)])
+        parser = EmailParser(connector)
+        records = [data for data, _ in parser._get_emails(headers_only=True, separate_sender_email=True)]
+
+        self.assertEqual((records[0]["From"], records[0]["From Email"]), ('"Sklep, Spółka"', "shop@example.com"))
+        self.assertEqual(records[0]["To"], 'Jan, "Nowak, Anna", ola@example.com')
+        self.assertEqual(records[0]["To Email"], "jan@example.com, anna@example.com, ola@example.com")
+        self.assertIs(records[0]["From Email"], records[2]["From Email"])
+        self.assertFalse(hasattr(parser, "_separate_sender_and_email"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_async_connector"]
+
+import gc
+import asyncio
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from async_connector import AsyncEmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestAsyncEmailConnector(unittest.TestCase):
+    def _async_connector(self, name: str, count: int) -> AsyncEmailConnector:
+        connector = EmailConnector(name, email_provider="gmail")
+        connector._connection = FakeIMAPConnection(
+            [build_message(subject=f"{name} {index}") for index in range(count)]
+        )
+        return AsyncEmailConnector(connector)
+
+    async def _collect(self, connector: AsyncEmailConnector, **kwargs) -> list:
+        parser = EmailParser(connector)
+        return [data["Subject"] async for data, _ in parser._aget_emails(emoji_support=False, **kwargs)]
+
+    def test_positive_async_get_emails(self) -> None:
+        """Async generator should yield the same records as the sync one."""
+
+        connector = self._async_connector("first", 5)
+        subjects = asyncio.run(self._collect(connector, batch_size=2))
+
+        self.assertEqual(subjects, [f"first {index}" for index in range(5)])
+        fetches = [c for c in connector._connector._connection.commands if c[0] == "FETCH"]
+        self.assertEqual([c[1] for c in fetches], ["1:2", "3:4", "5"])
+
+    def test_positive_same_records_as_sync(self) -> None:
+        """Both paths share the parse options and FETCH response splitting, so records should be equal."""
+
+        options = dict(emoji_support=False, batch_size=2, since_uid=1, separate_sender_email=True, format_datetime=True)
+        sync_connector = EmailConnector("sync", email_provider="gmail")
+        sync_connector._connection = FakeIMAPConnection([build_message(subject=f"mail {index}") for index in range(4)])
+        sync_records = [data for data, _ in EmailParser(sync_connector)._get_emails(**options)]
+
+        async def collect() -> list:
+            parser = EmailParser(self._async_connector("mail", 4))
+            return [data async for data, _ in parser._aget_emails(**options)]
+
+        async_records = asyncio.run(collect())
+        self.assertEqual(len(async_records), 3)
+        for sync_record, async_record in zip(sync_records, async_records):
+            self.assertEqual(dict(sync_record), dict(async_record))
+
+    def test_positive_concurrent_mailboxes(self) -> None:
+        """One event loop should drive several mailboxes concurrently."""
+
+        connectors = [self._async_connector(f"user{index}", 3) for index in range(10)]
+
+        async def run_all() -> list:
+            return await asyncio.gather(
+                *[self._collect(connector, since_uid=1) for connector in connectors]
+            )
+
+        results = asyncio.run(run_all())
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[4], ["user4 1", "user4 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
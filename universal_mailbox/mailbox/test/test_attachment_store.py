@@ -0,0 +1,135 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_attachment_store"]
+
+import os
+import gc
+import hashlib
+import binascii
+import tempfile
+import unittest
+from unittest import mock
+from email import message_from_bytes
+from email.message import EmailMessage
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from attachment_store import AttachmentStore
+from attachment_stream import decoded_chunks
+from test.fake_connection import FakeIMAPConnection
+
+
+def build_forwarded_invoice(index: int, pdf: bytes) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = f"Fwd: invoice {index}"
+    message["From"] = "Sender <sender@example.com>"
+    message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    message["Message-ID"] = f"<invoice-{index}@example.com>"
+    message.set_content("Forwarded invoice.")
+    message.add_attachment(pdf, maintype="application", subtype="pdf", filename="invoice.pdf")
+    return message.as_bytes()
+
+
+class TestAttachmentStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = AttachmentStore(self.directory.name)
+        self.pdf = os.urandom(50_000)
+        self.digest = hashlib.sha256(self.pdf).hexdigest()
+
+    def tearDown(self) -> None:
+        self.store._close()
+        self.directory.cleanup()
+
+    def _blobs(self) -> list:
+        return [
+            name
+            for _, _, files in os.walk(os.path.join(self.directory.name, "blobs"))
+            for name in files
+        ]
+
+    def test_positive_deduplicated_blob(self) -> None:
+        """Same content forwarded many times should be stored once and indexed per message."""
+
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection(
+            [build_forwarded_invoice(index, self.pdf) for index in range(5)]
+        )
+        emails = list(
+            EmailParser(connector)._get_emails(
+                emoji_support=False, return_attachments=True, attachment_store=self.store
+            )
+        )
+
+        self.assertEqual(self._blobs(), [self.digest])
+        self.assertEqual({handles[0].digest for _, handles in emails}, {self.digest})
+        self.assertTrue(self.store._has_message("invoice-3@example.com"))
+        self.assertEqual(self.store._attachments("invoice-4@example.com")[0].size, len(self.pdf))
+        with open(emails[0][1][0].path, "rb") as file:
+            self.assertEqual(file.read(), self.pdf)
+
+    def test_positive_known_digests(self) -> None:
+        """Store should report which digests it already has."""
+
+        message = message_from_bytes(build_forwarded_invoice(1, self.pdf))
+        part = [part for part in message.walk() if part.get_filename()][0]
+        self.store._store(part, "invoice.pdf", "invoice-1@example.com")
+
+        self.assertEqual(self.store._known_digests([self.digest, "0" * 64]), {self.digest})
+        self.assertFalse(self.store._has_message("unknown@example.com"))
+
+    def test_negative_malformed_base64(self) -> None:
+        """Malformed base64 should be decoded like get_payload(decode=True) instead of ending the run."""
+
+        raw_message = (
+            b"Subject: Spam\r\nDate: Mon, 01 Jan 2024 10:00:00 +0000\r\nMessage-ID: <spam@example.com>\r\n"
+            b"Content-Type: multipart/mixed; boundary=b\r\n\r\n"
+            b"--b\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nHi\r\n"
+            b"--b\r\nContent-Type: application/pdf\r\n"
+            b"Content-Disposition: attachment; filename=spam.pdf\r\n"
+            b"Content-Transfer-Encoding: base64\r\n\r\nSGVsbG8g!!d29y\r\nbGQ\r\n--b--\r\n"
+        )
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection([raw_message])
+        (_, handles), = EmailParser(connector)._get_emails(return_attachments=True, attachment_store=self.store)
+
+        self.assertEqual(handles[0].digest, hashlib.sha256(b"Hello world").hexdigest())
+        with open(handles[0].path, "rb") as file:
+            self.assertEqual(file.read(), b"Hello world")
+
+    def test_negative_failed_write_leaves_nothing(self) -> None:
+        """An attachment failing while its blob is written should leave no blob, temporary file or manifest row."""
+
+        message = message_from_bytes(build_forwarded_invoice(1, self.pdf))
+        part = [part for part in message.walk() if part.get_filename()][0]
+        # The first chunk is written, the second one fails.
+        with mock.patch(
+            "attachment_stream.binascii.a2b_base64", side_effect=[b"%PDF-1.4", binascii.Error("Incorrect padding")]
+        ):
+            self.assertIsNone(self.store._store(part, "invoice.pdf", "invoice-1@example.com"))
+
+        self.assertEqual(self._blobs(), [])
+        self.assertFalse(self.store._has_message("invoice-1@example.com"))
+
+    def test_positive_decoded_once(self) -> None:
+        """New and known blobs should be decoded in a single pass, without leaving temporary files."""
+
+        message = message_from_bytes(build_forwarded_invoice(1, self.pdf))
+        part = [part for part in message.walk() if part.get_filename()][0]
+        with mock.patch("attachment_stream.binascii.a2b_base64", wraps=binascii.a2b_base64) as decode:
+            list(decoded_chunks(part))
+        single_pass = decode.call_count
+
+        for message_id in ("invoice-1@example.com", "invoice-2@example.com"):
+            with mock.patch("attachment_stream.binascii.a2b_base64", wraps=binascii.a2b_base64) as decode:
+                self.assertEqual(self.store._store(part, "invoice.pdf", message_id).digest, self.digest)
+            self.assertEqual(decode.call_count, single_pass)
+        self.assertEqual(self._blobs(), [self.digest])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_attachment_stream"]
+
+import io
+import os
+import gc
+import hashlib
+import tempfile
+import unittest
+from email import message_from_bytes
+from email.message import EmailMessage
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from attachment_stream import decoded_chunks, stream_attachment
+from test.fake_connection import FakeIMAPConnection
+
+
+def build_message_with_attachments(pdf: bytes, doc: bytes) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = "Invoice"
+    message["From"] = "Sender <sender@example.com>"
+    message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    message["Message-ID"] = "<invoice@example.com>"
+    message.set_content("See attachments.")
+    message.add_attachment(pdf, maintype="application", subtype="pdf", filename="invoice.pdf")
+    message.add_attachment(
+        doc, maintype="application", subtype="msword", filename="notes.doc", cte="quoted-printable"
+    )
+    return message.as_bytes()
+
+
+def build_malformed_base64_part(payload: str) -> bytes:
+    return (
+        "Content-Type: application/pdf\r\n"
+        "Content-Disposition: attachment; filename=spam.pdf\r\n"
+        "Content-Transfer-Encoding: base64\r\n\r\n" + payload + "\r\n"
+    ).encode()
+
+
+class TestAttachmentStream(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pdf = os.urandom(300_000)
+        self.doc = ("Zażółć gęślą jaźń = long line " * 2000).encode("utf-8")
+        self.message = message_from_bytes(build_message_with_attachments(self.pdf, self.doc))
+        self.parts = [part for part in self.message.walk() if part.get_filename()]
+
+    def test_positive_chunks_match_full_decode(self) -> None:
+        """Chunked decoding should return the same bytes as email for base64 and quoted-printable."""
+
+        for part in self.parts:
+            streamed = b"".join(decoded_chunks(part, chunk_size=1001))
+            self.assertEqual(streamed, part.get_payload(decode=True))
+
+    def test_negative_malformed_base64(self) -> None:
+        """Stray characters, early padding and truncated quanta should decode like get_payload(decode=True)."""
+
+        for payload in ("SGVsbG8g!!d29y\nbGQ", "SGVs*bG8", "SGVsbG8=d29y", "SGVsbG8gd29ybGQ=Q", "SGVsbG8gd29ybGQx"):
+            part = message_from_bytes(build_malformed_base64_part(payload))
+            for chunk_size in (3, 4, 7, 1001):
+                streamed = b"".join(decoded_chunks(part, chunk_size=chunk_size))
+                self.assertEqual(streamed, part.get_payload(decode=True), (payload, chunk_size))
+        part = message_from_bytes(build_malformed_base64_part("SGVsbG8g!!d29y\nbGQ"))
+        self.assertEqual(stream_attachment(part, "spam.pdf").size, len(b"Hello world"))
+
+    def test_negative_stray_padding_character(self) -> None:
+        """"=" outside a padding position should be skipped instead of ending the payload."""
+
+        for payload in ("QUJD=REVG", "QU=JDREVG", "QUJDR=E=VG", "QUJDRE=V=G", "RS=/b+z/1xA1AD==+=/", "QU==REVG"):
+            part = message_from_bytes(build_malformed_base64_part(payload))
+            for chunk_size in (1, 2, 3, 4, 7, 1001):
+                streamed = b"".join(decoded_chunks(part, chunk_size=chunk_size))
+                self.assertEqual(streamed, part.get_payload(decode=True), (payload, chunk_size))
+        part = message_from_bytes(build_malformed_base64_part("QUJD=REVG"))
+        self.assertEqual(b"".join(decoded_chunks(part)), b"ABCDEF")
+
+    def test_negative_failing_attachment_is_skipped(self) -> None:
+        """An attachment that cannot be written should be logged and skipped without ending the run."""
+
+        def attachment_sink(file_name: str) -> io.BytesIO:
+            if file_name == "invoice.pdf":
+                raise OSError("disk full")
+            return io.BytesIO()
+
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection([self.message.as_bytes()])
+        (_, handles), = EmailParser(connector)._get_emails(
+            return_attachments=True, stream_attachments=True, attachment_sink=attachment_sink
+        )
+        self.assertEqual([handle.file_name for handle in handles], ["notes.doc"])
+
+    def test_positive_stream_to_sink(self) -> None:
+        """Handle should describe the attachment written to the sink."""
+
+        sink = io.BytesIO()
+        handle = stream_attachment(self.parts[0], "invoice.pdf", sink=sink, chunk_size=4096)
+
+        self.assertEqual(sink.getvalue(), self.pdf)
+        self.assertEqual(handle.size, len(self.pdf))
+        self.assertEqual(handle.digest, hashlib.sha256(self.pdf).hexdigest())
+        self.assertIsNone(handle.path)
+
+    def test_positive_parser_streams_attachments(self) -> None:
+        """Parser should save streamed attachments and return handles instead of bytes."""
+
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection([self.message.as_bytes()])
+        with tempfile.TemporaryDirectory() as directory:
+            (_, handles), = EmailParser(connector)._get_emails(
+                emoji_support=False,
+                return_attachments=True,
+                save_attachments=True,
+                save_attachments_path=directory,
+                stream_attachments=True,
+            )
+
+            self.assertEqual([handle.file_name for handle in handles], ["invoice.pdf", "notes.doc"])
+            self.assertEqual(handles[1].size, len(self.doc))
+            with open(handles[0].path, "rb") as file:
+                self.assertEqual(file.read(), self.pdf)
+            self.assertEqual(
+                os.path.basename(handles[0].path), "2024-01-01_10-00-00_invoice.pdf"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
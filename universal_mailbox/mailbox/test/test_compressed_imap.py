@@ -0,0 +1,69 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_compressed_imap"]
+
+import gc
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from compressed_imap import CompressedIMAP4
+from test.fake_connection import build_message
+from benchmark.imap_server import FakeIMAPServer
+
+
+MESSAGES = [build_message(subject=f"Report {n}", body="Quarterly numbers are attached. " * 200) for n in range(20)]
+
+
+class TestCompressedIMAP(unittest.TestCase):
+    def connect(self, compress: bool) -> EmailConnector:
+        server = FakeIMAPServer(MESSAGES, compress=compress)
+        address = server._start()
+        self.addCleanup(server._stop)
+        connector = EmailConnector("your_user", email_provider="gmail", compress=True)
+        connector._connection = CompressedIMAP4(*address)
+        connector._connection.login("your_user", "password")
+        self.addCleanup(connector._connection.logout)
+        return connector
+
+    def test_positive_compressed_session(self) -> None:
+        connector = self.connect(compress=True)
+        self.assertTrue(connector._enable_compression())
+        self.assertTrue(connector._compressed())
+
+        subjects = [record["Subject"] for record, _ in EmailParser(connector)._get_emails(batch_size=7)]
+        self.assertEqual(subjects, [f"Report {n}" for n in range(20)])
+        self.assertTrue(connector._noop())
+
+        stats = connector._transfer_stats()
+        self.assertGreater(stats["received"], sum(len(message) for message in MESSAGES))
+        self.assertLess(stats["received_wire"] * 5, stats["received"])
+        self.assertLess(stats["sent_wire"], stats["sent"])
+        self.assertGreater(stats["ratio"], 5)
+
+    def test_negative_server_without_compress(self) -> None:
+        connector = self.connect(compress=False)
+        self.assertFalse(connector._enable_compression())
+        self.assertFalse(connector._compressed())
+
+        self.assertEqual(len(list(EmailParser(connector)._get_emails(batch_size=7))), 20)
+        stats = connector._transfer_stats()
+        self.assertEqual((stats["sent"], stats["received"]), (stats["sent_wire"], stats["received_wire"]))
+        self.assertEqual(stats["ratio"], 1.0)
+
+    def test_positive_idle_hidden_when_compressed(self) -> None:
+        connector = self.connect(compress=True)
+        capabilities = ("IMAP4REV1", "IDLE", "COMPRESS=DEFLATE")
+        connector._connection.capabilities = capabilities
+        self.assertIn("IDLE", connector._capabilities())
+        connector._enable_compression()
+        connector._connection.capabilities = capabilities
+        self.assertEqual(connector._capabilities(), ("IMAP4REV1", "COMPRESS=DEFLATE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
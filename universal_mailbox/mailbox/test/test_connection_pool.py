@@ -0,0 +1,102 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_connection_pool"]
+
+import gc
+import threading
+import unittest
+from email_connector import EmailConnector
+from connection_pool import ConnectionPool
+from test.fake_connection import FakeIMAPConnection
+
+
+class BrokenIMAPConnection(FakeIMAPConnection):
+    def noop(self) -> tuple:
+        raise OSError("socket closed")
+
+
+class FakeConnectionPool(ConnectionPool):
+    created = 0
+
+    def _create(self) -> EmailConnector:
+        FakeConnectionPool.created += 1
+        connector = EmailConnector(self._mailbox, email_provider=self._email_provider)
+        connector._connection = FakeIMAPConnection([])
+        return connector
+
+
+class FailingConnectionPool(ConnectionPool):
+    error = SystemExit
+
+    def _create(self) -> EmailConnector:
+        raise self.error("login failed")
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeConnectionPool.created = 0
+        self.pool = FakeConnectionPool("your_user", "gmail", size=2, health_check_interval=0)
+
+    def tearDown(self) -> None:
+        self.pool._close()
+
+    def test_positive_sessions_are_reused(self) -> None:
+        """Released session should be checked out again after a NOOP health check."""
+
+        with self.pool._connection() as connector:
+            first = connector
+        with self.pool._connection() as connector:
+            self.assertIs(connector, first)
+            self.assertIn(("NOOP",), connector._connection.commands)
+        self.assertEqual(FakeConnectionPool.created, 1)
+
+    def test_positive_pool_is_bounded(self) -> None:
+        """Checkout should wait when all sessions are in use."""
+
+        first = self.pool._acquire()
+        second = self.pool._acquire()
+        self.assertIsNot(first, second)
+        self.assertIsNone(self.pool._acquire(timeout=0.05))
+
+        threading.Timer(0.05, self.pool._release, args=(first,)).start()
+        self.assertIs(self.pool._acquire(timeout=2), first)
+
+    def test_positive_reconnect_dead_session(self) -> None:
+        """Session failing NOOP should be replaced transparently."""
+
+        connector = self.pool._acquire()
+        connector._connection = BrokenIMAPConnection([])
+        self.pool._release(connector)
+
+        replacement = self.pool._acquire()
+        self.assertIsNot(replacement, connector)
+        self.assertEqual(FakeConnectionPool.created, 2)
+
+    def test_negative_broken_session_is_not_reused(self) -> None:
+        """Session that raised inside the with block should be discarded."""
+
+        with self.assertRaises(RuntimeError):
+            with self.pool._connection() as connector:
+                first = connector
+                raise RuntimeError("failed")
+        with self.pool._connection() as connector:
+            self.assertIsNot(connector, first)
+
+    def test_negative_failed_login_frees_slot(self) -> None:
+        """sys.exit of a failed login should be reported as None, KeyboardInterrupt should propagate."""
+
+        pool = FailingConnectionPool("your_user", "gmail", size=1, health_check_interval=0)
+        self.assertIsNone(pool._acquire(timeout=0.05))
+        pool.error = KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            pool._acquire(timeout=0.05)
+        self.assertEqual(pool._opened, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -30,11 +30,12 @@ class TestEmailConnector(unittest.TestCase):
     def tearDown(self) -> None:
         tracemalloc.stop()
 
-    def test_positive_singleton_instance(self) -> None:
-        """There should be always one class instance."""
+    def test_positive_independent_instances(self) -> None:
+        """Every connector should keep its own state."""
 
-        self.assertEqual(id(self.connector), id(self.connector_duplicate))
-        self.assertTrue(self.connector, self.connector_duplicate)
+        self.connector._instancebox = "other_user"
+        self.assertNotEqual(id(self.connector), id(self.connector_duplicate))
+        self.assertEqual(str(self.connector_duplicate), "your_user")
 
     def test_positive_verify_forbidden_access(self) -> None:
         """Forbidden attributes should not be accessed via class instance."""
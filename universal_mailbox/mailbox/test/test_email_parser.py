@@ -9,6 +9,7 @@ __how_to__ = ["python -m unittest test.test_email_parser"]
 import os
 import gc
 import atexit
+import tempfile
 import unittest
 import tracemalloc
 from utils import (
@@ -16,7 +17,9 @@ from utils import (
     absolute_path,
 )
 from email_parser import EmailParser
+from sync_state import SyncStateStore
 from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
 
 
 class TestEmailParser(unittest.TestCase):
@@ -262,6 +265,148 @@ class TestEmailParser(unittest.TestCase):
         )
 
 
+class TestEmailParserFetch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.messages = [
+            build_message(subject=f"Subject {index}", message_id=f"<{index}@example.com>")
+            for index in range(1, 8)
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(self.messages)
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_batch_fetch(self) -> None:
+        """Batched fetch should return the same messages with fewer FETCH commands."""
+
+        emails = list(self.parser._get_emails(emoji_support=False, batch_size=3))
+        fetches = [c for c in self.connector._connection.commands if c[0] == "FETCH"]
+
+        self.assertEqual(
+            [data["Subject"] for data, _ in emails],
+            [f"Subject {index}" for index in range(1, 8)],
+        )
+        self.assertEqual([c[1] for c in fetches], ["1:3", "4:6", "7"])
+        self.assertEqual(self.parser._run_stats.batch_size, 3)
+        self.assertEqual(self.parser._run_stats.fetch_commands, 3)
+        self.assertEqual(self.parser._run_stats.messages, 7)
+
+    def test_positive_headers_only(self) -> None:
+        """Headers-only mode should peek at header fields and skip the body."""
+
+        emails = list(self.parser._get_emails(headers_only=True, batch_size=4))
+        fetches = [c for c in self.connector._connection.commands if c[0] == "FETCH"]
+
+        self.assertEqual(len(emails), 7)
+        self.assertEqual(emails[0][0]["Subject"], "Subject 1")
+        self.assertEqual(emails[0][0]["Message-ID"], "1@example.com")
+        self.assertIsNone(emails[0][0]["Body"])
+        self.assertIsNone(emails[0][1])
+        self.assertTrue(all(c[2].startswith("(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM") for c in fetches))
+
+    def test_positive_single_fetch(self) -> None:
+        """Without batch size every message should be fetched separately."""
+
+        emails = list(self.parser._get_emails(emoji_support=False, mailbox="Archive"))
+
+        self.assertEqual(len(emails), 7)
+        self.assertEqual(self.parser._run_stats.fetch_commands, 7)
+
+
+class TestEmailParserIncremental(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.state = SyncStateStore(os.path.join(self.directory.name, "state.json"))
+        self.messages = [
+            (uid, build_message(subject=f"Subject {uid}", message_id=f"<{uid}@example.com>"))
+            for uid in (3, 4, 9)
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(self.messages, uidvalidity=5)
+        self.parser = EmailParser(self.connector)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _uids(self, **kwargs) -> list:
+        emails = self.parser._get_emails(
+            emoji_support=False, incremental=True, sync_state=self.state, **kwargs
+        )
+        return [data["UID"] for data, _ in emails]
+
+    def test_positive_incremental_sync(self) -> None:
+        """Only messages newer than the saved UID should be fetched."""
+
+        self.assertEqual(self._uids(batch_size=2), [3, 4, 9])
+        self.assertEqual(self.state._load(self.connector._account_key(), "Inbox")["last_uid"], 9)
+
+        self.connector._connection.messages.append((12, build_message(subject="New")))
+        self.assertEqual(self._uids(batch_size=3), [12])
+        self.assertEqual(self._uids(batch_size=4), [])
+
+    def test_negative_failed_fetch_not_skipped(self) -> None:
+        """UIDs of a failed FETCH should be fetched again by the next run."""
+
+        self.connector._connection.failing_fetches = {"3:4"}
+        self.assertEqual(self._uids(batch_size=2), [9])
+        self.assertIsNone(self.state._load(self.connector._account_key(), "Inbox"))
+
+        self.connector._connection.failing_fetches = {"9"}
+        self.assertEqual(self._uids(batch_size=2), [3, 4])
+        self.assertEqual(self.state._load(self.connector._account_key(), "Inbox")["last_uid"], 4)
+
+        self.connector._connection.failing_fetches = set()
+        self.assertEqual(self._uids(batch_size=2), [9])
+        self.assertEqual(self.state._load(self.connector._account_key(), "Inbox")["last_uid"], 9)
+
+    def test_positive_uidvalidity_change(self) -> None:
+        """Changed UIDVALIDITY should trigger a full resync."""
+
+        self.assertEqual(self._uids(batch_size=2), [3, 4, 9])
+        self.connector._connection.uidvalidity = 6
+        self.assertEqual(self._uids(batch_size=3), [3, 4, 9])
+        self.assertEqual(self.state._load(self.connector._account_key(), "Inbox")["uidvalidity"], 6)
+
+
+class TestEmailParserSearchWindows(unittest.TestCase):
+    def setUp(self) -> None:
+        self.messages = [
+            (uid, build_message(subject=f"Subject {uid}", message_id=f"<{uid}@example.com>"))
+            for uid in (2, 3, 7, 8, 9, 15, 21)
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(self.messages)
+        self.parser = EmailParser(self.connector)
+
+    def _searches(self) -> list:
+        return [c[1] for c in self.connector._connection.commands if c[0] == "UID SEARCH"]
+
+    def test_positive_search_windows(self) -> None:
+        """Every window should be searched separately and messages should keep UID order."""
+
+        emails = list(self.parser._get_emails(emoji_support=False, search_window=5, batch_size=2))
+
+        self.assertEqual([data["UID"] for data, _ in emails], [2, 3, 7, 8, 9, 15, 21])
+        self.assertEqual(
+            self._searches(), ["UID 1:5 ALL", "UID 6:10 ALL", "UID 11:15 ALL", "UID 16:20 ALL", "UID 21:21 ALL"]
+        )
+
+    def test_positive_search_windows_since_uid(self) -> None:
+        """Windows should start after since_uid."""
+
+        emails = list(self.parser._get_emails(emoji_support=False, search_window=10, since_uid=8))
+
+        self.assertEqual([data["UID"] for data, _ in emails], [9, 15, 21])
+        self.assertEqual(self._searches(), ["UID 9:18 ALL", "UID 19:21 ALL"])
+
+    def test_positive_search_windows_are_lazy(self) -> None:
+        """A window should be searched only after the previous one was consumed."""
+
+        emails = self.parser._get_emails(emoji_support=False, search_window=5)
+        next(emails)
+        self.assertEqual(self._searches(), ["UID 1:5 ALL"])
+        emails.close()
+
+
 if __name__ == "__main__":
     unittest.main()
     gc.collect()
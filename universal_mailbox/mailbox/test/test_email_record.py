@@ -0,0 +1,118 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_email_record"]
+
+import gc
+import pickle
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from email.message import EmailMessage
+from email_record import FIELDS, EmailRecord, columns
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestEmailRecord(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = {"Subject": "Hello", "From": "Sender", "Message-ID": "id@example.com", "Body": None}
+        self.record = EmailRecord._from_dict(self.data)
+
+    def test_positive_item_and_attribute_access(self) -> None:
+        self.assertEqual(self.record["Subject"], "Hello")
+        self.assertEqual(self.record.from_, "Sender")
+        self.assertIsNone(self.record["Body"])
+        self.record["UID"] = 7
+        self.assertEqual(self.record.uid, 7)
+        self.assertIn("UID", self.record)
+        self.assertNotIn("CC", self.record)
+
+    def test_positive_keys_sorted_like_dict_records(self) -> None:
+        self.assertEqual(list(FIELDS), sorted(FIELDS))
+        self.assertEqual(self.record._keys(), sorted(self.data))
+        self.assertEqual(self.record, self.data)
+
+    def test_negative_unset_field(self) -> None:
+        with self.assertRaises(KeyError):
+            self.record["CC"]
+        self.assertIsNone(self.record.get("CC"))
+        with self.assertRaises(AttributeError):
+            self.record.extra = 1
+
+    def test_positive_pickle(self) -> None:
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.record)
+
+    def test_positive_columns(self) -> None:
+        second = EmailRecord._from_dict({**self.data, "Subject": "Bye"})
+        chunk = columns([self.record, second])
+        self.assertEqual(chunk["Subject"], ["Hello", "Bye"])
+        self.assertEqual(list(chunk), sorted(self.data))
+        self.assertEqual(columns([]), {})
+
+    def test_positive_columns_union_of_keys(self) -> None:
+        second = EmailRecord._from_dict({**self.data, "CC": "C"})
+        chunk = columns([self.record, second])
+        self.assertEqual(chunk["CC"], [None, "C"])
+
+
+class TestEmailParserRecords(unittest.TestCase):
+    def setUp(self) -> None:
+        messages = [
+            build_message(subject=f"Subject {number}", message_id=f"<{number}@example.com>")
+            for number in range(5)
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(messages)
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_record_type(self) -> None:
+        emails = list(self.parser._get_emails(record_type="record", batch_size=5))
+        self.assertIsInstance(emails[0][0], EmailRecord)
+        self.assertEqual(emails[0][0]["Subject"], "Subject 0")
+        self.assertEqual(emails[0][0].message_id, "0@example.com")
+
+    def test_positive_record_type_matches_dict(self) -> None:
+        records = [record for record, _ in self.parser._get_emails(record_type="record")]
+        dicts = [data for data, _ in self.parser._get_emails()]
+        self.assertEqual(records, dicts)
+
+    def test_positive_columnar_batches(self) -> None:
+        chunks = list(self.parser._get_email_batches(rows=2, batch_size=5, since_uid=0))
+        self.assertEqual([len(chunk["Subject"]) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[2]["Subject"], ["Subject 4"])
+        self.assertEqual(chunks[0]["UID"], [1, 2])
+        self.assertEqual(list(chunks[0]), list(chunks[2]))
+        self.assertNotIn("Attachments", chunks[0])
+
+    def test_positive_columnar_batches_mixed_fields(self) -> None:
+        messages = []
+        for number, cc in enumerate([None, "C <c@example.com>", "D <d@example.com>"]):
+            message = EmailMessage()
+            message["Subject"] = f"Subject {number}"
+            message["From"] = "Sender <sender@example.com>"
+            message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+            message["Message-ID"] = f"<{number}@example.com>"
+            if cc:
+                message["CC"] = cc
+            message.set_content("Body")
+            messages.append(message.as_bytes())
+        self.connector._connection = FakeIMAPConnection(messages)
+
+        chunks = list(self.parser._get_email_batches(rows=2, separate_sender_email=True))
+        self.assertEqual(chunks[0]["CC"], [None, "C"])
+        self.assertEqual(chunks[0]["CC Email"], [None, "c@example.com"])
+        self.assertEqual(chunks[1]["CC Email"], ["d@example.com"])
+        self.assertEqual(list(chunks[0]), list(chunks[1]))
+
+    def test_positive_columnar_batches_with_attachments(self) -> None:
+        chunks = list(self.parser._get_email_batches(rows=10, return_attachments=True))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(len(chunks[0]["Attachments"]), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
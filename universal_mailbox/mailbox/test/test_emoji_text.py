@@ -0,0 +1,72 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_emoji_text"]
+
+import gc
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from emoji_text import demojize_text, emoji_name
+from email.message import EmailMessage
+from test.fake_connection import FakeIMAPConnection
+
+
+class TestEmojiText(unittest.TestCase):
+    def test_positive_ascii_text_unchanged(self) -> None:
+        text = "plain text: 1 * 2 # 3"
+        self.assertIs(demojize_text(text), text)
+
+    def test_positive_simple_emojis(self) -> None:
+        self.assertEqual(demojize_text("Hi 😀😀!"), "Hi :grinning_face::grinning_face:!")
+        self.assertEqual(demojize_text("Zażółć 🎉"), "Zażółć :party_popper:")
+
+    def test_positive_sequences(self) -> None:
+        self.assertEqual(demojize_text("👨‍👩‍👧"), ":family_man_woman_girl:")
+        self.assertEqual(demojize_text("👍🏽"), ":thumbs_up_medium_skin_tone:")
+        self.assertEqual(demojize_text("🇵🇱"), ":Poland:")
+        self.assertEqual(demojize_text("❤️"), ":red_heart:")
+        self.assertEqual(demojize_text("1️⃣"), ":keycap_1:")
+
+    def test_positive_non_emoji_symbols_kept(self) -> None:
+        self.assertEqual(demojize_text("™ © ✓ ąę"), "™ © ✓ ąę")
+
+    def test_positive_memoized(self) -> None:
+        emoji_name.cache_clear()
+        demojize_text("🚀 🚀 🚀")
+        self.assertEqual(emoji_name.cache_info().misses, 1)
+        self.assertEqual(emoji_name.cache_info().hits, 2)
+
+
+class TestEmojiEngineOption(unittest.TestCase):
+    def setUp(self) -> None:
+        message = EmailMessage()
+        message["Subject"] = "Party"
+        message["From"] = "Sender <sender@example.com>"
+        message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+        message["Message-ID"] = "<party@example.com>"
+        message.set_content("Family 👨‍👩‍👧 party 🎉")
+        message.make_mixed()
+
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection([message.as_bytes()])
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_fast_engine(self) -> None:
+        emails = list(self.parser._get_emails(emoji_engine="fast"))
+        self.assertEqual(emails[0][0]["Body"].strip(), "Family :family_man_woman_girl: party :party_popper:")
+
+    def test_positive_engines_agree_on_simple_emojis(self) -> None:
+        text = "Hi 😀 🎉 🚀"
+        self.assertEqual(
+            self.parser._replace_emojis_with_text(text, emoji_engine="fast"),
+            self.parser._replace_emojis_with_text(text),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
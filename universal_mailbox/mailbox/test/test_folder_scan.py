@@ -0,0 +1,115 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_folder_scan"]
+
+import gc
+import time
+import threading
+import unittest
+from folder_scan import FolderScanner
+from email_connector import EmailConnector
+from connection_pool import ConnectionPool
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+FOLDERS = {
+    "INBOX": [build_message(subject=f"Inbox {n}") for n in range(5)],
+    "Archive/2024": [build_message(subject=f"Archive {n}") for n in range(4)],
+    "Sent Items": [build_message(subject=f"Sent {n}") for n in range(3)],
+    "[Gmail]/Spam": [build_message(subject="Spam")],
+}
+
+
+class FakeFolderConnection(FakeIMAPConnection):
+    """Fake session with a folder tree, SELECT switches the messages."""
+
+    active = 0
+    highest = 0
+    lock = threading.Lock()
+
+    def __init__(self) -> None:
+        super().__init__([])
+
+    def list(self, directory: str = '""', pattern: str = "*") -> tuple:
+        self.commands.append(("LIST", directory, pattern))
+        data = [b'(\\HasChildren \\Noselect) "/" "[Gmail]"']
+        data += [f'(\\HasNoChildren) "/" "{name}"'.encode() for name in FOLDERS]
+        return "OK", data
+
+    def select(self, mailbox: str = "INBOX", readonly: bool = False) -> tuple:
+        with FakeFolderConnection.lock:
+            FakeFolderConnection.active += 1
+            FakeFolderConnection.highest = max(FakeFolderConnection.highest, FakeFolderConnection.active)
+        # Give other folder workers time to run concurrently.
+        time.sleep(0.05)
+        with FakeFolderConnection.lock:
+            FakeFolderConnection.active -= 1
+        self.messages = list(enumerate(FOLDERS[mailbox.strip('"')], start=1))
+        return super().select(mailbox, readonly)
+
+
+class FakeConnectionPool(ConnectionPool):
+    def _create(self) -> EmailConnector:
+        connector = EmailConnector(self._mailbox, email_provider=self._email_provider)
+        connector._connection = FakeFolderConnection()
+        return connector
+
+
+class TestFolderScanner(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeFolderConnection.highest = 0
+        self.pool = FakeConnectionPool("your_user", "gmail", size=3)
+
+    def tearDown(self) -> None:
+        self.pool._close()
+
+    def test_positive_list_mailboxes(self) -> None:
+        with self.pool._connection() as connector:
+            self.assertEqual(connector._list_mailboxes(), list(FOLDERS))
+
+    def test_positive_include_exclude(self) -> None:
+        scanner = FolderScanner(self.pool, exclude=["[gmail]/*"])
+        self.assertEqual(scanner._folders(), ["INBOX", "Archive/2024", "Sent Items"])
+        scanner = FolderScanner(self.pool, include=["inbox", "Archive/*"])
+        self.assertEqual(scanner._folders(), ["INBOX", "Archive/2024"])
+
+    def test_positive_merged_stream(self) -> None:
+        scanner = FolderScanner(self.pool, exclude=["[Gmail]/*"])
+        records = [data for data, _ in scanner._get_emails(batch_size=2)]
+
+        self.assertEqual(len(records), 12)
+        self.assertEqual({data["Mailbox"] for data in records}, {"INBOX", "Archive/2024", "Sent Items"})
+        for folder, prefix in (("INBOX", "Inbox"), ("Archive/2024", "Archive"), ("Sent Items", "Sent")):
+            subjects = [data["Subject"] for data in records if data["Mailbox"] == folder]
+            self.assertEqual(subjects, [f"{prefix} {n}" for n in range(len(FOLDERS[folder]))])
+        self.assertGreater(FakeFolderConnection.highest, 1)
+        self.assertEqual(scanner._run_stats["INBOX"].messages, 5)
+        self.assertEqual(scanner._errors, {})
+
+    def test_positive_record_type(self) -> None:
+        scanner = FolderScanner(self.pool, include=["Sent Items"])
+        records = [data for data, _ in scanner._get_emails(record_type="record")]
+        self.assertEqual([record.mailbox for record in records], ["Sent Items"] * 3)
+
+    def test_negative_failing_folder(self) -> None:
+        scanner = FolderScanner(self.pool, workers=2)
+        records = list(scanner._get_emails(folders=["INBOX", "Missing"]))
+        self.assertEqual(len(records), 5)
+        self.assertIn("Missing", scanner._errors)
+
+    def test_positive_stop_early(self) -> None:
+        scanner = FolderScanner(self.pool, exclude=["[Gmail]/*"], queue_size=1)
+        stream = scanner._get_emails()
+        next(stream)
+        stream.close()
+        with self.pool._condition:
+            self.assertEqual(len(self.pool._idle), self.pool._opened)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
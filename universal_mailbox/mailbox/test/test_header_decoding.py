@@ -0,0 +1,61 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_header_decoding"]
+
+import gc
+import unittest
+from email.header import Header
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection
+from header_decoding import decode_encoded_words, decode_header_value
+
+
+class TestHeaderDecoding(unittest.TestCase):
+    def test_positive_ascii_value_unchanged(self) -> None:
+        decode_encoded_words.cache_clear()
+        value = "Weekly report"
+        self.assertIs(decode_header_value(value), value)
+        self.assertIsNone(decode_header_value(None))
+        self.assertEqual(decode_encoded_words.cache_info().currsize, 0)
+
+    def test_positive_all_encoded_words_joined(self) -> None:
+        self.assertEqual(
+            decode_header_value("=?utf-8?q?Zam=C3=B3wienie?= =?utf-8?b?IG5yIDEy?="), "Zamówienie nr 12"
+        )
+        self.assertEqual(decode_header_value("Re: =?iso-8859-2?q?Faktura_=B1?= [PL]"), "Re: Faktura ą [PL]")
+        self.assertEqual(
+            decode_header_value("=?utf-8?q?Jan_Kowalski?= <jan@example.com>"), "Jan Kowalski <jan@example.com>"
+        )
+
+    def test_negative_unknown_charset(self) -> None:
+        self.assertEqual(decode_header_value("=?x-unknown?q?abc?="), "abc")
+        self.assertEqual(decode_header_value(Header(b"Caf\xc3\xa9", "unknown-8bit")), "Café")
+
+    def test_positive_memoized(self) -> None:
+        decode_encoded_words.cache_clear()
+        for _ in range(3):
+            decode_header_value("=?utf-8?q?Newsletter_=F0=9F=93=B0?=")
+        self.assertEqual(decode_encoded_words.cache_info().misses, 1)
+        self.assertEqual(decode_encoded_words.cache_info().hits, 2)
+
+    def test_positive_parser_subject_not_truncated(self) -> None:
+        raw_message = (
+            b"Subject: =?utf-8?q?Part_one?=\r\n =?utf-8?q?_and_part_two?=\r\n"
+            b"From: =?utf-8?b?WsOzZmlh?= <zofia@example.com>\r\n"
+            b"Message-ID: <1@example.com>\r\n\r\nBody\r\n"
+        )
+        connector = EmailConnector("your_user", email_provider="gmail")
+        connector._connection = FakeIMAPConnection([raw_message])
+        data, _ = next(EmailParser(connector)._get_emails(headers_only=True))
+        self.assertEqual(data["Subject"], "Part one and part two")
+        self.assertEqual(data["From"], "Zófia <zofia@example.com>")
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_html_text"]
+
+import gc
+import time
+import unittest
+from email.message import EmailMessage
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from html_text import END_TAG, START_TAG, TEXT, html_events, html_to_text
+from test.fake_connection import FakeIMAPConnection
+
+
+NEWSLETTER = (
+    "<html><head><style>p {color: red}</style><script>var x = '<p>hidden</p>';</script></head>"
+    "<body><h1>Weekly&nbsp;news</h1><p>Tom &amp; Jerry &lt;3</p>"
+    '<p><a href="https://example.com/offer?a=1&amp;b=2">Shop now</a></p>'
+    '<p><a href="https://example.com">https://example.com</a></p>'
+    "<!-- <p>comment</p> --></body></html>"
+)
+
+
+class TestHtmlText(unittest.TestCase):
+    def test_positive_events(self) -> None:
+        events = list(html_events('<p class="a">x &gt; y</p><br/>'))
+        self.assertEqual(
+            events,
+            [
+                (START_TAG, "p", ' class="a"'),
+                (TEXT, None, "x > y"),
+                (END_TAG, "p", None),
+                (START_TAG, "br", "/"),
+            ],
+        )
+
+    def test_positive_skips_script_style_and_comments(self) -> None:
+        text = html_to_text(NEWSLETTER)
+        self.assertNotIn("hidden", text)
+        self.assertNotIn("color", text)
+        self.assertNotIn("comment", text)
+
+    def test_positive_entities_and_blocks(self) -> None:
+        lines = [line for line in html_to_text(NEWSLETTER).splitlines() if line]
+        self.assertEqual(lines[0], "Weekly\xa0news")
+        self.assertEqual(lines[1], "Tom & Jerry <3")
+
+    def test_positive_links(self) -> None:
+        text = html_to_text(NEWSLETTER)
+        self.assertIn("Shop now (https://example.com/offer?a=1&b=2)", text)
+        self.assertEqual(text.count("https://example.com\n"), 1)
+        self.assertNotIn("(https", html_to_text(NEWSLETTER, keep_links=False))
+
+    def test_positive_unclosed_markup(self) -> None:
+        self.assertEqual(html_to_text("<p>text<script>alert(1)"), "\ntext")
+        self.assertEqual(html_to_text("a <b"), "a <b")
+
+    def test_negative_unterminated_tags_are_linear(self) -> None:
+        """Untrusted bodies with unterminated tags must not backtrack for minutes."""
+
+        for html in ("<" + "a" * 50_000, "<a " * 20_000, "<!" * 25_000, '<a b="' * 10_000):
+            start = time.perf_counter()
+            self.assertEqual(html_to_text(html), html)
+            self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class TestHtmlEngineOption(unittest.TestCase):
+    def setUp(self) -> None:
+        message = EmailMessage()
+        message["Subject"] = "Newsletter"
+        message["From"] = "Sender <sender@example.com>"
+        message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+        message["Message-ID"] = "<newsletter@example.com>"
+        message.set_content("Plain version.")
+        message.add_alternative(NEWSLETTER, subtype="html")
+
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection([message.as_bytes()])
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_stream_engine(self) -> None:
+        emails = list(self.parser._get_emails(html_engine="stream", clean_body_text=False))
+        body = emails[0][0]["Body"]
+        self.assertIn("Plain version.", body)
+        self.assertIn("Shop now (https://example.com/offer?a=1&b=2)", body)
+        self.assertNotIn("hidden", body)
+
+    def test_positive_default_engine(self) -> None:
+        emails = list(self.parser._get_emails(clean_body_text=False))
+        self.assertIn("Shop now", emails[0][0]["Body"])
+        self.assertNotIn("(https://example.com/offer", emails[0][0]["Body"])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_idle_listener"]
+
+import gc
+import time
+import threading
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from idle_listener import IdleListener
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestIdleListener(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connection = FakeIMAPConnection([build_message(subject="Old")])
+        self.connector._connection = self.connection
+        self.stop = threading.Event()
+        self.events = []
+
+    def tearDown(self) -> None:
+        self.stop.set()
+        self.connection._close()
+
+    def listen(self, listener: IdleListener) -> threading.Thread:
+        thread = threading.Thread(target=lambda: self.events.extend(listener._events()), daemon=True)
+        thread.start()
+        return thread
+
+    def wait_for(self, condition, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_positive_idle_push(self) -> None:
+        """New messages should be reported while the connection is in IDLE."""
+
+        thread = self.listen(IdleListener(self.connector, stop=self.stop))
+        self.wait_for(lambda: ("IDLE",) in self.connection.commands)
+        uid = self.connection._deliver(build_message(subject="New"))
+        self.wait_for(lambda: self.events)
+        self.stop.set()
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([(event.mailbox, event.uids) for event in self.events], [("Inbox", [uid])])
+        self.assertEqual(self.connection.commands[-1], ("DONE",))
+
+    def test_positive_message_while_busy(self) -> None:
+        """A message delivered before IDLE starts should still be reported."""
+
+        self.connection._deliver(build_message(subject="Early"))
+        thread = self.listen(IdleListener(self.connector, since_uid=1, stop=self.stop))
+        self.wait_for(lambda: self.events)
+        self.stop.set()
+        thread.join(timeout=5)
+
+        self.assertEqual(self.events[0].uids, [2])
+
+    def test_positive_renew_idle(self) -> None:
+        """IDLE should be restarted after renew_interval."""
+
+        thread = self.listen(IdleListener(self.connector, renew_interval=0.1, stop=self.stop))
+        self.wait_for(lambda: self.connection.commands.count(("IDLE",)) >= 3)
+        self.stop.set()
+        thread.join(timeout=5)
+
+        self.assertGreaterEqual(self.connection.commands.count(("DONE",)), 3)
+        self.assertEqual(self.events, [])
+
+    def test_positive_noop_fallback(self) -> None:
+        """Servers without IDLE should be polled with NOOP."""
+
+        self.connection.capabilities = ("IMAP4REV1",)
+        thread = self.listen(IdleListener(self.connector, poll_interval=0.02, stop=self.stop))
+        self.wait_for(lambda: ("NOOP",) in self.connection.commands)
+        uid = self.connection._deliver(build_message(subject="New"))
+        self.wait_for(lambda: self.events)
+        self.stop.set()
+        thread.join(timeout=5)
+
+        self.assertEqual(self.events[0].uids, [uid])
+        self.assertNotIn(("IDLE",), self.connection.commands)
+
+
+class TrailingResponseConnection(FakeIMAPConnection):
+    """Fake server sending an untagged response in the same packet as the end of IDLE."""
+
+    def _send(self, data: bytes) -> None:
+        server = self._sockets[1]
+        if data == b"DONE\r\n":
+            self.commands.append(("DONE",))
+            server.sendall(self._idle_tag + b" OK IDLE terminated\r\n* 7 EXPUNGE\r\n")
+            self._idle_tag = None
+        else:
+            super()._send(data)
+
+
+class TestIdle(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connection = TrailingResponseConnection([build_message(subject="Old")])
+        self.connector._connection = self.connection
+
+    def tearDown(self) -> None:
+        self.connection._close()
+
+    def test_positive_tag_released_and_trailing_bytes_kept(self) -> None:
+        self.assertEqual(self.connector._idle(0.05), [])
+        self.assertEqual(self.connection.tagged_commands, {})
+        # The response after the tagged line is left to imaplib instead of being dropped.
+        self.assertEqual(self.connection.readline(), b"* 7 EXPUNGE\r\n")
+
+    def test_positive_buffered_response_before_idle(self) -> None:
+        self.connection.sock
+        self.connection._sockets[1].sendall(b"FAKE0 OK NOOP completed\r\n* 2 EXISTS\r\n")
+        self.assertEqual(self.connection.readline(), b"FAKE0 OK NOOP completed\r\n")
+
+        # "* 2 EXISTS" now waits in imaplib's buffer, invisible to select() on the socket.
+        self.assertEqual(self.connector._idle(5), [b"* 2 EXISTS"])
+        self.assertEqual(self.connection.commands[-2:], [("IDLE",), ("DONE",)])
+
+
+class TestWatchEmails(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connection = FakeIMAPConnection([build_message(subject="Old")])
+        self.connector._connection = self.connection
+        self.parser = EmailParser(self.connector)
+
+    def tearDown(self) -> None:
+        self.connection._close()
+
+    def watch(self, parse_workers: int = None) -> list:
+        stop = threading.Event()
+        subjects = []
+
+        def consume() -> None:
+            emails = self.parser._watch_emails(
+                since_uid=0, parse_workers=parse_workers, stop=stop, emoji_support=False
+            )
+            for data, _ in emails:
+                subjects.append((data["UID"], data["Subject"]))
+                if len(subjects) == 3:
+                    emails.close()
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while ("IDLE",) not in self.connection.commands and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.connection._deliver(build_message(subject="New 1"))
+        self.connection._deliver(build_message(subject="New 2"))
+        thread.join(timeout=20)
+        stop.set()
+        self.assertFalse(thread.is_alive())
+        return subjects
+
+    def test_positive_watch(self) -> None:
+        self.assertEqual(self.watch(), [(1, "Old"), (2, "New 1"), (3, "New 2")])
+
+    def test_positive_watch_with_parse_pipeline(self) -> None:
+        self.assertEqual(self.watch(parse_workers=2), [(1, "Old"), (2, "New 1"), (3, "New 2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_imap_utils"]
+
+import gc
+import unittest
+from test.fake_connection import FakeIMAPConnection
+from imap_utils import LineReader, chunks, parse_fetch_response, parse_list_response, quote_mailbox, sequence_set
+
+
+class TestImapUtils(unittest.TestCase):
+    def test_positive_sequence_set(self) -> None:
+        """Consecutive ids should be collapsed into ranges."""
+
+        self.assertEqual(sequence_set([b"1", b"2", b"3", b"7"]), "1:3,7")
+        self.assertEqual(sequence_set(["9", "5", "6"]), "5:6,9")
+        self.assertEqual(sequence_set([4]), "4")
+        self.assertEqual(sequence_set([]), "")
+
+    def test_positive_chunks(self) -> None:
+        """Chunks should keep order and respect the size."""
+
+        self.assertEqual(list(chunks([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+
+    def test_positive_parse_fetch_response(self) -> None:
+        """Every message literal should be returned with its sequence number and uid."""
+
+        data = [
+            (b"1 (UID 10 RFC822 {3}", b"abc"),
+            b")",
+            (b"2 (RFC822 {3}", b"def"),
+            b" UID 11)",
+            (b"3 (RFC822 {3}", b"ghi"),
+            b")",
+        ]
+        self.assertEqual(
+            parse_fetch_response(data),
+            [(1, 10, b"abc"), (2, 11, b"def"), (3, None, b"ghi")],
+        )
+
+    def test_positive_parse_list_response(self) -> None:
+        """Quoted, literal and NIL-delimited names should be returned with their flags."""
+
+        data = [
+            b'(\\HasNoChildren) "/" "INBOX"',
+            (b'(\\HasNoChildren) "/" {9}', b"Work/2024"),
+            b'(\\Noselect \\HasChildren) "." "Say \\"hi\\""',
+            b"() NIL Plain",
+        ]
+        self.assertEqual(
+            parse_list_response(data),
+            [
+                (("\\HasNoChildren",), "/", "INBOX"),
+                (("\\HasNoChildren",), "/", "Work/2024"),
+                (("\\Noselect", "\\HasChildren"), ".", 'Say "hi"'),
+                ((), None, "Plain"),
+            ],
+        )
+
+    def test_positive_quote_mailbox(self) -> None:
+        """Only names with special characters should be quoted."""
+
+        self.assertEqual(quote_mailbox("INBOX"), "INBOX")
+        self.assertEqual(quote_mailbox("Sent Items"), '"Sent Items"')
+        self.assertEqual(quote_mailbox('Say "hi"'), '"Say \\"hi\\""')
+        self.assertEqual(quote_mailbox('"Sent Items"'), '"Sent Items"')
+
+    def test_positive_line_reader_split_tls_records(self) -> None:
+        """A line split across TLS records should be returned whole, bytes after it stay in imaplib's buffer."""
+
+        connection = FakeIMAPConnection([], tls=True)
+        reader = LineReader(connection)
+        server = connection._sockets[1]
+        try:
+            server.sendall(b"* 1 EXI")
+            self.assertIsNone(reader._readline(timeout=0.2))
+            server.sendall(b"STS\r\n* 2 EXISTS\r\nFAKE1 OK")
+            self.assertEqual(reader._readline(timeout=1), b"* 1 EXISTS")
+            self.assertEqual(reader._readline(timeout=1), b"* 2 EXISTS")
+            server.sendall(b" done\r\n")
+            self.assertEqual(connection.readline(), b"FAKE1 OK done\r\n")
+        finally:
+            connection._close()
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_lazy_record"]
+
+import gc
+import unittest
+from unittest import mock
+from email_parser import EmailParser
+from email.message import EmailMessage
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection
+from email_record import EmailRecord, LazyEmailRecord, columns
+
+
+def build_mixed_message(number: int) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = f"Subject {number}"
+    message["From"] = "Sender <sender@example.com>"
+    message["To"] = "Receiver <receiver@example.com>"
+    message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    message["Message-ID"] = f"<{number}@example.com>"
+    message["X-Mailer"] = "Mailer"
+    message.set_content(f"Body {number} :thumbs_up:")
+    message.make_mixed()
+    message.add_attachment(b"%PDF-1.4", maintype="application", subtype="pdf", filename="file.pdf")
+    return message.as_bytes()
+
+
+class TestLazyEmailRecord(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection([build_mixed_message(number) for number in range(3)])
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_matches_dict_records(self) -> None:
+        for options in (
+            dict(),
+            dict(only_basic_headers=False, separate_sender_email=True, format_datetime=True),
+            dict(clean_body_text=True, emoji_support=False, since_uid=0),
+            dict(headers_only=True),
+        ):
+            lazy = [record for record, _ in self.parser._get_emails(record_type="lazy", **options)]
+            dicts = [data for data, _ in self.parser._get_emails(**options)]
+            self.assertIsInstance(lazy[0], LazyEmailRecord)
+            self.assertEqual(lazy, dicts)
+            self.assertEqual(lazy[0]._keys(), list(dicts[0]))
+
+    def test_positive_body_parsed_on_access_only(self) -> None:
+        with mock.patch.object(EmailParser, "_body_text", autospec=True, return_value="text") as body_text:
+            record, attachments = next(self.parser._get_emails(record_type="lazy"))
+            self.assertEqual(record["Subject"], "Subject 0")
+            self.assertEqual(record.from_, "Sender <sender@example.com>")
+            self.assertIsNone(attachments)
+            body_text.assert_not_called()
+            self.assertNotIn("_message", vars(record))
+            self.assertEqual(record["Body"], "text")
+            self.assertEqual(record.body, "text")
+            body_text.assert_called_once()
+
+    def test_positive_extended_headers_parsed_on_access_only(self) -> None:
+        record, _ = next(self.parser._get_emails(record_type="lazy", only_basic_headers=False))
+        self.assertEqual(record.get("Subject"), "Subject 0")
+        self.assertNotIn("_extended_headers", vars(record))
+        self.assertEqual(record["X-Mailer"], "Mailer")
+        self.assertIn("_extended_headers", vars(record))
+        self.assertNotIn("_message", vars(record))
+
+    def test_positive_attachments(self) -> None:
+        record, _ = next(self.parser._get_emails(record_type="lazy", return_attachments=True))
+        self.assertEqual(len(record.attachments), 1)
+        record, _ = next(self.parser._get_emails(record_type="lazy", headers_only=True))
+        self.assertIsNone(record.attachments)
+        self.assertIsNone(record["Body"])
+
+    def test_negative_missing_field(self) -> None:
+        record, _ = next(self.parser._get_emails(record_type="lazy"))
+        self.assertNotIn("X-Mailer", record)
+        self.assertIsNone(record.get("X-Mailer"))
+        with self.assertRaises(KeyError):
+            record["From Email"]
+        with self.assertRaises(AttributeError):
+            record.x_mailer
+
+    def test_positive_uid_and_columns(self) -> None:
+        records = [record for record, _ in self.parser._get_emails(record_type="lazy", since_uid=0, parse_workers=2)]
+        self.assertEqual([record.uid for record in records], [1, 2, 3])
+        chunk = columns(records, ["Subject", "UID"])
+        self.assertEqual(chunk["Subject"], ["Subject 0", "Subject 1", "Subject 2"])
+        eager = EmailRecord._from_dict(records[0]._as_dict())
+        self.assertEqual(records[0], eager)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_mail_export"]
+
+import os
+import gc
+import json
+import tempfile
+import unittest
+from unittest import mock
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from mail_export import MailExporter, pyarrow
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestMailExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        messages = [
+            build_message(subject=f"Subject {number}", message_id=f"<{number}@example.com>")
+            for number in range(5)
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(messages)
+        self.parser = EmailParser(self.connector)
+        self.partitions = os.path.join(self.directory.name, "your_user@imap.gmail.com", "Inbox", "1")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def read_rows(self) -> list:
+        rows = []
+        for name in sorted(os.listdir(self.partitions)):
+            with open(os.path.join(self.partitions, name), "r", encoding="utf-8") as export_file:
+                rows.extend(json.loads(line) for line in export_file)
+        return rows
+
+    def test_positive_partitions_and_checkpoint(self) -> None:
+        exporter = MailExporter(self.parser, self.directory.name, partition_size=2)
+        self.assertEqual(exporter._export(batch_size=5), 5)
+        self.assertEqual(
+            sorted(os.listdir(self.partitions)),
+            ["part-0000000001-0000000002.jsonl", "part-0000000003-0000000004.jsonl", "part-0000000005-0000000005.jsonl"],
+        )
+        rows = self.read_rows()
+        self.assertEqual([row["Subject"] for row in rows], [f"Subject {number}" for number in range(5)])
+        self.assertEqual([row["UID"] for row in rows], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            exporter._checkpoint._load("your_user@imap.gmail.com", "Inbox"), {"uidvalidity": 1, "last_uid": 5}
+        )
+
+        self.connector._connection._add_message(build_message(subject="Subject 5", message_id="<5@example.com>"))
+        self.assertEqual(exporter._export(), 1)
+        self.assertEqual([row["UID"] for row in self.read_rows()], [1, 2, 3, 4, 5, 6])
+
+    def test_positive_resume_after_interruption(self) -> None:
+        exporter = MailExporter(self.parser, self.directory.name, partition_size=2)
+        get_emails = self.parser._get_emails
+
+        def interrupted(**options):
+            for number, message in enumerate(get_emails(**options)):
+                if number == 3:
+                    raise ConnectionError("connection lost")
+                yield message
+
+        with mock.patch.object(self.parser, "_get_emails", side_effect=interrupted):
+            with self.assertRaises(ConnectionError):
+                exporter._export()
+        self.assertEqual([row["UID"] for row in self.read_rows()], [1, 2])
+        self.assertEqual(os.listdir(self.partitions), ["part-0000000001-0000000002.jsonl"])
+
+        self.assertEqual(exporter._export(), 3)
+        self.assertEqual([row["UID"] for row in self.read_rows()], [1, 2, 3, 4, 5])
+
+    def test_negative_failed_fetch_not_skipped(self) -> None:
+        exporter = MailExporter(self.parser, self.directory.name, partition_size=2)
+        self.connector._connection.failing_fetches = {"3:4"}
+        self.assertEqual(exporter._export(batch_size=2), 3)
+        self.assertEqual(exporter._checkpoint._load("your_user@imap.gmail.com", "Inbox")["last_uid"], 2)
+
+        self.connector._connection.failing_fetches = set()
+        self.assertEqual(exporter._export(batch_size=2), 3)
+        self.assertEqual([row["UID"] for row in self.read_rows()], [1, 2, 3, 4, 5])
+        self.assertEqual(exporter._checkpoint._load("your_user@imap.gmail.com", "Inbox")["last_uid"], 5)
+
+    def test_negative_unsupported_format(self) -> None:
+        with self.assertRaises(SystemExit):
+            MailExporter(self.parser, self.directory.name, file_format="csv")
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_positive_parquet(self) -> None:
+        exporter = MailExporter(self.parser, self.directory.name, file_format="parquet")
+        self.assertEqual(exporter._export(record_type="record"), 5)
+        table = pyarrow.parquet.read_table(os.path.join(self.partitions, "part-0000000001-0000000005.parquet"))
+        self.assertEqual(table.column("UID").to_pylist(), [1, 2, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_message_cache"]
+
+import os
+import gc
+import tempfile
+import unittest
+from email_parser import EmailParser
+from message_cache import MessageCache
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestMessageCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = MessageCache(os.path.join(self.directory.name, "cache.sqlite3"), max_bytes=300)
+
+    def tearDown(self) -> None:
+        self.cache._close()
+        self.directory.cleanup()
+
+    def test_positive_lru_eviction(self) -> None:
+        """Least recently used messages should be evicted first."""
+
+        for uid in (1, 2, 3):
+            self.cache._put("account", "Inbox", 1, uid, b"x" * 100)
+        self.cache._get_many("account", "Inbox", 1, [1])
+        self.cache._put("account", "Inbox", 1, 4, b"x" * 100)
+
+        self.assertEqual(sorted(self.cache._get_many("account", "Inbox", 1, [1, 2, 3, 4])), [1, 3, 4])
+
+    def test_negative_other_uidvalidity(self) -> None:
+        """Messages cached under another UIDVALIDITY should not be returned."""
+
+        self.cache._put("account", "Inbox", 1, 1, b"x")
+        self.assertEqual(self.cache._get_many("account", "Inbox", 2, [1]), {})
+        self.cache._invalidate("account", "Inbox", 2)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestEmailParserMessageCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = MessageCache(os.path.join(self.directory.name, "cache.sqlite3"))
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(
+            [build_message(subject=f"Subject {index}", body="  body  text  ") for index in range(4)]
+        )
+        self.parser = EmailParser(self.connector)
+
+    def tearDown(self) -> None:
+        self.cache._close()
+        self.directory.cleanup()
+
+    def _fetches(self) -> int:
+        return len([c for c in self.connector._connection.commands if c[0].endswith("FETCH")])
+
+    def test_positive_cached_messages_are_not_fetched(self) -> None:
+        """Second run should be served from the cache."""
+
+        first = list(self.parser._get_emails(emoji_support=False, batch_size=2, message_cache=self.cache))
+        fetches = self._fetches()
+        second = list(self.parser._get_emails(emoji_support=False, batch_size=2, message_cache=self.cache))
+
+        self.assertEqual(first, second)
+        self.assertEqual(self._fetches(), fetches)
+        self.assertEqual(self.parser._run_stats.cache_hits, 4)
+
+    def test_positive_offline_reparse(self) -> None:
+        """Cached messages should be parsed with other options without the network."""
+
+        list(self.parser._get_emails(emoji_support=False, message_cache=self.cache))
+        self.connector._connection = None
+
+        emails = list(self.parser._get_cached_emails(self.cache, clean_body_text=True, emoji_support=False))
+        self.assertEqual([data["UID"] for data, _ in emails], [1, 2, 3, 4])
+        self.assertEqual(emails[0][0]["Subject"], "Subject 0")
+
+    def test_negative_uidvalidity_change_drops_cache(self) -> None:
+        """Messages cached under an old UIDVALIDITY should not be parsed offline after a change."""
+
+        list(self.parser._get_emails(emoji_support=False, message_cache=self.cache))
+        self.connector._connection = FakeIMAPConnection([build_message(subject="Renumbered")], uidvalidity=2)
+        list(self.parser._get_emails(emoji_support=False, message_cache=self.cache))
+        self.assertEqual(len(self.cache), 1)
+
+        emails = list(self.parser._get_cached_emails(self.cache, uidvalidity=1, emoji_support=False))
+        self.assertEqual(emails, [])
+        emails = list(self.parser._get_cached_emails(self.cache, emoji_support=False))
+        self.assertEqual([data["Subject"] for data, _ in emails], ["Renumbered"])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
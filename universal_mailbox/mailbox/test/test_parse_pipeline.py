@@ -0,0 +1,91 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_parse_pipeline"]
+
+import os
+import gc
+import tempfile
+import unittest
+from sync_state import SyncStateStore
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+class TestParsePipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        self.messages = [build_message(subject=f"Subject {index}", body="x" * index) for index in range(20)]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(self.messages)
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_ordered_results(self) -> None:
+        """Process pool results should keep fetch order and match in-thread parsing."""
+
+        expected = [data for data, _ in EmailParser(self.connector)._get_emails(emoji_support=False)]
+        emails = [
+            data
+            for data, _ in self.parser._get_emails(emoji_support=False, batch_size=5, parse_workers=2)
+        ]
+
+        self.assertEqual(emails, expected)
+        self.assertEqual(self.parser._run_stats.messages, 20)
+
+    def test_positive_unordered_results(self) -> None:
+        """Unordered mode should yield every message exactly once."""
+
+        emails = self.parser._get_emails(
+            emoji_support=False, batch_size=5, parse_workers=2, ordered=False
+        )
+        subjects = sorted(data["Subject"] for data, _ in emails)
+
+        self.assertEqual(subjects, sorted(f"Subject {index}" for index in range(20)))
+
+    def test_positive_early_stop(self) -> None:
+        """Closing the generator early should stop the pipeline."""
+
+        emails = self.parser._get_emails(emoji_support=False, batch_size=2, parse_workers=2)
+        first = next(emails)
+        emails.close()
+
+        self.assertEqual(first[0]["Subject"], "Subject 0")
+
+    def test_positive_unordered_incremental_watermark(self) -> None:
+        """A stopped unordered run should not save a UID above a message that was not yielded."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            sync_state = SyncStateStore(os.path.join(directory, "state.json"))
+            emails = self.parser._get_emails(
+                emoji_support=False,
+                batch_size=2,
+                parse_workers=2,
+                ordered=False,
+                incremental=True,
+                sync_state=sync_state,
+            )
+            yielded = {next(emails)[0]["UID"] for _ in range(7)}
+            emails.close()
+
+            # Nothing is saved when UID 1 was still in flight.
+            state = sync_state._load("your_user@imap.gmail.com", "Inbox") or {"last_uid": 0}
+            last_uid = state["last_uid"]
+            self.assertTrue(set(range(1, last_uid + 1)) <= yielded)
+
+    def test_negative_unpicklable_attachment_sink(self) -> None:
+        """A lambda sink cannot reach worker processes and should be rejected before fetching."""
+
+        emails = self.parser._get_emails(
+            parse_workers=2, stream_attachments=True, attachment_sink=lambda file_name: open(os.devnull, "wb")
+        )
+        with self.assertRaises(ValueError):
+            next(emails)
+        self.assertEqual(self.connector._connection.commands, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_run_stats"]
+
+import gc
+import unittest
+from unittest import mock
+from run_stats import RunStats
+from email_parser import EmailParser
+from email.message import EmailMessage
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection
+
+
+def build_mixed_message(number: int) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = f"Subject {number}"
+    message["From"] = "Sender <sender@example.com>"
+    message["Date"] = "Mon, 01 Jan 2024 10:00:00 +0000"
+    message["Message-ID"] = f"<{number}@example.com>"
+    message.set_content(f"Body {number}")
+    message.make_mixed()
+    message.add_attachment(b"%PDF-1.4" * 16, maintype="application", subtype="pdf", filename="file.pdf")
+    return message.as_bytes()
+
+
+class TestRunStats(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection([build_mixed_message(number) for number in range(4)])
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_disabled_by_default(self) -> None:
+        stats = RunStats()
+        self.assertIs(stats._stage("fetch"), stats._stage("body"))
+        with stats._stage("fetch"):
+            pass
+        self.assertEqual(stats.stage_seconds, {})
+
+        list(self.parser._get_emails(batch_size=2))
+        self.assertEqual(self.parser._run_stats.stage_seconds, {})
+        self.assertEqual(self.parser._run_stats.messages, 4)
+
+    def test_positive_stage_timings(self) -> None:
+        list(self.parser._get_emails(batch_size=2, stage_timings=True, return_attachments=True))
+        stats = self.parser._run_stats
+        self.assertEqual(
+            set(stats.stage_seconds), {"fetch", "mime", "headers", "timestamp", "body", "emoji", "attachments"}
+        )
+        self.assertEqual(stats.stage_calls["fetch"], stats.fetch_commands)
+        self.assertEqual(stats.stage_calls["mime"], 4)
+        self.assertEqual(stats.attachments, 4)
+        self.assertEqual(stats.attachment_bytes, 4 * 8 * 16)
+        self.assertIn("stage_seconds", stats._as_dict())
+
+    def test_positive_periodic_log_line(self) -> None:
+        with mock.patch("run_stats.logger") as run_logger, mock.patch("email_parser.logger") as parser_logger:
+            list(self.parser._get_emails(batch_size=2, stage_timings=True, stats_interval=0))
+        self.assertEqual(run_logger.info.call_count, 4)
+        summary = parser_logger.info.call_args.args[0]
+        self.assertTrue(summary.startswith("messages 4 ("))
+        self.assertIn("| fetch ", summary)
+
+    def test_negative_no_log_without_interval(self) -> None:
+        with mock.patch("run_stats.logger") as run_logger:
+            list(self.parser._get_emails(stage_timings=True))
+        run_logger.info.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
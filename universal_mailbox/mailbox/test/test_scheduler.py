@@ -0,0 +1,104 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_scheduler"]
+
+import os
+import gc
+import json
+import time
+import tempfile
+import threading
+import unittest
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+from scheduler import AccountScheduler, ProviderLimit, RateLimiter
+
+
+class FakeScheduler(AccountScheduler):
+    def _connect(self, account: str, provider: str) -> EmailConnector:
+        if account == "broken":
+            raise ConnectionError("login failed")
+        connector = EmailConnector(account, email_provider=provider)
+        connector._connection = FakeIMAPConnection([build_message(message_id=f"<{n}@x>") for n in range(3)])
+        return connector
+
+
+class TestAccountScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.active = {}
+        self.highest = {}
+        self.lock = threading.Lock()
+
+    def task(self, connector: EmailConnector, result) -> None:
+        with self.lock:
+            self.active[result.provider] = self.active.get(result.provider, 0) + 1
+            self.highest[result.provider] = max(self.highest.get(result.provider, 0), self.active[result.provider])
+        try:
+            time.sleep(0.02)
+            if connector._instancebox == "failing":
+                raise ValueError("parse error")
+            for _ in EmailParser(connector)._get_emails(batch_size=3):
+                result.messages += 1
+        finally:
+            with self.lock:
+                self.active[result.provider] -= 1
+
+    def test_positive_load_accounts(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "settings.json")
+            with open(path, "w") as json_file:
+                json.dump(
+                    {
+                        "first": {"email_address": "first@gmail.com"},
+                        "second": {"email_address": "second@example.com", "email_provider": "Outlook"},
+                        "third": {"email_address": "third@example.com"},
+                    },
+                    json_file,
+                )
+            scheduler = FakeScheduler(self.task, settings=path)
+        self.assertEqual(scheduler._accounts, {"first": "gmail", "second": "outlook", "third": None})
+        results = {result.account: result for result in scheduler._run()}
+        self.assertEqual(results["first"].status, "done")
+        self.assertEqual(results["third"].status, "failed")
+
+    def test_positive_provider_connection_limit(self) -> None:
+        accounts = {f"gmail_{number}": "gmail" for number in range(4)}
+        accounts.update({f"aol_{number}": "aol" for number in range(4)})
+        scheduler = FakeScheduler(
+            self.task,
+            accounts=accounts,
+            workers=8,
+            limits={"gmail": ProviderLimit(connections=1, logins_per_minute=60_000)},
+        )
+        results = scheduler._run()
+        self.assertEqual([result.status for result in results], ["done"] * 8)
+        self.assertEqual([result.messages for result in results], [3] * 8)
+        self.assertEqual(self.highest["gmail"], 1)
+        self.assertGreater(self.highest["aol"], 1)
+
+    def test_negative_failures_are_isolated(self) -> None:
+        scheduler = FakeScheduler(self.task, accounts={"broken": "gmail", "failing": "gmail", "working": "gmail"})
+        results = {result.account: result for result in scheduler._run()}
+        self.assertEqual(results["broken"].status, "failed")
+        self.assertIn("login failed", results["broken"].error)
+        self.assertEqual(results["failing"].status, "failed")
+        self.assertIn("parse error", results["failing"].error)
+        self.assertEqual((results["working"].status, results["working"].messages), ("done", 3))
+
+    def test_positive_rate_limiter(self) -> None:
+        limiter = RateLimiter(per_minute=1200, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter._acquire()
+        # Two tokens are available at once, the next two arrive every 50 ms.
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_search_index"]
+
+import gc
+import os
+import tempfile
+import unittest
+from email.message import EmailMessage
+from email_parser import EmailParser
+from search_index import SearchIndex
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+
+
+def build_multipart_message(
+    subject: str, body: str, sender: str, date: str, message_id: str, attachment: str = None
+) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = "Receiver <receiver@example.com>"
+    message["Date"] = date
+    message["Message-ID"] = message_id
+    message.set_content(body)
+    message.make_mixed()
+    if attachment:
+        message.add_attachment(b"%PDF-1.4", maintype="application", subtype="pdf", filename=attachment)
+    return message.as_bytes()
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.index = SearchIndex(os.path.join(self.directory.name, "index.sqlite3"))
+        messages = [
+            build_multipart_message(
+                "Invoice for March",
+                "Please pay the gęślą invoice.",
+                "Accounting <accounting@example.com>",
+                "Fri, 01 Mar 2024 10:00:00 +0000",
+                "<1@example.com>",
+                attachment="march.pdf",
+            ),
+            build_message(
+                subject="Team lunch", body="Pizza on Friday", date="Mon, 15 Jan 2024 10:00:00 +0000", message_id="<2@example.com>"
+            ),
+            build_multipart_message(
+                "Weekly report",
+                "Numbers and the invoice summary",
+                "Boss <boss@example.com>",
+                "Wed, 10 Apr 2024 10:00:00 +0000",
+                "<3@example.com>",
+            ),
+        ]
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection(messages)
+        self.parser = EmailParser(self.connector)
+        list(self.parser._get_emails(search_index=self.index, batch_size=3))
+
+    def tearDown(self) -> None:
+        self.index._close()
+        self.directory.cleanup()
+
+    def message_ids(self, **filters) -> list:
+        return [result["Message-ID"] for result in self.index._search(**filters)]
+
+    def test_positive_indexed(self) -> None:
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.message_ids(), ["3@example.com", "1@example.com", "2@example.com"])
+
+    def test_positive_text_filters(self) -> None:
+        self.assertEqual(self.message_ids(subject="invoice"), ["1@example.com"])
+        self.assertEqual(self.message_ids(body="invoice"), ["3@example.com", "1@example.com"])
+        self.assertEqual(self.message_ids(body="gesla"), ["1@example.com"])
+        self.assertEqual(self.message_ids(mail_from="boss@example.com"), ["3@example.com"])
+        self.assertEqual(self.message_ids(body="invoice", mail_from="accounting"), ["1@example.com"])
+        self.assertEqual(self.message_ids(body='quoted "phrase'), [])
+
+    def test_positive_attachment_names_and_size(self) -> None:
+        self.assertEqual(self.message_ids(has_attachment=True), ["1@example.com"])
+        self.assertEqual(self.message_ids(body="march"), [])
+        self.assertEqual(self.message_ids(attachment_larger_than=1), ["3@example.com", "1@example.com", "2@example.com"])
+        self.assertEqual(self.message_ids(attachment_smaller_than=1), [])
+
+    def test_positive_dates(self) -> None:
+        self.assertEqual(self.message_ids(since="01-Mar-2024"), ["3@example.com", "1@example.com"])
+        self.assertEqual(self.message_ids(before="01-Mar-2024"), ["2@example.com"])
+        self.assertEqual(self.message_ids(header_message_id="<2@example.com>"), ["2@example.com"])
+
+    def test_positive_dates_ordered_across_offsets(self) -> None:
+        """10:00 +0100 is earlier than 09:30 +0000, string order of the original offsets would invert them."""
+
+        messages = [
+            build_message(subject="Earlier", date="Thu, 02 May 2024 10:00:00 +0100", message_id="<4@example.com>"),
+            build_message(subject="Later", date="Thu, 02 May 2024 09:30:00 +0000", message_id="<5@example.com>"),
+        ]
+        self.connector._connection = FakeIMAPConnection(messages)
+        list(self.parser._get_emails(search_index=self.index, mailbox="Other"))
+
+        results = self.index._search(mailbox="Other")
+        self.assertEqual([result["Message-ID"] for result in results], ["5@example.com", "4@example.com"])
+        self.assertEqual(results[1]["Date"], "2024-05-02T09:00:00+00:00")
+        self.assertEqual(self.message_ids(since="02-May-2024"), ["5@example.com", "4@example.com"])
+
+    def test_positive_separated_addresses(self) -> None:
+        """Addresses moved to "... Email" keys by separate_sender_email should be searchable."""
+
+        self.connector._connection = FakeIMAPConnection(
+            [build_message(sender="Anna <anna@example.com>", message_id="<6@example.com>")]
+        )
+        list(self.parser._get_emails(search_index=self.index, mailbox="Separated", separate_sender_email=True))
+
+        self.assertEqual(self.message_ids(mailbox="Separated", mail_from="anna@example.com"), ["6@example.com"])
+        self.assertEqual(self.message_ids(mailbox="Separated", mail_from="Anna"), ["6@example.com"])
+        self.assertEqual(self.message_ids(mailbox="Separated", mail_to="receiver@example.com"), ["6@example.com"])
+
+    def test_positive_scope_and_reindex(self) -> None:
+        list(self.parser._get_emails(search_index=self.index, batch_size=3))
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.message_ids(account="your_user@imap.gmail.com", mailbox="Inbox")), 3)
+        self.assertEqual(self.message_ids(mailbox="Archive"), [])
+        self.index._remove("your_user@imap.gmail.com", "Inbox", ["2@example.com"])
+        self.assertEqual(len(self.index), 2)
+
+    def test_negative_server_only_filters(self) -> None:
+        self.assertIsNone(self.index._search(unseen=True))
+        with self.assertRaises(TypeError):
+            self.index._search(unknown="x")
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_search_query"]
+
+import gc
+import unittest
+from datetime import date
+from email_parser import EmailParser
+from email_connector import EmailConnector
+from test.fake_connection import FakeIMAPConnection, build_message
+from search_query import Not, Or, Raw, Term, compile_query, criteria, date_range, uid_range, uids
+
+
+class TestSearchQuery(unittest.TestCase):
+    def test_positive_and_or_not(self) -> None:
+        query = (Term("FROM", "a@b.com") | Term("FROM", "c@d.com")) & Term("SINCE", "01-Jan-2024")
+        self.assertEqual(compile_query(query).criteria, 'OR FROM "a@b.com" FROM "c@d.com" SINCE 01-Jan-2024')
+        self.assertEqual(
+            compile_query(Or(Term("TO", "a"), Term("TO", "b"), Term("TO", "c"))).criteria,
+            'OR TO "a" OR TO "b" TO "c"',
+        )
+        self.assertEqual(compile_query(~Term("SEEN")).criteria, "NOT SEEN")
+        self.assertEqual(
+            compile_query(Not(Term("FROM", "a") & Term("TO", "b"))).criteria, 'NOT (FROM "a" TO "b")'
+        )
+        self.assertEqual(
+            compile_query(Raw('X-GM-RAW "has:drive"') | Term("FLAGGED")).criteria,
+            'OR (X-GM-RAW "has:drive") FLAGGED',
+        )
+
+    def test_positive_dates_and_uids(self) -> None:
+        self.assertEqual(
+            compile_query(date_range(date(2024, 1, 5), "01-Feb-2024")).criteria, "SINCE 5-Jan-2024 BEFORE 01-Feb-2024"
+        )
+        self.assertEqual(compile_query(uid_range(10)).criteria, "UID 10:*")
+        self.assertEqual(compile_query(uid_range(1, 5) | uids([7, 8, 9, 12])).criteria, "OR UID 1:5 UID 7:9,12")
+
+    def test_positive_quoting(self) -> None:
+        self.assertEqual(compile_query(Term("SUBJECT", 'say "hi" \\o/')).criteria, 'SUBJECT "say \\"hi\\" \\\\o/"')
+        self.assertEqual(
+            compile_query(Term("HEADER", "X-Mailer", "Outlook")).criteria, 'HEADER "X-Mailer" "Outlook"'
+        )
+
+    def test_positive_utf8_literal(self) -> None:
+        compiled = compile_query(Term("SUBJECT", "Zażółć") & Term("FROM", "a@b.com") & ~Term("SEEN"))
+        self.assertEqual(compiled.criteria, 'FROM "a@b.com" NOT SEEN SUBJECT')
+        self.assertEqual(compiled.charset, "UTF-8")
+        self.assertEqual(compiled.literal, "Zażółć".encode("utf-8"))
+
+    def test_positive_criteria_keywords(self) -> None:
+        query = criteria(mail_from="a@b.com", unseen=True, user_agent="Outlook", attachment_larger_than=100)
+        self.assertEqual(
+            compile_query(query).criteria, 'FROM "a@b.com" LARGER 100 UNSEEN HEADER "User-Agent" "Outlook"'
+        )
+        self.assertEqual(compile_query(criteria()).criteria, "ALL")
+
+    def test_positive_cached(self) -> None:
+        query = Term("FROM", "cached@example.com") & Term("SEEN")
+        compile_query(query)
+        hits = compile_query.cache_info().hits
+        compile_query(Term("FROM", "cached@example.com") & Term("SEEN"))
+        self.assertEqual(compile_query.cache_info().hits, hits + 1)
+
+    def test_negative_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            Term("MAGIC", "x")
+        with self.assertRaises(ValueError):
+            Term("FROM")
+        with self.assertRaises(ValueError):
+            compile_query(Term("SUBJECT", "line\r\nbreak"))
+        with self.assertRaises(ValueError):
+            compile_query(Term("SINCE", "2024-01-01"))
+        with self.assertRaises(ValueError):
+            compile_query(Term("SUBJECT", "Zażółć") & Term("BODY", "Gęś"))
+        with self.assertRaises(ValueError):
+            compile_query(Not(Term("SUBJECT", "Zażółć") & Term("FROM", "a")))
+
+
+class TestEmailParserSearchQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connector = EmailConnector("your_user", email_provider="gmail")
+        self.connector._connection = FakeIMAPConnection([build_message()])
+        self.parser = EmailParser(self.connector)
+
+    def test_positive_query_search(self) -> None:
+        query = Term("FROM", "a@b.com") | Term("FROM", "c@d.com")
+        self.assertEqual(len(list(self.parser._get_emails(search_filter=query))), 1)
+        self.assertIn(("SEARCH", 'OR FROM "a@b.com" FROM "c@d.com"'), self.connector._connection.commands)
+
+    def test_positive_query_with_uid_and_literal(self) -> None:
+        list(self.parser._get_emails(search_filter=Term("SUBJECT", "Zażółć"), since_uid=0))
+        list(self.parser._get_emails(search_filter=Term("SUBJECT", "Zażółć"), since_uid=5))
+        commands = self.connector._connection.commands
+        self.assertIn(("UID SEARCH", "CHARSET", "UTF-8", "SUBJECT"), commands)
+        self.assertIn(("UID SEARCH", "CHARSET", "UTF-8", "UID 6:* SUBJECT"), commands)
+        self.assertIn(("LITERAL", "Zażółć".encode("utf-8")), commands)
+
+    def test_positive_set_filter_format_kept(self) -> None:
+        self.assertEqual(
+            self.parser._set_filter(body="b", mail_from="x", seen=True, attachment_larger_than=5),
+            '(BODY "b" FROM "x" SEEN LARGER 5)',
+        )
+        self.assertEqual(self.parser._set_filter(), "()")
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()
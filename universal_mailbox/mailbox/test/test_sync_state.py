@@ -0,0 +1,94 @@
+#!/usr/bin/env python3.11
+# -*- coding: utf-8 -*-
+
+__created__ = "18.10.2026"
+__last_update__ = "18.10.2026"
+__author__ = "https://github.com/pyautoml"
+__how_to__ = ["python -m unittest test.test_sync_state"]
+
+import os
+import gc
+import tempfile
+import threading
+import unittest
+from sync_state import SyncStateStore, UidWatermark
+
+
+class TestSyncStateStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SyncStateStore(os.path.join(self.directory.name, "state.json"))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_positive_save_and_load(self) -> None:
+        """Saved high-water mark should be loaded per account and mailbox."""
+
+        self.store._save("user@gmail", "Inbox", 7, 120)
+        self.store._save("user@gmail", "Sent", 8, 15)
+
+        self.assertEqual(self.store._load("user@gmail", "Inbox"), {"uidvalidity": 7, "last_uid": 120})
+        self.assertEqual(self.store._load("user@gmail", "Sent"), {"uidvalidity": 8, "last_uid": 15})
+
+    def test_negative_missing_state(self) -> None:
+        """Unknown mailbox should have no state."""
+
+        self.assertIsNone(self.store._load("user@gmail", "Inbox"))
+        self.store._save("user@gmail", "Inbox", 7, 120)
+        self.store._reset("user@gmail", "Inbox")
+        self.assertIsNone(self.store._load("user@gmail", "Inbox"))
+
+    def test_positive_parallel_stores_same_file(self) -> None:
+        """Separate stores of one file, like parallel folder scans, should not lose each other's saves."""
+
+        path = os.path.join(self.directory.name, "state.json")
+        threads = [
+            threading.Thread(
+                target=lambda folder=folder: [
+                    SyncStateStore(path)._save("user@gmail", f"Folder {folder}", 7, uid) for uid in range(1, 21)
+                ]
+            )
+            for folder in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for folder in range(8):
+            self.assertEqual(self.store._load("user@gmail", f"Folder {folder}"), {"uidvalidity": 7, "last_uid": 20})
+        self.assertEqual(os.listdir(self.directory.name), ["state.json"])
+
+
+class TestUidWatermark(unittest.TestCase):
+    def test_positive_out_of_order_delivery(self) -> None:
+        """Watermark should stop below the lowest UID that was requested but not delivered yet."""
+
+        watermark = UidWatermark(start=10)
+        windows = list(watermark._request([[b"11", b"15"], [b"16", b"20"]]))
+        self.assertEqual(windows, [[b"11", b"15"], [b"16", b"20"]])
+
+        watermark._deliver(16)
+        watermark._deliver(20)
+        self.assertEqual(watermark._value, 10)
+        watermark._deliver(11)
+        self.assertEqual(watermark._value, 11)
+        watermark._deliver(15)
+        self.assertEqual(watermark._value, 20)
+        watermark._deliver(16)
+        self.assertEqual(watermark._value, 20)
+
+    def test_negative_missing_uid_blocks(self) -> None:
+        """A UID missing in the FETCH response should never be passed."""
+
+        watermark = UidWatermark()
+        list(watermark._request([[1, 2, 3]]))
+        watermark._deliver(1)
+        watermark._deliver(3)
+        self.assertEqual(watermark._value, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+    gc.collect()